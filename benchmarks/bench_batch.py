@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ciclo de liberação com POST /angle sequenciais x um único POST /batch.
+O ciclo abre e fecha o dispensador N vezes com uma espera entre os
+movimentos. Mede a duração do ciclo, as idas e voltas na rede e o erro de
+temporização dos passos do lote.
+
+Uso:
+    python3 benchmarks/bench_batch.py [--cycles 20] [--openings 4] [--dwell-ms 50]
+"""
+
+import argparse
+import http.client
+import json
+import time
+
+from common import ServerProcess, percentile
+
+
+def release_steps(openings, dwell_ms, open_angle=120, closed_angle=60):
+    steps = []
+    for _ in range(openings):
+        steps += [{'op': 'angle', 'angle': open_angle}, {'op': 'dwell', 'ms': dwell_ms},
+                  {'op': 'angle', 'angle': closed_angle}, {'op': 'dwell', 'ms': dwell_ms}]
+    return steps
+
+
+def post(conn, path, body):
+    conn.request('POST', path, body=json.dumps(body), headers={'Content-Type': 'application/json'})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+
+def sequential_cycle(conn, steps):
+    """Um POST /angle por movimento; a espera é feita no cliente"""
+    requests = 0
+    for step in steps:
+        if step['op'] == 'angle':
+            post(conn, '/angle', {'angle': step['angle']})
+            requests += 1
+        else:
+            time.sleep(step['ms'] / 1000.0)
+    return requests
+
+
+def summary(values):
+    values = sorted(values)
+    return {'p50': round(percentile(values, 50), 3), 'p95': round(percentile(values, 95), 3),
+            'max': round(values[-1], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="POST /angle sequenciais x POST /batch")
+    parser.add_argument('--cycles', type=int, default=20, help="Ciclos medidos em cada modo")
+    parser.add_argument('--openings', type=int, default=4, help="Aberturas por ciclo")
+    parser.add_argument('--dwell-ms', type=float, default=50.0, help="Espera entre movimentos")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'])
+    args = parser.parse_args()
+    
+    steps = release_steps(args.openings, args.dwell_ms)
+    nominal_ms = 2 * args.openings * args.dwell_ms
+    
+    # Sem a fila de movimento: cada POST /angle aplica o ângulo (com assentamento)
+    with ServerProcess({'http': {'engine': args.engine}, 'motion': {'coalesce': False}}) as server:
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=60)
+        
+        sequential = []
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            requests = sequential_cycle(conn, steps)
+            sequential.append((time.perf_counter() - start) * 1000.0)
+        
+        batched = []
+        lateness = []
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            status, result = post(conn, '/batch', {'steps': steps})
+            batched.append((time.perf_counter() - start) * 1000.0)
+            if status != 200:
+                raise SystemExit(f"POST /batch falhou: {result}")
+            lateness += [s['lateness_ms'] for s in result['steps'] if s['op'] != 'dwell']
+            lateness += [abs(s['duration_ms'] - args.dwell_ms) for s in result['steps'] if s['op'] == 'dwell']
+        conn.close()
+    
+    print(json.dumps({
+        'steps_per_cycle': len(steps),
+        'nominal_cycle_ms': nominal_ms,
+        'sequential': {'round_trips': requests, 'cycle_ms': summary(sequential)},
+        'batch': {'round_trips': 1, 'cycle_ms': summary(batched), 'step_timing_error_ms': summary(lateness)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
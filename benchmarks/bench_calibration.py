@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Custo da conversão ângulo → pulsewidth: cálculo linear em ponto flutuante
+(implementação anterior), consulta à tabela pré-calculada e interpolação
+direta na curva de calibração (sem tabela). Mede também o tempo de compilar
+a tabela de uma curva.
+
+Uso:
+    python3 benchmarks/bench_calibration.py [--iterations 200000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from bisect import bisect_right
+
+from common import SERVICE_DIR
+
+sys.path.insert(0, SERVICE_DIR)
+import calibration  # noqa: E402
+
+# Curva típica de um servo medido na bancada
+POINTS = [(0, 560), (30, 880), (60, 1210), (90, 1520), (120, 1840), (150, 2150), (180, 2440)]
+
+
+def float_linear(angle, frequency=50, min_duty=2.5, max_duty=12.5):
+    """Conversão linear como era feita a cada chamada"""
+    angle = max(0, min(180, angle))
+    periodo_us = 1000000 / frequency
+    min_pw = (min_duty / 100.0) * periodo_us
+    max_pw = (max_duty / 100.0) * periodo_us
+    return int(min_pw + (angle / 180.0) * (max_pw - min_pw))
+
+
+def interpolate(angle, angles=tuple(a for a, _ in POINTS), pulses=tuple(p for _, p in POINTS)):
+    """Interpolação na curva a cada chamada (alternativa sem tabela)"""
+    angle = max(0, min(180, angle))
+    i = min(max(bisect_right(angles, angle) - 1, 0), len(angles) - 2)
+    a0, a1, p0, p1 = angles[i], angles[i + 1], pulses[i], pulses[i + 1]
+    return int(round(p0 + (angle - a0) * (p1 - p0) / (a1 - a0)))
+
+
+def per_call_ns(fn, angles):
+    start = time.perf_counter_ns()
+    for angle in angles:
+        fn(angle)
+    return (time.perf_counter_ns() - start) / len(angles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo da conversão ângulo → pulsewidth")
+    parser.add_argument('--iterations', type=int, default=200000, help="Conversões por medição")
+    args = parser.parse_args()
+    
+    angles = [(i * 7) % 1801 / 10.0 for i in range(args.iterations)]
+    linear = calibration.linear_table(50, 2.5, 12.5)
+    
+    start = time.perf_counter()
+    table = calibration.compile_table(POINTS)
+    compile_ms = (time.perf_counter() - start) * 1000.0
+    
+    # A tabela linear reproduz a conversão anterior nos ângulos inteiros
+    mismatches = sum(1 for a in range(181) if linear.lookup(a) != float_linear(a))
+    
+    report = {
+        'float_linear_ns': round(per_call_ns(float_linear, angles), 1),
+        'table_linear_ns': round(per_call_ns(linear.lookup, angles), 1),
+        'interpolate_curve_ns': round(per_call_ns(interpolate, angles), 1),
+        'table_curve_ns': round(per_call_ns(table.lookup, angles), 1),
+        'compile_table_ms': round(compile_ms, 3),
+        'table_bytes': table.values.itemsize * len(table.values),
+        'linear_mismatches_integer_angles': mismatches,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Liberação periódica: laço com sleep relativo (como o sweep_worker original:
+set_angle com assentamento de 100ms seguido de time.sleep) x
+PeriodicDispenser com deadlines absolutos.
+
+No próprio processo, com o servo simulado, mede o instante de cada
+abertura em relação ao cronograma ideal (t0 + i * período): atraso por ciclo
+e deriva acumulada no último ciclo. Com --stall-ms, uma thread segura o lock
+do servo no meio da execução para comparar as políticas skip e catch_up.
+
+Uso:
+    python3 benchmarks/bench_dispense.py [--cycles 60] [--rate 240] [--hold-ms 100] [--stall-ms 600]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from common import SERVICE_DIR, percentile
+
+sys.path.insert(0, SERVICE_DIR)
+from dispenser import POLICY_CATCH_UP, POLICY_SKIP, PeriodicDispenser  # noqa: E402
+from servo_control import ServoControl  # noqa: E402
+
+
+def stall_servo(servo, at_s, stall_s):
+    """Segura o lock do servo por stall_s, at_s após o início"""
+    def hold():
+        time.sleep(at_s)
+        with servo.lock:
+            time.sleep(stall_s)
+    thread = threading.Thread(target=hold, daemon=True)
+    thread.start()
+    return thread
+
+
+def summary_us(values):
+    values = sorted(values)
+    return {'p50': round(percentile(values, 50), 1), 'p99': round(percentile(values, 99), 1),
+            'max': round(values[-1], 1)}
+
+
+def relative_sleep(servo, cycles, period_s, hold_s, stall_s):
+    """Laço original: cada espera conta a partir do fim do passo anterior"""
+    if stall_s:
+        stall_servo(servo, cycles * period_s / 2, stall_s)
+    opens = []
+    t0 = time.monotonic()
+    for _ in range(cycles):
+        opens.append(time.monotonic() - t0)
+        servo.set_angle(120)
+        time.sleep(hold_s)
+        servo.set_angle(60)
+        time.sleep(period_s - hold_s)
+    errors = [(t - i * period_s) * 1e6 for i, t in enumerate(opens)]
+    return {'cycles_done': cycles, 'timing_error_us': summary_us(errors),
+            'drift_last_cycle_ms': round(errors[-1] / 1000, 1)}
+
+
+def deadline_dispenser(servo, cycles, rate, hold_ms, policy, stall_s):
+    dispenser = PeriodicDispenser(servo, policy=policy)
+    period_s = 60.0 / rate
+    if stall_s:
+        stall_servo(servo, cycles * period_s / 2, stall_s)
+    dispenser.start({'rate_per_min': rate, 'hold_ms': hold_ms, 'cycles': cycles})
+    dispenser.thread.join()
+    status = dispenser.status()
+    errors = list(dispenser.errors_us)
+    return {'cycles_done': status['cycles_done'], 'cycles_skipped': status['cycles_skipped'],
+            'timing_error_us': summary_us(errors), 'drift_last_cycle_ms': round(errors[-1] / 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sleep relativo x deadlines absolutos na liberação periódica")
+    parser.add_argument('--cycles', type=int, default=60, help="Ciclos por modo")
+    parser.add_argument('--rate', type=float, default=240.0, help="Ciclos por minuto")
+    parser.add_argument('--hold-ms', type=float, default=100.0, help="Tempo aberto por ciclo")
+    parser.add_argument('--stall-ms', type=float, default=0.0,
+                        help="Lock do servo ocupado no meio da execução (0: sem travamento)")
+    args = parser.parse_args()
+    
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0001})
+    servo._log_info = lambda message: None
+    period_s = 60.0 / args.rate
+    stall_s = args.stall_ms / 1000.0
+    
+    results = {
+        'relative_sleep': relative_sleep(servo, args.cycles, period_s, args.hold_ms / 1000.0, stall_s),
+        'deadline_skip': deadline_dispenser(servo, args.cycles, args.rate, args.hold_ms, POLICY_SKIP, stall_s),
+        'deadline_catch_up': deadline_dispenser(servo, args.cycles, args.rate, args.hold_ms,
+                                                POLICY_CATCH_UP, stall_s),
+    }
+    servo.cleanup()
+    
+    print(json.dumps({
+        'cycles': args.cycles,
+        'rate_per_min': args.rate,
+        'period_ms': round(period_s * 1000, 1),
+        'stall_ms': args.stall_ms,
+        'modes': results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
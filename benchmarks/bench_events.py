@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latência de notificação de mudanças de ângulo: stream SSE (GET /events),
+long-poll (GET /status?since=) e polling de /status em intervalo fixo.
+Mede o tempo entre o envio de POST /angle e a chegada do novo estado, e o
+número de requisições feitas por cada cliente.
+
+Uso:
+    python3 benchmarks/bench_events.py [--count 100] [--poll-interval-ms 200]
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import threading
+import time
+
+from common import ServerProcess, percentile
+
+
+class SSEClient:
+    """Lê eventos "state" de GET /events em uma thread e registra o instante de chegada"""
+    
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port), timeout=10)
+        self.sock.sendall(b'GET /events HTTP/1.1\r\nHost: bench\r\n\r\n')
+        self.arrivals = {}  # ângulo -> perf_counter
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        buffer = b''
+        try:
+            while True:
+                data = self.sock.recv(4096)
+                if not data:
+                    return
+                buffer += data
+                while b'\n\n' in buffer:
+                    event, buffer = buffer.split(b'\n\n', 1)
+                    for line in event.split(b'\n'):
+                        if line.startswith(b'data: '):
+                            self.arrivals.setdefault(json.loads(line[6:])['servo_angle'], time.perf_counter())
+        except OSError:
+            return
+    
+    def close(self):
+        self.sock.close()
+
+
+class LongPollClient:
+    """Encadeia GET /status?since=<versão> em uma conexão persistente"""
+    
+    def __init__(self, host, port):
+        self.conn = http.client.HTTPConnection(host, port, timeout=60)
+        self.arrivals = {}
+        self.requests = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        version = 0
+        try:
+            while self.running:
+                self.conn.request('GET', f'/status?since={version}&timeout=5')
+                state = json.loads(self.conn.getresponse().read())
+                self.requests += 1
+                version = state['state_version']
+                self.arrivals.setdefault(state['servo_angle'], time.perf_counter())
+        except (OSError, http.client.HTTPException):
+            # Servidor encerrado
+            return
+
+
+class PollingClient:
+    """Consulta GET /status a cada intervalo (comportamento anterior dos dashboards)"""
+    
+    def __init__(self, host, port, interval_s):
+        self.conn = http.client.HTTPConnection(host, port, timeout=10)
+        self.interval_s = interval_s
+        self.arrivals = {}
+        self.requests = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        try:
+            while self.running:
+                self.conn.request('GET', '/status')
+                state = json.loads(self.conn.getresponse().read())
+                self.requests += 1
+                self.arrivals.setdefault(state['servo_angle'], time.perf_counter())
+                time.sleep(self.interval_s)
+        except (OSError, http.client.HTTPException):
+            # Servidor encerrado
+            return
+
+
+def latency_summary(sent, arrivals):
+    latencies = sorted((arrivals[a] - t) * 1000.0 for a, t in sent.items() if a in arrivals)
+    return {
+        'received': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de notificação de mudanças")
+    parser.add_argument('--count', type=int, default=100, help="Mudanças de ângulo enviadas")
+    parser.add_argument('--gap-ms', type=float, default=100.0, help="Intervalo entre mudanças")
+    parser.add_argument('--poll-interval-ms', type=float, default=200.0, help="Intervalo do cliente de polling")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'])
+    args = parser.parse_args()
+    
+    # Sem a fila de movimento: o estado muda antes da resposta do POST
+    with ServerProcess({'http': {'engine': args.engine}, 'motion': {'coalesce': False}}) as server:
+        sse = SSEClient(server.host, server.port)
+        long_poll = LongPollClient(server.host, server.port)
+        polling = PollingClient(server.host, server.port, args.poll_interval_ms / 1000.0)
+        time.sleep(0.5)
+        
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=10)
+        sent = {}
+        for i in range(args.count):
+            angle = 10 + (i % 160)
+            if angle in sent:
+                break
+            sent[angle] = time.perf_counter()
+            conn.request('POST', '/angle', body=json.dumps({'angle': angle}),
+                         headers={'Content-Type': 'application/json'})
+            conn.getresponse().read()
+            time.sleep(args.gap_ms / 1000.0)
+        time.sleep(args.poll_interval_ms / 1000.0 + 0.2)
+        
+        duration_s = len(sent) * args.gap_ms / 1000.0
+        report = {
+            'changes': len(sent),
+            'sse': latency_summary(sent, sse.arrivals),
+            'long_poll': dict(latency_summary(sent, long_poll.arrivals), requests=long_poll.requests),
+            'polling': dict(latency_summary(sent, polling.arrivals), requests=polling.requests,
+                            requests_per_s=round(polling.requests / duration_s, 1)),
+        }
+        long_poll.running = polling.running = False
+        sse.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
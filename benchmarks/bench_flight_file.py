@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Carregamento de um plano de voo grande: .json compilado na carga (json.load
+e validação de todos os eventos) x .tfp mapeado por mmap com índice
+lateral. Mede o tempo de carga, o pico de memória alocada e o tempo para
+achar o ponto de retomada no meio do plano.
+
+Uso:
+    python3 benchmarks/bench_flight_file.py [--events 50000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import SERVICE_DIR
+
+sys.path.insert(0, SERVICE_DIR)
+import flight_file  # noqa: E402
+import mission  # noqa: E402
+
+
+def measure_load(path, repeat):
+    """Tempo médio de carga (ms) e pico de memória da carga (KiB)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        plan = mission.load_plan(path)
+        times.append((time.perf_counter() - start) * 1000.0)
+        if plan.flight_file:
+            plan.flight_file.close()
+    tracemalloc.start()
+    plan = mission.load_plan(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return plan, round(sum(times) / len(times), 3), peak // 1024
+
+
+def measure_seek(plan, count=1000):
+    """Tempo médio (µs) para achar a primeira ação a partir de um instante"""
+    duration_ns = plan.offsets_ns[-1]
+    start = time.perf_counter()
+    for i in range(count):
+        plan.seek(0, duration_ns * i // count)
+    return round((time.perf_counter() - start) * 1e6 / count, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de plano .json x .tfp")
+    parser.add_argument('--events', type=int, default=50000, help="Eventos de liberação no plano")
+    parser.add_argument('--repeat', type=int, default=3, help="Cargas medidas por formato")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'campo.json')
+        with open(source, 'w') as f:
+            json.dump({'name': 'campo', 'mode': 'timed', 'rest_angle': 60,
+                       'events': [{'t': i * 0.5, 'angle': 120, 'hold_ms': 150} for i in range(args.events)]}, f)
+        
+        start = time.perf_counter()
+        compiled = flight_file.convert(source)
+        convert_ms = (time.perf_counter() - start) * 1000.0
+        
+        report = {'events': args.events, 'convert_ms': round(convert_ms, 1)}
+        for label, path in (('json', source), ('tfp', compiled)):
+            plan, load_ms, peak_kib = measure_load(path, args.repeat)
+            report[label] = {
+                'file_kib': os.path.getsize(path) // 1024,
+                'load_ms': load_ms,
+                'peak_alloc_kib': peak_kib,
+                'seek_us': measure_seek(plan),
+            }
+            if plan.flight_file:
+                plan.flight_file.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
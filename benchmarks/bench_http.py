@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de ponta a ponta do caminho de controle HTTP.
+
+Inicia service/http_server.py com o servo simulado e exercita cada endpoint
+(/ping, /status, GET/POST /angle, /stop, /calibrate, /metrics) com concorrência e taxa
+configuráveis. Reporta vazão, latência p50/p95/p99 e tempo de CPU do
+servidor por requisição em JSON.
+
+Uso:
+    python3 benchmarks/bench_http.py [--engine asyncio] [--concurrency 4] [--rate 0] \\
+        [--duration 5] [--scenarios ping,status] [--keep-alive] [--output resultado.json]
+    
+    --rate 0 executa em malha fechada (o mais rápido possível); --rate N limita
+    a N requisições/s no total, distribuídas entre os clientes.
+"""
+
+import argparse
+import http.client
+import json
+import platform
+import random
+import threading
+import time
+
+from common import ServerProcess, request, summarize
+
+
+# Nome -> (método, caminho, gerador de body)
+SCENARIOS = {
+    'ping': ('GET', '/ping', None),
+    'status': ('GET', '/status', None),
+    'get_angle': ('GET', '/angle', None),
+    'set_angle': ('POST', '/angle', lambda: {'angle': random.randint(0, 180)}),
+    'stop': ('POST', '/stop', None),
+    'calibrate': ('POST', '/calibrate', None),
+    'metrics': ('GET', '/metrics', None),
+}
+
+# Taxa padrão de cenários que disparam movimentos longos (req/s)
+DEFAULT_RATES = {'calibrate': 2.0}
+
+
+def run_scenario(server, name, concurrency, rate, duration_s, keep_alive=False):
+    """
+    Executa um cenário e retorna o resumo com CPU do servidor por requisição.
+    
+    Args:
+        server: ServerProcess em execução
+        name: Nome do cenário (chave de SCENARIOS)
+        concurrency: Número de clientes
+        rate: Requisições/s no total (0 = malha fechada)
+        duration_s: Duração do cenário
+        keep_alive: Reutiliza uma conexão HTTP/1.1 por cliente
+    """
+    method, path, body_fn = SCENARIOS[name]
+    samples = []
+    lock = threading.Lock()
+    interval = concurrency / rate if rate > 0 else 0.0
+    start = time.monotonic()
+    deadline = start + duration_s
+    cpu_before = server.cpu_s()
+    
+    def client(index):
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=30.0) if keep_alive else None
+        # Desloca os clientes para espalhar as requisições no intervalo
+        next_send = start + (interval * index / concurrency if interval else 0.0)
+        while True:
+            if interval:
+                now = time.monotonic()
+                if next_send > now:
+                    time.sleep(next_send - now)
+                next_send += interval
+            if time.monotonic() >= deadline:
+                break
+            try:
+                sample = request(server.host, server.port, method, path,
+                                 body=body_fn() if body_fn else None, conn=conn)
+            except (OSError, http.client.HTTPException):
+                sample = (599, 0.0, None)
+                if conn:
+                    conn.close()
+            with lock:
+                samples.append(sample)
+        if conn:
+            conn.close()
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    elapsed = time.monotonic() - start
+    cpu_used = server.cpu_s() - cpu_before
+    result = summarize(samples, elapsed)
+    result['concurrency'] = concurrency
+    result['target_rate_rps'] = rate
+    result['keep_alive'] = keep_alive
+    result['server_cpu_ms_per_request'] = round(cpu_used * 1000.0 / len(samples), 4) if samples else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do caminho de controle HTTP")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'],
+                        help="Motor do servidor HTTP")
+    parser.add_argument('--concurrency', type=int, default=4, help="Clientes concorrentes")
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="Requisições/s no total por cenário (0 = malha fechada)")
+    parser.add_argument('--duration', type=float, default=5.0, help="Duração de cada cenário (s)")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help="Cenários separados por vírgula")
+    parser.add_argument('--rtt-us', type=float, default=150.0,
+                        help="Custo simulado de cada comando ao pigpiod (us)")
+    parser.add_argument('--keep-alive', action='store_true',
+                        help="Reutiliza uma conexão HTTP/1.1 por cliente")
+    parser.add_argument('--output', help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+    
+    names = [n.strip() for n in args.scenarios.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"Cenários desconhecidos: {', '.join(unknown)}")
+    
+    overrides = {
+        'http': {'engine': args.engine},
+        'servo': {'simulation': {'rtt_s': args.rtt_us / 1000000.0}},
+    }
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'engine': args.engine,
+        'duration_s': args.duration,
+        'scenarios': {},
+    }
+    
+    with ServerProcess(overrides) as server:
+        for name in names:
+            rate = args.rate or DEFAULT_RATES.get(name, 0.0)
+            report['scenarios'][name] = run_scenario(server, name, args.concurrency, rate, args.duration,
+                                                      keep_alive=args.keep_alive)
+            # Interrompe movimentos disparados pelo cenário antes do próximo
+            request(server.host, server.port, 'POST', '/stop')
+    
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
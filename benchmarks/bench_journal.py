@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Custo do journal de atuação no caminho de set_angle.
+
+Compara, no próprio processo e com o servo simulado:
+    - ActuationJournal.append isolado x uma linha de log formatada
+      ("Servo movido para ...") escrita em arquivo
+    - set_angle sem journal x com journal
+Mede também a leitura de registros (GET /journal) a partir de um cursor.
+
+Uso:
+    python3 benchmarks/bench_journal.py [--count 20000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from common import SERVICE_DIR, percentile
+
+sys.path.insert(0, SERVICE_DIR)
+from journal import SOURCE_API, ActuationJournal  # noqa: E402
+from servo_control import ServoControl  # noqa: E402
+
+
+def per_call_us(func, count):
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return round((time.perf_counter() - start) * 1e6 / count, 3)
+
+
+def set_angle_latency_us(servo, count):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        servo.set_angle(i % 181, settle=False)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    return {'p50': round(percentile(latencies, 50), 2), 'p99': round(percentile(latencies, 99), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo do journal de atuação")
+    parser.add_argument('--count', type=int, default=20000, help="Registros por medição")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(prefix='tricho-bench-') as tmpdir:
+        journal = ActuationJournal(os.path.join(tmpdir, 'journal.bin'))
+        
+        # Linha de texto equivalente, com o mesmo FileHandler do logger do serviço
+        text_logger = logging.getLogger('bench-journal')
+        text_logger.propagate = False
+        handler = logging.FileHandler(os.path.join(tmpdir, 'service.log'))
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        text_logger.addHandler(handler)
+        text_logger.setLevel(logging.INFO)
+        
+        append_us = per_call_us(lambda i: journal.append(SOURCE_API, i % 181, 500 + i % 2000), args.count)
+        log_line_us = per_call_us(
+            lambda i: text_logger.info(f"Servo movido para {i % 181}° (pulsewidth: {500 + i % 2000}us)"),
+            args.count)
+        handler.close()
+        
+        # set_angle sem logger (só o custo do journal), com e sem journal
+        plain = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0})
+        plain._log_info = lambda message: None
+        journaled = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0}, journal=journal)
+        journaled._log_info = lambda message: None
+        without = set_angle_latency_us(plain, args.count)
+        with_journal = set_angle_latency_us(journaled, args.count)
+        
+        since = journal.next_seq - 1001
+        start = time.perf_counter()
+        page = journal.read(since, limit=1000)
+        read_ms = (time.perf_counter() - start) * 1000.0
+        journal.close()
+    
+    print(json.dumps({
+        'records': args.count,
+        'append_us': append_us,
+        'text_log_line_us': log_line_us,
+        'set_angle_us': {'without_journal': without, 'with_journal': with_journal},
+        'read_1000_records_ms': round(read_ms, 3),
+        'records_read': len(page['records']),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compara conexões persistentes (HTTP/1.1 keep-alive) com uma conexão TCP
+por requisição no envio de comandos de ângulo (POST /angle) e em /status.
+
+Uso:
+    python3 benchmarks/bench_keepalive.py [--engine asyncio] [--concurrency 2] [--duration 5]
+"""
+
+import argparse
+import json
+
+from bench_http import run_scenario
+from common import ServerProcess, request
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep-alive x conexão por requisição")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'],
+                        help="Motor do servidor HTTP")
+    parser.add_argument('--concurrency', type=int, default=2, help="Clientes concorrentes")
+    parser.add_argument('--duration', type=float, default=5.0, help="Duração de cada medição (s)")
+    parser.add_argument('--scenarios', default='set_angle,status', help="Cenários separados por vírgula")
+    args = parser.parse_args()
+    
+    report = {'engine': args.engine, 'concurrency': args.concurrency, 'scenarios': {}}
+    with ServerProcess({'http': {'engine': args.engine, 'keep_alive': True}}) as server:
+        for name in [n.strip() for n in args.scenarios.split(',') if n.strip()]:
+            per_request = run_scenario(server, name, args.concurrency, 0.0, args.duration)
+            persistent = run_scenario(server, name, args.concurrency, 0.0, args.duration, keep_alive=True)
+            request(server.host, server.port, 'POST', '/stop')
+            
+            report['scenarios'][name] = {
+                'connection_per_request': per_request,
+                'keep_alive': persistent,
+                'speedup_rps': round(persistent['throughput_rps'] / per_request['throughput_rps'], 2)
+                if per_request.get('throughput_rps') else None,
+                'p50_latency_reduction_ms': round(
+                    per_request['latency_ms']['p50'] - persistent['latency_ms']['p50'], 3),
+            }
+    
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latência de ServoControl.set_angle com logging síncrono e assíncrono.
+
+Executa no próprio processo com o servo simulado. O console pode ser
+desacelerado (--console-delay-ms) para reproduzir um journal ou cartão SD
+lento; o arquivo de log fica em um diretório temporário.
+
+Uso:
+    python3 benchmarks/bench_logging.py [--count 2000] [--console-delay-ms 2]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from common import SERVICE_DIR, percentile
+
+sys.path.insert(0, SERVICE_DIR)
+from logger import TrichoLogger  # noqa: E402
+from servo_control import ServoControl  # noqa: E402
+
+
+class SlowStream:
+    """Console que leva delay_s por escrita"""
+    
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+    
+    def write(self, text):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        return len(text)
+    
+    def flush(self):
+        pass
+
+
+def measure(async_mode, count, console_delay_s, queue_size, drop_policy, rtt_s):
+    with tempfile.TemporaryDirectory(prefix='tricho-bench-') as tmpdir:
+        stderr = sys.stderr
+        sys.stderr = SlowStream(console_delay_s)  # Capturado pelo StreamHandler
+        try:
+            logger = TrichoLogger(os.path.join(tmpdir, 'service.log'), 'INFO', async_mode=async_mode,
+                                  queue_size=queue_size, drop_policy=drop_policy)
+        finally:
+            sys.stderr = stderr
+        
+        servo = ServoControl(pin=4, logger=logger, backend='simulated', simulation={'rtt_s': rtt_s})
+        latencies = []
+        for i in range(count):
+            start = time.perf_counter()
+            servo.set_angle(i % 181, settle=False)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        
+        flush_start = time.perf_counter()
+        logger.flush()
+        flush_ms = (time.perf_counter() - flush_start) * 1000.0
+        stats = logger.stats()
+        servo.cleanup()
+    
+    latencies.sort()
+    result = {
+        'calls': count,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 4),
+            'p95': round(percentile(latencies, 95), 4),
+            'p99': round(percentile(latencies, 99), 4),
+            'max': round(latencies[-1], 4),
+        },
+        'flush_ms': round(flush_ms, 2),
+    }
+    if async_mode:
+        result['dropped'] = stats['dropped']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="set_angle com logging síncrono x assíncrono")
+    parser.add_argument('--count', type=int, default=2000, help="Chamadas de set_angle por medição")
+    parser.add_argument('--console-delay-ms', type=float, default=0.0,
+                        help="Atraso simulado por escrita no console (ms)")
+    parser.add_argument('--queue-size', type=int, default=1000, help="Capacidade da fila assíncrona")
+    parser.add_argument('--drop-policy', default='drop_new', choices=['drop_new', 'drop_oldest'])
+    parser.add_argument('--rtt-us', type=float, default=150.0,
+                        help="Custo simulado de cada comando ao pigpiod (us)")
+    args = parser.parse_args()
+    
+    delay_s = args.console_delay_ms / 1000.0
+    rtt_s = args.rtt_us / 1000000.0
+    report = {
+        'console_delay_ms': args.console_delay_ms,
+        'sync': measure(False, args.count, delay_s, args.queue_size, args.drop_policy, rtt_s),
+        'async': measure(True, args.count, delay_s, args.queue_size, args.drop_policy, rtt_s),
+    }
+    report['p50_reduction_ms'] = round(report['sync']['latency_ms']['p50'] - report['async']['latency_ms']['p50'], 4)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Custo das métricas no caminho quente: incremento de contador, observação de
+histograma (com e sem concorrência) e geração do texto de GET /metrics.
+
+Uso:
+    python3 benchmarks/bench_metrics.py [--iterations 200000] [--threads 4]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from common import SERVICE_DIR
+
+sys.path.insert(0, SERVICE_DIR)
+import metrics  # noqa: E402
+
+
+def per_call_ns(fn, iterations):
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def concurrent_ns(fn, iterations, threads):
+    """Tempo médio por chamada com várias threads disputando a mesma série"""
+    barrier = threading.Barrier(threads + 1)
+    
+    def worker():
+        barrier.wait()
+        for _ in range(iterations):
+            fn()
+    
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for w in workers:
+        w.join()
+    return (time.perf_counter_ns() - start) / (iterations * threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo das métricas")
+    parser.add_argument('--iterations', type=int, default=200000, help="Chamadas por medição")
+    parser.add_argument('--threads', type=int, default=4, help="Threads na medição concorrente")
+    args = parser.parse_args()
+    
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter('bench_total', 'Contador', ('route',)).labels('/angle')
+    histogram = registry.histogram('bench_seconds', 'Histograma', ('route',)).labels('/angle')
+    labeled = registry.histogram('bench_labeled_seconds', 'Histograma com lookup de labels', ('method', 'route'))
+    
+    report = {
+        'counter_inc_ns': round(per_call_ns(counter.inc, args.iterations), 1),
+        'histogram_observe_ns': round(per_call_ns(lambda: histogram.observe(0.0003), args.iterations), 1),
+        'histogram_labels_observe_ns': round(
+            per_call_ns(lambda: labeled.labels('POST', '/angle').observe(0.0003), args.iterations), 1),
+        'histogram_observe_concurrent_ns': round(
+            concurrent_ns(lambda: histogram.observe(0.0003), args.iterations // args.threads, args.threads), 1),
+    }
+    
+    # Registro do serviço com uma série por rota
+    for route in ('/', '/ping', '/status', '/angle', '/jobs', '/jobs/<id>', '/calibrate', '/sweep', '/stop'):
+        for method in ('GET', 'POST'):
+            metrics.HTTP_REQUESTS.labels(method, route, 200).inc()
+            metrics.HTTP_DURATION.labels(method, route).observe(0.001)
+    start = time.perf_counter()
+    text = metrics.REGISTRY.render()
+    report['render_ms'] = round((time.perf_counter() - start) * 1000.0, 3)
+    report['render_bytes'] = len(text)
+    
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precisão de temporização de uma missão: o mesmo plano de liberação
+executado pelo motor de missões (POST /missions/start) e por um cliente que
+envia POST /angle no horário de cada evento. Mede o atraso de cada ação em
+relação ao cronograma.
+
+Uso:
+    python3 benchmarks/bench_mission.py [--events 200] [--interval-ms 50] [--hold-ms 20]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import tempfile
+import time
+
+from common import ServerProcess, percentile
+
+
+def build_plan(events, interval_ms, hold_ms):
+    return {
+        'name': 'bench',
+        'mode': 'timed',
+        'rest_angle': 60,
+        'events': [{'t': i * interval_ms / 1000.0, 'angle': 120, 'hold_ms': hold_ms} for i in range(events)],
+    }
+
+
+def post(conn, path, body=None):
+    conn.request('POST', path, body=json.dumps(body or {}), headers={'Content-Type': 'application/json'})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+
+def get(conn, path):
+    conn.request('GET', path)
+    return json.loads(conn.getresponse().read())
+
+
+def summary_us(values):
+    values = sorted(values)
+    return {'p50': round(percentile(values, 50), 1), 'p99': round(percentile(values, 99), 1),
+            'max': round(values[-1], 1)}
+
+
+def client_paced(conn, plan):
+    """Cliente envia POST /angle no horário de cada ação"""
+    actions = []
+    for event in plan['events']:
+        actions.append((event['t'], event['angle']))
+        actions.append((event['t'] + event['hold_ms'] / 1000.0, plan['rest_angle']))
+    errors = []
+    t0 = time.perf_counter()
+    for t, angle in actions:
+        remaining = t0 + t - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+        post(conn, '/angle', {'angle': angle})
+        # Conta até a resposta (a fila de movimento aplica o ângulo no próximo quadro)
+        errors.append((time.perf_counter() - t0 - t) * 1e6)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atraso das ações: motor de missões x cliente")
+    parser.add_argument('--events', type=int, default=200, help="Eventos de liberação no plano")
+    parser.add_argument('--interval-ms', type=float, default=50.0, help="Intervalo entre eventos")
+    parser.add_argument('--hold-ms', type=float, default=20.0, help="Tempo aberto de cada evento")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'])
+    args = parser.parse_args()
+    
+    plan = build_plan(args.events, args.interval_ms, args.hold_ms)
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'bench.json'), 'w') as f:
+            json.dump(plan, f)
+        
+        overrides = {'http': {'engine': args.engine}, 'mission': {'directory': directory}}
+        with ServerProcess(overrides) as server:
+            conn = http.client.HTTPConnection(server.host, server.port, timeout=60)
+            
+            status, loaded = post(conn, '/missions/load', {'file': 'bench.json'})
+            if status != 200:
+                raise SystemExit(f"POST /missions/load falhou: {loaded}")
+            post(conn, '/missions/start')
+            while get(conn, '/missions/current')['state'] == 'running':
+                time.sleep(0.2)
+            report = get(conn, '/missions/report?limit=1000000')
+            mission_errors = [row['error_us'] for row in report['actions']]
+            
+            client_errors = client_paced(conn, plan)
+            conn.close()
+    
+    print(json.dumps({
+        'actions': len(mission_errors),
+        'plan_memory_bytes': loaded['plan']['memory_bytes'],
+        'mission_timing_error_us': summary_us(mission_errors),
+        'client_paced_timing_error_us': summary_us(client_errors),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
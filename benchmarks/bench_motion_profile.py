@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ciclo do dispensador (abre e fecha) com sweep em passos fixos x perfis
+trapezoidal e S-curve.
+
+No próprio processo, com o servo simulado, mede a duração do ciclo e, no
+comando enviado ao servo (um ângulo por frame PWM), a maior variação por
+frame e os picos de velocidade e aceleração pedidos.
+
+Uso:
+    python3 benchmarks/bench_motion_profile.py [--cycles 5] [--closed 60] [--open 120]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from common import SERVICE_DIR, percentile
+
+sys.path.insert(0, SERVICE_DIR)
+from motion_profile import PROFILES, PROFILE_STEP  # noqa: E402
+from servo_control import ServoControl  # noqa: E402
+from sweep_engine import frames_for  # noqa: E402
+
+
+def run_sweep(servo, from_angle, to_angle, profile, step, delay_s):
+    finished = threading.Event()
+    servo.sweep(from_angle, to_angle, delay_s, step=step, profile=profile,
+                on_finish=lambda completed: finished.set())
+    finished.wait()
+
+
+def command_peaks(servo, closed, opened, profile, step, delay_s):
+    """Comando por frame PWM de meio ciclo: maior salto e picos de velocidade/aceleração"""
+    frame_s = 1.0 / servo.frequency
+    angles, step_period_s = servo.sweep_plan(closed, opened, delay_s, step, profile)
+    per_frame = []
+    for angle in angles:
+        per_frame += [angle] * frames_for(step_period_s, int(round(frame_s * 1e6)))
+    velocities = [(b - a) / frame_s for a, b in zip(per_frame, per_frame[1:])]
+    accels = [(b - a) / frame_s for a, b in zip([0.0] + velocities, velocities + [0.0])]
+    return {
+        'max_jump_deg': round(max(abs(b - a) for a, b in zip(angles, angles[1:])), 2),
+        'peak_velocity_deg_s': round(max(abs(v) for v in velocities), 1),
+        'peak_accel_deg_s2': round(max(abs(a) for a in accels), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep em passos x perfis trapezoid/scurve")
+    parser.add_argument('--cycles', type=int, default=5, help="Ciclos medidos por perfil")
+    parser.add_argument('--closed', type=float, default=60.0, help="Ângulo fechado")
+    parser.add_argument('--open', type=float, default=120.0, help="Ângulo aberto")
+    parser.add_argument('--step', type=float, default=10.0, help="Passo do sweep em graus (perfil step)")
+    parser.add_argument('--delay-s', type=float, default=0.0, help="Delay entre passos (perfil step)")
+    parser.add_argument('--engine', default='wave', choices=['wave', 'software'])
+    args = parser.parse_args()
+    
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0}, sweep_engine=args.engine)
+    servo._log_info = lambda message: None
+    
+    results = {}
+    for profile in PROFILES:
+        run_sweep(servo, args.closed, args.closed, PROFILE_STEP, args.step, 0.0)
+        cycles = []
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            run_sweep(servo, args.closed, args.open, profile, args.step, args.delay_s)
+            run_sweep(servo, args.open, args.closed, profile, args.step, args.delay_s)
+            cycles.append((time.perf_counter() - start) * 1000.0)
+        cycles.sort()
+        results[profile] = dict(
+            {'cycle_ms': {'p50': round(percentile(cycles, 50), 1), 'max': round(cycles[-1], 1)}},
+            **command_peaks(servo, args.closed, args.open, profile, args.step, args.delay_s))
+    servo.cleanup()
+    
+    print(json.dumps({
+        'engine': args.engine,
+        'travel_deg': abs(args.open - args.closed),
+        'limits': {'max_velocity_deg_s': servo.max_velocity_deg_s, 'max_accel_deg_s2': servo.max_accel_deg_s2},
+        'profiles': results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
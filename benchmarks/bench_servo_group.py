@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vários servos movidos juntos: POST /servos/<id>/angle sequenciais x um
+único POST /servos/angles.
+
+Com o servo simulado e um grupo de N servos, mede a duração da operação e
+a defasagem entre o primeiro e o último pulso aplicado (t_ns dos registros
+do journal de atuação).
+
+Uso:
+    python3 benchmarks/bench_servo_group.py [--servos 4] [--rounds 20]
+"""
+
+import argparse
+import http.client
+import json
+import time
+
+from common import ServerProcess, percentile
+
+
+def post(conn, path, body):
+    conn.request('POST', path, body=json.dumps(body), headers={'Content-Type': 'application/json'})
+    resp = conn.getresponse()
+    result = json.loads(resp.read())
+    if resp.status != 200:
+        raise SystemExit(f"POST {path} falhou: {result}")
+    return result
+
+
+def get(conn, path):
+    conn.request('GET', path)
+    resp = conn.getresponse()
+    return json.loads(resp.read())
+
+
+def journal_end(conn):
+    """Seq do último registro do journal (cursor para a próxima leitura)"""
+    page = get(conn, '/journal?limit=10000')
+    while page['records']:
+        page = get(conn, f"/journal?since={page['next']}&limit=10000")
+    return page['next']
+
+
+def skew_ms(conn, since, count):
+    """Defasagem entre o primeiro e o último pulso dos count registros após since"""
+    records = get(conn, f'/journal?since={since}&limit={count}')['records']
+    stamps = [record['t_ns'] for record in records]
+    return (max(stamps) - min(stamps)) / 1e6
+
+
+def summary(values):
+    values = sorted(values)
+    return {'p50': round(percentile(values, 50), 3), 'p95': round(percentile(values, 95), 3),
+            'max': round(values[-1], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="POST /servos/<id>/angle sequenciais x POST /servos/angles")
+    parser.add_argument('--servos', type=int, default=4, help="Servos no grupo")
+    parser.add_argument('--rounds', type=int, default=20, help="Movimentos do grupo em cada modo")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'])
+    args = parser.parse_args()
+    
+    ids = [f"s{i}" for i in range(args.servos)]
+    servos = [{'id': servo_id, 'pwm_pin': 4 + i} for i, servo_id in enumerate(ids)]
+    with ServerProcess({'http': {'engine': args.engine}, 'servos': servos}) as server:
+        conn = http.client.HTTPConnection(server.host, server.port, timeout=60)
+        
+        results = {}
+        for mode in ('sequential', 'group'):
+            durations = []
+            skews = []
+            for round_index in range(args.rounds):
+                angle = 60 if round_index % 2 else 120
+                since = journal_end(conn)
+                start = time.perf_counter()
+                if mode == 'sequential':
+                    for servo_id in ids:
+                        post(conn, f'/servos/{servo_id}/angle', {'angle': angle})
+                else:
+                    post(conn, '/servos/angles', {'angles': {servo_id: angle for servo_id in ids}})
+                durations.append((time.perf_counter() - start) * 1000.0)
+                skews.append(skew_ms(conn, since, len(ids)))
+            results[mode] = {
+                'round_trips': len(ids) if mode == 'sequential' else 1,
+                'duration_ms': summary(durations),
+                'pulse_skew_ms': summary(skews),
+            }
+        conn.close()
+    
+    print(json.dumps(dict({'servos': args.servos, 'rounds': args.rounds}, **results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tempo de partida do http_server.py (servo simulado).
+
+Para cada modo, inicia o servidor várias vezes e mede, a partir do
+lançamento do processo:
+    - first_response_ms: primeira resposta de GET /ping
+    - ready_ms: primeira resposta 200 de GET /angle (servo e componentes prontos)
+
+Modos:
+    legacy - sem partida rápida: YAML lido a cada partida, servos antes do
+             listener e homing em 90° (com assentamento)
+    fast   - config em cache (JSON), listener primeiro, servos em segundo
+             plano e última posição do journal (sem homing)
+
+Uso:
+    python3 benchmarks/bench_startup.py [--runs 10] [--engine asyncio]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from common import REPO_DIR, SERVICE_DIR, deep_merge, free_port, percentile
+
+MODES = {
+    'legacy': {'startup': {'fast_start': False, 'skip_homing': False}},
+    'fast': {'startup': {'fast_start': True, 'skip_homing': True}},
+}
+POLL_INTERVAL_S = 0.002
+
+
+def get_status(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+    try:
+        conn.request('GET', path)
+        resp = conn.getresponse()
+        resp.read()
+        return resp.status
+    finally:
+        conn.close()
+
+
+def start_once(config_path, port, use_snapshot, timeout_s=20.0):
+    """Um lançamento do servidor: (first_response_ms, ready_ms)"""
+    if not use_snapshot:
+        try:
+            os.remove(config_path + '.snapshot')
+        except OSError:
+            pass
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(SERVICE_DIR, 'http_server.py'), '--config', config_path],
+        cwd=SERVICE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first = ready = None
+    try:
+        deadline = start + timeout_s
+        while ready is None and time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Servidor encerrou na partida (código {proc.returncode})")
+            try:
+                if first is None:
+                    get_status(port, '/ping')
+                    first = (time.perf_counter() - start) * 1000.0
+                if get_status(port, '/angle') == 200:
+                    ready = (time.perf_counter() - start) * 1000.0
+            except OSError:
+                pass
+            if ready is None:
+                time.sleep(POLL_INTERVAL_S)
+        if ready is None:
+            raise RuntimeError("Servidor não ficou pronto a tempo")
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return first, ready
+
+
+def summary(values):
+    values = sorted(values)
+    return {'p50': round(percentile(values, 50), 1), 'min': round(values[0], 1), 'max': round(values[-1], 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo até a primeira resposta do http_server.py")
+    parser.add_argument('--runs', type=int, default=10, help="Partidas por modo")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'])
+    args = parser.parse_args()
+    
+    with open(os.path.join(REPO_DIR, 'config.yaml')) as f:
+        base = yaml.safe_load(f)
+    
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='tricho-bench-') as tmpdir:
+        for mode, overrides in MODES.items():
+            port = free_port()
+            config = deep_merge(base, {
+                'http': {'host': '127.0.0.1', 'port': port, 'engine': args.engine},
+                'servo': {'backend': 'simulated'},
+                'logging': {'logfile': os.path.join(tmpdir, f'{mode}.log')},
+                'journal': {'file': f'{mode}-journal.bin'},
+            })
+            config = deep_merge(config, overrides)
+            config_path = os.path.join(tmpdir, f'{mode}.yaml')
+            with open(config_path, 'w') as f:
+                yaml.safe_dump(config, f)
+            
+            # Primeira partida (cria journal e cópia do config) fora da medição
+            start_once(config_path, port, use_snapshot=mode == 'fast')
+            first, ready = [], []
+            for _ in range(args.runs):
+                first_ms, ready_ms = start_once(config_path, port, use_snapshot=mode == 'fast')
+                first.append(first_ms)
+                ready.append(ready_ms)
+            results[mode] = {'first_response_ms': summary(first), 'ready_ms': summary(ready)}
+    
+    print(json.dumps({'engine': args.engine, 'runs': args.runs, 'modes': results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Custo do polling de GET /status (e /ping, /) antes e depois do cache de
+respostas pré-serializadas.
+
+1. No processo: tempo do handler por requisição com a serialização a cada
+   chamada (comportamento anterior), com o corpo em cache e com 304.
+2. Ponta a ponta: polling em conexão persistente contra o servidor simulado,
+   sem e com If-None-Match, com CPU do servidor por requisição.
+
+Uso:
+    python3 benchmarks/bench_status_cache.py [--iterations 20000] [--count 2000]
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import time
+
+from common import SERVICE_DIR, ServerProcess, percentile, process_cpu_s
+
+sys.path.insert(0, SERVICE_DIR)
+from async_server import AsyncHTTPServer  # noqa: E402
+from http_server import ServoHTTPHandler  # noqa: E402
+from servo_control import ServoControl  # noqa: E402
+
+
+class LegacyHandler(ServoHTTPHandler):
+    """Monta e serializa o corpo a cada requisição, sem ETag (versão anterior)"""
+    
+    def send_cached(self, route, version, build):
+        self.send_json(build())
+
+
+def handler_us(server, path, iterations, headers=''):
+    raw = f"GET {path} HTTP/1.1\r\nHost: bench\r\n{headers}\r\n".encode('ascii')
+    start = time.perf_counter()
+    for _ in range(iterations):
+        server._run_handler(raw, ('127.0.0.1', 0))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def in_process(iterations):
+    servo = ServoControl(pin=4, backend='simulated')
+    ServoHTTPHandler.servo = servo
+    legacy = AsyncHTTPServer(('127.0.0.1', 0), LegacyHandler)
+    cached = AsyncHTTPServer(('127.0.0.1', 0), ServoHTTPHandler)
+    
+    report = {}
+    for path in ('/status', '/ping', '/'):
+        response, _ = cached._run_handler(f"GET {path} HTTP/1.1\r\n\r\n".encode(), ('127.0.0.1', 0))
+        etag = [line.split(b': ', 1)[1].decode() for line in response.split(b'\r\n')
+                if line.startswith(b'ETag: ')][0]
+        report[path] = {
+            'legacy_us': round(handler_us(legacy, path, iterations), 2),
+            'cached_us': round(handler_us(cached, path, iterations), 2),
+            'not_modified_us': round(handler_us(cached, path, iterations, f"If-None-Match: {etag}\r\n"), 2),
+        }
+    servo.cleanup()
+    return report
+
+
+def poll(server, count, conditional):
+    """Polling de /status em uma conexão; com conditional, reenvia o último ETag"""
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=10)
+    latencies = []
+    statuses = {}
+    etag = None
+    cpu_start = process_cpu_s(server.proc.pid)
+    for _ in range(count):
+        headers = {'If-None-Match': etag} if conditional and etag else {}
+        start = time.perf_counter()
+        conn.request('GET', '/status', headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        statuses[resp.status] = statuses.get(resp.status, 0) + 1
+        etag = resp.getheader('ETag') or etag
+    cpu_s = process_cpu_s(server.proc.pid) - cpu_start
+    conn.close()
+    latencies.sort()
+    return {
+        'statuses': statuses,
+        'last_body_bytes': len(body),
+        'latency_ms': {'p50': round(percentile(latencies, 50), 3), 'p99': round(percentile(latencies, 99), 3)},
+        'server_cpu_us_per_request': round(cpu_s / count * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polling de /status com e sem cache")
+    parser.add_argument('--iterations', type=int, default=20000, help="Requisições por medição no processo")
+    parser.add_argument('--count', type=int, default=2000, help="Requisições por medição ponta a ponta")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'])
+    args = parser.parse_args()
+    
+    report = {'handler': in_process(args.iterations)}
+    with ServerProcess({'http': {'engine': args.engine, 'keep_alive': True}}) as server:
+        poll(server, 200, False)  # Aquecimento
+        report['polling'] = {
+            'full_body': poll(server, args.count, False),
+            'if_none_match': poll(server, args.count, True),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latência de parada (teste de regressão da preempção de movimentos).
+
+No próprio processo, com o servo simulado, interrompe sweeps em instantes
+aleatórios do intervalo entre passos e mede, por motor (wave e software):
+    
+    stop_latency  - do pedido de parada ao movimento cessar, pela mesma
+                    medição exportada em tricho_stop_latency_seconds
+    stop_call     - duração de stop_sweep(wait=False) (a chamada do POST /stop)
+    extra_steps   - passos aplicados depois do pedido de parada
+
+Também mede a preempção de um sweep por outro (duração da chamada a
+sweep() com um sweep em andamento) e a interrupção do assentamento de
+100ms de set_angle e do movimento em grupo (POST /servos/angles).
+
+Sai com código 1 se alguma parada levar mais que um frame PWM (20ms a 50Hz).
+
+Uso:
+    python3 benchmarks/bench_stop_latency.py [--trials 30] [--delay-s 0.5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+
+from common import SERVICE_DIR, percentile
+
+sys.path.insert(0, SERVICE_DIR)
+import metrics  # noqa: E402
+from servo_control import ServoControl  # noqa: E402
+from servo_group import ServoGroup  # noqa: E402
+
+# Chamadas do pigpio que movem o servo (passo de sweep ou parada do DMA)
+MOTION_CALLS = ('set_servo_pulsewidth', 'wave_chain')
+
+
+def summary_ms(values):
+    values = sorted(values)
+    return {'p50': round(percentile(values, 50), 3), 'p99': round(percentile(values, 99), 3),
+            'max': round(values[-1], 3)}
+
+
+def observed_s(engine):
+    """Soma e contagem de tricho_stop_latency_seconds do motor"""
+    _, total, count = metrics.STOP_LATENCY.labels(engine).snapshot()
+    return total, count
+
+
+def run_until_stopped(servo, delay_s, stop_after_s):
+    """Inicia um sweep 0→180°, pede a parada após stop_after_s e aguarda o fim"""
+    finished = threading.Event()
+    servo.sweep(0, 180, delay_s, step=10.0, on_finish=lambda completed: finished.set())
+    time.sleep(stop_after_s)
+    stop_ns = time.monotonic_ns()
+    servo.stop_sweep(wait=False)
+    stop_call_ms = (time.monotonic_ns() - stop_ns) / 1e6
+    finished.wait(5.0)
+    return stop_ns, stop_call_ms
+
+
+def bench_engine(engine, trials, delay_s):
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0001}, sweep_engine=engine)
+    servo._log_info = lambda message: None
+    engine_label = 'wave' if servo._use_wave_engine() else 'software'
+    latency, stop_call, extra_steps = [], [], []
+    for _ in range(trials):
+        total, count = observed_s(engine_label)
+        calls = len(servo.pi.calls)
+        # Parada em qualquer ponto do intervalo entre passos (após o primeiro passo)
+        stop_ns, stop_call_ms = run_until_stopped(
+            servo, delay_s, random.uniform(0.15, 0.15 + 2 * (delay_s + servo.SETTLE_S)))
+        new_total, new_count = observed_s(engine_label)
+        if new_count == count + 1:
+            latency.append((new_total - total) * 1000)
+        stop_call.append(stop_call_ms)
+        # O pulso que mantém a posição após a parada do DMA não é um passo
+        after = [name for t, name, args in list(servo.pi.calls)[calls:]
+                 if t > stop_ns and name in MOTION_CALLS]
+        extra_steps.append(max(0, len(after) - (1 if engine_label == 'wave' else 0)))
+    servo.cleanup()
+    return {
+        'stops_measured': len(latency),
+        'stop_latency_ms': summary_ms(latency) if latency else None,
+        'stop_call_ms': summary_ms(stop_call),
+        'extra_steps_after_stop': sum(extra_steps),
+    }
+
+
+def bench_preempt(trials, delay_s):
+    """Duração de sweep() chamado com outro sweep em andamento"""
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0001})
+    servo._log_info = lambda message: None
+    calls = []
+    servo.sweep(0, 180, delay_s, step=10.0)
+    for i in range(trials):
+        time.sleep(random.uniform(0.05, delay_s))
+        start = time.perf_counter()
+        servo.sweep(180 * (i % 2), 180 * (1 - i % 2), delay_s, step=10.0)
+        calls.append((time.perf_counter() - start) * 1000)
+    servo.cleanup()
+    return {'sweep_call_ms': summary_ms(calls)}
+
+
+def settle_return_ms(move, stop, trials):
+    """Tempo até move() (com assentamento) retornar após stop()"""
+    returns = []
+    for i in range(trials):
+        done = []
+        thread = threading.Thread(target=lambda: (move(60 + 60 * (i % 2)), done.append(time.monotonic_ns())))
+        thread.start()
+        time.sleep(0.02)
+        stop_ns = time.monotonic_ns()
+        stop()
+        thread.join()
+        returns.append((done[0] - stop_ns) / 1e6)
+    return summary_ms(returns)
+
+
+def bench_settle(trials):
+    """Assentamento de set_angle e do movimento em grupo interrompido pela parada"""
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0001})
+    servo._log_info = lambda message: None
+    single = settle_return_ms(servo.set_angle, lambda: servo.stop_sweep(wait=False), trials)
+    servo.cleanup()
+    
+    group = ServoGroup.from_config({'servo': {'backend': 'simulated', 'simulation': {'rtt_s': 0.0001}},
+                                    'servos': [{'id': 'left', 'pwm_pin': 4}, {'id': 'right', 'pwm_pin': 17}]})
+    for member in group.servos.values():
+        member._log_info = lambda message: None
+    primary = group.servos['left']
+    # Parada no servo principal (POST /stop) com o grupo movendo o outro servo
+    grouped = settle_return_ms(lambda angle: group.set_angles({'right': angle}),
+                               lambda: primary.stop_sweep(wait=False), trials)
+    group.cleanup()
+    return {'set_angle_return_after_stop_ms': single, 'group_return_after_stop_ms': grouped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de parada de sweeps e assentamento")
+    parser.add_argument('--trials', type=int, default=30, help="Paradas por cenário")
+    parser.add_argument('--delay-s', type=float, default=0.5, help="Delay entre passos do sweep")
+    args = parser.parse_args()
+    
+    frame_ms = 1000.0 / 50
+    engines = {engine: bench_engine(engine, args.trials, args.delay_s) for engine in ('wave', 'software')}
+    results = {
+        'trials': args.trials,
+        'delay_s': args.delay_s,
+        'frame_ms': frame_ms,
+        'engines': engines,
+        'preempt': bench_preempt(args.trials, args.delay_s),
+        'settle': bench_settle(args.trials),
+    }
+    
+    worst = [stats['stop_latency_ms']['max'] for stats in engines.values() if stats['stop_latency_ms']]
+    worst.extend(stats['max'] for stats in results['settle'].values())
+    results['within_frame'] = all(value < frame_ms for value in worst) and \
+        all(stats['extra_steps_after_stop'] == 0 for stats in engines.values())
+    print(json.dumps(results, indent=2))
+    sys.exit(0 if results['within_frame'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Custo da instrumentação de temporização dos pulsos (timing_trace).
+
+No próprio processo, com o servo simulado sem latência de pigpio, mede o
+tempo por set_angle (sem assentamento) com a instrumentação desligada e
+ligada, e o custo isolado de TimingTrace.record. Ao final, resume os
+eventos de um sweep por software instrumentado.
+
+Uso:
+    python3 benchmarks/bench_timing_trace.py [--moves 20000] [--repeats 5]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+from common import SERVICE_DIR
+
+sys.path.insert(0, SERVICE_DIR)
+from servo_control import ServoControl  # noqa: E402
+from timing_trace import TimingTrace, summarize  # noqa: E402
+
+
+def per_move_us(servo, moves):
+    start = time.perf_counter()
+    for i in range(moves):
+        servo.set_angle(60 + (i & 63), settle=False)
+    return (time.perf_counter() - start) / moves * 1e6
+
+
+def per_record_us(trace, records):
+    now = time.monotonic_ns()
+    start = time.perf_counter()
+    for _ in range(records):
+        trace.record(1, 0, now, now, now, now)
+    return (time.perf_counter() - start) / records * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo da instrumentação de temporização")
+    parser.add_argument('--moves', type=int, default=20000, help="set_angle por medição")
+    parser.add_argument('--repeats', type=int, default=5, help="Repetições (menor valor)")
+    args = parser.parse_args()
+    
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0}, sweep_engine='software')
+    servo._log_info = lambda message: None
+    trace = TimingTrace(args.moves)
+    
+    off, on, record = [], [], []
+    for _ in range(args.repeats):
+        servo.trace = None
+        off.append(per_move_us(servo, args.moves))
+        servo.trace = trace
+        on.append(per_move_us(servo, args.moves))
+        record.append(per_record_us(trace, args.moves))
+    
+    # Sweep por software instrumentado: atraso de cada passo em relação ao deadline
+    trace.clear()
+    finished = threading.Event()
+    servo.sweep(0, 180, 0.0, step=2.0, on_finish=lambda completed: finished.set())
+    finished.wait()
+    sweep = summarize(trace.events(None, trace.capacity)['events']).get('sweep', {})
+    servo.cleanup()
+    
+    print(json.dumps({
+        'moves': args.moves,
+        'set_angle_us': {'trace_off': round(min(off), 2), 'trace_on': round(min(on), 2),
+                         'overhead': round(min(on) - min(off), 2)},
+        'record_us': round(min(record), 2),
+        'sweep_steps': {name: {k: v for k, v in stats.items() if k != 'histogram'}
+                        for name, stats in sweep.items()},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latência do protocolo binário UDP comparada a POST /angle em keep-alive.
+Também confere a rejeição de sequências duplicadas e antigas (replay).
+
+Uso:
+    python3 benchmarks/bench_udp.py [--count 1000]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import sys
+import time
+
+from common import SERVICE_DIR, ServerProcess, free_port, request, summarize
+
+sys.path.insert(0, SERVICE_DIR)
+import udp_command  # noqa: E402
+
+
+class UDPClient:
+    """Cliente do protocolo UDP com número de sequência próprio"""
+    
+    def __init__(self, host, port, timeout=1.0):
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+        self.seq = 0
+    
+    def send(self, opcode, angle=0.0, seq=None):
+        """Envia um comando e retorna (ack decodificado ou None, rtt_ms)"""
+        if seq is None:
+            self.seq += 1
+            seq = self.seq
+        start = time.perf_counter()
+        self.sock.sendto(udp_command.pack_frame(opcode, seq, int(round(angle * 100)),
+                                                time.monotonic_ns()), self.addr)
+        try:
+            while True:
+                ack = udp_command.unpack_frame(self.sock.recv(64))
+                if ack and ack[1] == seq:
+                    return ack, (time.perf_counter() - start) * 1000.0
+        except socket.timeout:
+            return None, (time.perf_counter() - start) * 1000.0
+    
+    def close(self):
+        self.sock.close()
+
+
+def measure_udp(client, count):
+    samples = []
+    for _ in range(count):
+        ack, rtt_ms = client.send(udp_command.OP_SET_ANGLE, random.randint(0, 180))
+        status = 200 if ack and ack[2] == udp_command.ST_OK else 500
+        samples.append((status, rtt_ms, None))
+    return summarize(samples)
+
+
+def measure_http(server, count):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=30.0)
+    try:
+        samples = [request(server.host, server.port, 'POST', '/angle',
+                           body={'angle': random.randint(0, 180)}, conn=conn) for _ in range(count)]
+    finally:
+        conn.close()
+    return summarize(samples)
+
+
+def check_replay(client):
+    """Retransmissão, replay antigo e reinício de sequência"""
+    ack, _ = client.send(udp_command.OP_PING)
+    last = ack[1]
+    duplicate, _ = client.send(udp_command.OP_SET_ANGLE, 45, seq=last)
+    stale, _ = client.send(udp_command.OP_SET_ANGLE, 45, seq=max(0, last - 1000))
+    replayed_reset, _ = client.send(udp_command.OP_RESET, seq=last - 1)
+    reset, _ = client.send(udp_command.OP_RESET)
+    after_reset, _ = client.send(udp_command.OP_PING)
+    replay_after_reset, _ = client.send(udp_command.OP_SET_ANGLE, 45, seq=last)
+    return {
+        'duplicate_rejected': bool(duplicate and duplicate[2] == udp_command.ST_DUPLICATE),
+        'stale_rejected': bool(stale and stale[2] == udp_command.ST_STALE),
+        'reset_accepted': bool(reset and reset[2] == udp_command.ST_OK
+                               and after_reset and after_reset[2] == udp_command.ST_OK),
+        'old_reset_rejected': bool(replayed_reset and replayed_reset[2] != udp_command.ST_OK
+                                   and replay_after_reset and replay_after_reset[2] != udp_command.ST_OK),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP binário x POST /angle")
+    parser.add_argument('--count', type=int, default=1000, help="Comandos por medição")
+    args = parser.parse_args()
+    
+    udp_port = free_port()
+    with ServerProcess({'udp': {'enabled': True, 'host': '127.0.0.1', 'port': udp_port}}) as server:
+        client = UDPClient(server.host, udp_port)
+        try:
+            report = {
+                'udp_ack': measure_udp(client, args.count),
+                'http_keep_alive_ack': measure_http(server, args.count),
+                'replay_protection': check_replay(client),
+            }
+        finally:
+            client.close()
+        request(server.host, server.port, 'POST', '/stop')
+    
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compara o canal WebSocket (GET /ws) com POST /angle em conexão persistente
+no envio de alvos de ângulo. Mede o tempo até o ack de cada comando e o
+tempo até o servidor publicar o novo estado (push de "state").
+
+Uso:
+    python3 benchmarks/bench_websocket.py [--engine asyncio] [--count 500]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import time
+
+from common import ServerProcess, WebSocketClient, request, summarize
+
+
+def measure_http(server, count):
+    """POST /angle sequenciais em uma conexão keep-alive"""
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=30.0)
+    samples = []
+    try:
+        for _ in range(count):
+            samples.append(request(server.host, server.port, 'POST', '/angle',
+                                   body={'angle': random.randint(0, 180)}, conn=conn))
+    finally:
+        conn.close()
+    return summarize(samples)
+
+
+def measure_websocket_ack(server, count):
+    """Comandos de ângulo pelo WebSocket, aguardando o ack de cada um"""
+    ws = WebSocketClient(server.host, server.port)
+    samples = []
+    try:
+        for i in range(count):
+            start = time.perf_counter()
+            ws.send_json({'type': 'angle', 'angle': random.randint(0, 180), 'id': i})
+            while True:
+                message = ws.recv_json()
+                if message is None or message.get('id') == i:
+                    break
+            status = 200 if message and message.get('type') == 'ack' else 500
+            samples.append((status, (time.perf_counter() - start) * 1000.0, None))
+    finally:
+        ws.close()
+    return summarize(samples)
+
+
+def measure_websocket_push(server, count, frame_s=0.02):
+    """
+    Tempo do comando até o push de "state" com o novo ângulo.
+    Os comandos são espaçados por mais de um frame PWM para não medir a
+    limitação de taxa da fila de movimento (um alvo por frame).
+    """
+    ws = WebSocketClient(server.host, server.port)
+    samples = []
+    angle = 0
+    try:
+        ws.recv_json()  # Estado inicial
+        for _ in range(count):
+            time.sleep(frame_s * 1.5)
+            angle = (angle + 37) % 181
+            start = time.perf_counter()
+            ws.send_json({'angle': angle})
+            status = 500
+            while True:
+                message = ws.recv_json()
+                if message is None:
+                    break
+                if message.get('type') == 'state' and message.get('angle') == angle:
+                    status = 200
+                    break
+            samples.append((status, (time.perf_counter() - start) * 1000.0, None))
+    finally:
+        ws.close()
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket x POST /angle")
+    parser.add_argument('--engine', default='asyncio', choices=['asyncio', 'classic'],
+                        help="Motor do servidor HTTP")
+    parser.add_argument('--count', type=int, default=500, help="Comandos por medição")
+    parser.add_argument('--push-count', type=int, default=50, help="Comandos na medição de push")
+    args = parser.parse_args()
+    
+    with ServerProcess({'http': {'engine': args.engine}}) as server:
+        report = {
+            'engine': args.engine,
+            'http_keep_alive_ack': measure_http(server, args.count),
+            'websocket_ack': measure_websocket_ack(server, args.count),
+            'websocket_state_push': measure_websocket_push(server, args.push_count),
+        }
+        request(server.host, server.port, 'POST', '/stop')
+    
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
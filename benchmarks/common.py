@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Funções compartilhadas pelos benchmarks do Trichogramma Pi.
+Requisições HTTP, estatísticas de latência e um servidor local com servo simulado.
+"""
+
+import base64
+import copy
+import http.client
+import json
+import os
+import re
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVICE_DIR = os.path.join(REPO_DIR, "service")
+SERVER_TIMING_RE = re.compile(r'dur=([0-9.]+)')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def percentile(values, pct):
+    """Percentil por ranking mais próximo (values já ordenado)"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(pct / 100.0 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def request(host, port, method, path, body=None, timeout=30.0, conn=None, headers=None):
+    """
+    Executa uma requisição e retorna (status, latência_ms, server_ms).
+    server_ms é None se o servidor não enviar Server-Timing.
+    Se conn for informado, reutiliza a conexão (keep-alive).
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    start = time.perf_counter()
+    try:
+        if body is None and method == 'POST':
+            body = {}
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        all_headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        all_headers.update(headers or {})
+        conn.request(method, path, body=payload, headers=all_headers)
+        resp = conn.getresponse()
+        resp.read()
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        server_ms = None
+        match = SERVER_TIMING_RE.search(resp.getheader('Server-Timing', '') or '')
+        if match:
+            server_ms = float(match.group(1))
+        return resp.status, latency_ms, server_ms
+    finally:
+        if own_conn:
+            conn.close()
+
+
+class WebSocketClient:
+    """
+    Cliente WebSocket mínimo (RFC 6455) para os benchmarks do canal GET /ws.
+    Envia mensagens JSON e lê frames de texto do servidor.
+    """
+    
+    def __init__(self, host, port, path='/ws', timeout=10.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = b''
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        self.sock.sendall((
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            "\r\n"
+        ).encode('ascii'))
+        head = self._read_until(b'\r\n\r\n')
+        if not head.startswith(b'HTTP/1.1 101'):
+            raise RuntimeError(f"Handshake WebSocket recusado: {head.splitlines()[0]!r}")
+    
+    def _read_until(self, marker):
+        while marker not in self.buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("Conexão WebSocket fechada")
+            self.buffer += chunk
+        head, _, self.buffer = self.buffer.partition(marker)
+        return head
+    
+    def _read_exactly(self, n):
+        while len(self.buffer) < n:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("Conexão WebSocket fechada")
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+    
+    def send_json(self, data):
+        """Envia um frame de texto mascarado com o JSON"""
+        payload = json.dumps(data).encode('utf-8')
+        mask = os.urandom(4)
+        if len(payload) < 126:
+            head = struct.pack('!BB', 0x81, 0x80 | len(payload))
+        else:
+            head = struct.pack('!BBH', 0x81, 0x80 | 126, len(payload))
+        masked = bytes(b ^ mask[i & 3] for i, b in enumerate(payload))
+        self.sock.sendall(head + mask + masked)
+    
+    def recv_json(self):
+        """Lê o próximo frame de texto do servidor (None se o servidor fechou)"""
+        while True:
+            b0, b1 = self._read_exactly(2)
+            length = b1 & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', self._read_exactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self._read_exactly(8))[0]
+            payload = self._read_exactly(length)
+            opcode = b0 & 0x0F
+            if opcode == 0x1:
+                return json.loads(payload.decode('utf-8'))
+            if opcode == 0x8:
+                return None
+    
+    def close(self):
+        try:
+            self.sock.sendall(struct.pack('!BB', 0x88, 0x80) + os.urandom(4))
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def summarize(samples, duration_s=None):
+    """
+    Resumo de uma lista de amostras (status, latência_ms, server_ms).
+    
+    Returns:
+        Dicionário com contagem, erros, vazão e percentis de latência
+    """
+    latencies = sorted(s[1] for s in samples)
+    server = sorted(s[2] for s in samples if s[2] is not None)
+    errors = sum(1 for s in samples if s[0] >= 500)
+    result = {
+        'requests': len(samples),
+        'errors': errors,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+    if duration_s:
+        result['throughput_rps'] = round(len(samples) / duration_s, 1)
+    if server:
+        result['server_ms'] = {
+            'p50': round(percentile(server, 50), 3),
+            'p99': round(percentile(server, 99), 3),
+            'max': round(server[-1], 3),
+        }
+    return result
+
+
+def deep_merge(base: dict, overrides: dict) -> dict:
+    """Mescla overrides sobre base (recursivo em dicionários)"""
+    result = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = deep_merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_cpu_s(pid: int) -> float:
+    """Tempo de CPU (user + system) de um processo, via /proc"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    # utime e stime são os campos 14 e 15 (índices 11 e 12 após o nome)
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+class ServerProcess:
+    """
+    Inicia service/http_server.py em um subprocesso com o servo simulado.
+    Uso como context manager: with ServerProcess() as server: ...
+    """
+    
+    def __init__(self, overrides=None, startup_timeout_s=15.0):
+        """
+        Args:
+            overrides: Valores de configuração mesclados sobre o config.yaml do repositório
+            startup_timeout_s: Tempo máximo para o servidor responder /ping
+        """
+        self.overrides = overrides or {}
+        self.startup_timeout_s = startup_timeout_s
+        self.host = '127.0.0.1'
+        self.port = free_port()
+        self.proc = None
+        self.tmpdir = None
+    
+    def __enter__(self):
+        self.tmpdir = tempfile.TemporaryDirectory(prefix='tricho-bench-')
+        with open(os.path.join(REPO_DIR, 'config.yaml')) as f:
+            base = yaml.safe_load(f)
+        config = deep_merge(base, {
+            'http': {'host': self.host, 'port': self.port},
+            'servo': {'backend': 'simulated'},
+            'logging': {'logfile': os.path.join(self.tmpdir.name, 'service.log')},
+        })
+        config = deep_merge(config, self.overrides)
+        config_path = os.path.join(self.tmpdir.name, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+        
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.join(SERVICE_DIR, 'http_server.py'), '--config', config_path],
+            cwd=SERVICE_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + self.startup_timeout_s
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"Servidor encerrou durante a inicialização (código {self.proc.returncode})")
+            try:
+                # Partida rápida: /ping responde antes dos servos; /jobs só depois (503 até lá)
+                request(self.host, self.port, 'GET', '/ping', timeout=1.0)
+                if request(self.host, self.port, 'GET', '/jobs', timeout=1.0)[0] != 503:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.05)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Servidor não ficou pronto a tempo")
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self.proc and self.proc.poll() is None:
+            self.proc.send_signal(signal.SIGTERM)
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        if self.tmpdir:
+            self.tmpdir.cleanup()
+        return False
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def cpu_s(self) -> float:
+        """Tempo de CPU consumido pelo servidor até agora"""
+        return process_cpu_s(self.proc.pid)
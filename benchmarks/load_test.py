@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de carga do servidor HTTP do Trichogramma Pi.
+
+Dispara uma calibração (POST /calibrate) em segundo plano e, enquanto ela
+roda, vários clientes concorrentes chamam /ping, /status e /stop.
+Reporta latência p50/p95/p99 medida no cliente e o tempo no servidor
+(cabeçalho Server-Timing, disponível no motor asyncio).
+
+Uso:
+    python3 benchmarks/load_test.py [--url http://10.3.141.1:8080] [--clients 8] [--duration 5]
+    python3 benchmarks/load_test.py --spawn   # servidor local com servo simulado
+"""
+
+import argparse
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+from common import ServerProcess, request, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor HTTP")
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help="URL base do servidor")
+    parser.add_argument('--clients', type=int, default=8, help="Clientes concorrentes")
+    parser.add_argument('--duration', type=float, default=5.0, help="Duração em segundos")
+    parser.add_argument('--no-calibrate', action='store_true', help="Não dispara calibração em paralelo")
+    parser.add_argument('--spawn', action='store_true',
+                        help="Inicia um servidor local com servo simulado em vez de usar --url")
+    args = parser.parse_args()
+    
+    if args.spawn:
+        with ServerProcess() as server:
+            args.url = server.url
+            run(args)
+    else:
+        run(args)
+
+
+def run(args):
+    """Executa o teste de carga contra args.url"""
+    parsed = urlparse(args.url)
+    host, port = parsed.hostname, parsed.port or 80
+    routes = [('GET', '/ping'), ('GET', '/status'), ('POST', '/stop')]
+    samples = {f"{m} {p}": [] for m, p in routes}
+    samples_lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    
+    # Calibração em segundo plano (rota lenta que ocupa o servidor)
+    calibrate_result = {}
+    if not args.no_calibrate:
+        def calibrate():
+            try:
+                calibrate_result['sample'] = request(host, port, 'POST', '/calibrate', timeout=60.0)
+            except OSError as e:
+                calibrate_result['error'] = str(e)
+        threading.Thread(target=calibrate, daemon=True).start()
+        time.sleep(0.2)
+    
+    def client(index):
+        i = index
+        while time.monotonic() < deadline:
+            method, path = routes[i % len(routes)]
+            # /stop interromperia a calibração: só uma vez a cada ciclo longo
+            if path == '/stop' and i % 50 != 0:
+                method, path = routes[0]
+            i += 1
+            try:
+                sample = request(host, port, method, path)
+            except OSError:
+                sample = (599, 0.0, None)
+            with samples_lock:
+                samples[f"{method} {path}"].append(sample)
+    
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    report = {
+        'url': args.url,
+        'clients': args.clients,
+        'duration_s': args.duration,
+        'routes': {route: summarize(s) for route, s in samples.items() if s},
+    }
+    if 'sample' in calibrate_result:
+        report['calibrate_ms'] = round(calibrate_result['sample'][1], 1)
+    
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de servidor HTTP baseado em asyncio.
+Reaproveita as rotas do ServoHTTPHandler: rotas rápidas rodam direto no
+event loop e chamadas bloqueantes do ServoControl vão para um executor limitado.
+"""
+
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import metrics
+import state_events
+import ws_control
+
+
+class _BufferedRequestMixin:
+    """
+    Executa um BaseHTTPRequestHandler sobre buffers em memória.
+    A requisição já chega lida pelo event loop e a resposta fica em self.wfile.
+    """
+    
+    # O event loop espera as mudanças de estado (long-poll) antes de executar o handler
+    blocking_waits = False
+    
+    def __init__(self, raw_request: bytes, client_address, server, requests_handled: int = 0):
+        self._raw_request = raw_request
+        # Requisições já atendidas nesta conexão (limite por conexão do handler)
+        self.requests_handled = requests_handled
+        super().__init__(None, client_address, server)
+    
+    def setup(self):
+        self.rfile = io.BytesIO(self._raw_request)
+        self.wfile = io.BytesIO()
+    
+    def handle(self):
+        # Uma requisição por buffer; a conexão persistente é gerida pelo servidor
+        self.close_connection = True
+        self.handle_one_request()
+    
+    def finish(self):
+        # A resposta é lida pelo servidor depois que o handler termina
+        pass
+
+
+class AsyncHTTPServer:
+    """
+    Servidor HTTP asyncio com a mesma interface básica do HTTPServer
+    (serve_forever / shutdown).
+    """
+    
+    # Rotas que não bloqueiam: respondidas direto no event loop
+    FAST_ROUTES = {
+        ('GET', '/'),
+        ('GET', '/ping'),
+        ('GET', '/status'),
+        ('GET', '/angle'),
+        ('GET', '/jobs'),
+        ('GET', '/metrics'),
+        ('GET', '/calibrate'),
+        ('POST', '/stop'),
+        ('POST', '/calibrate'),
+        ('POST', '/sweep'),
+    }
+    
+    # Prefixos de rotas rápidas (ex: GET /jobs/<id>)
+    FAST_PREFIXES = (
+        ('GET', '/jobs/'),
+    )
+    
+    # Upgrade para o canal de controle WebSocket (atendido direto no event loop)
+    WEBSOCKET_PATH = '/ws'
+    EVENTS_PATH = '/events'
+    
+    MAX_HEADER_BYTES = 16384
+    MAX_BODY_BYTES = 65536
+    READ_TIMEOUT_S = 10.0
+    
+    def __init__(self, server_address, handler_class, max_workers: int = 4,
+                 max_pending: int = 16, logger=None, keep_alive: bool = True,
+                 idle_timeout_s: float = 15.0):
+        """
+        Inicializa o servidor.
+        
+        Args:
+            server_address: Tupla (host, porta)
+            handler_class: Subclasse de BaseHTTPRequestHandler com as rotas
+            max_workers: Threads do executor para rotas bloqueantes
+            max_pending: Máximo de requisições aguardando o executor (acima disso: 503)
+            logger: Instância do logger (opcional)
+            keep_alive: Mantém conexões HTTP/1.1 abertas entre requisições
+            idle_timeout_s: Tempo máximo ocioso de uma conexão persistente
+        """
+        self.server_address = server_address
+        self.handler_class = type(
+            'Buffered' + handler_class.__name__, (_BufferedRequestMixin, handler_class), {}
+        )
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.fast_routes = set(self.FAST_ROUTES)
+        self.logger = logger
+        self.keep_alive = keep_alive
+        self.idle_timeout_s = idle_timeout_s
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http-worker')
+        self.pending = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._shutdown_requested = False
+        self.notifier: Optional[state_events.AsyncStateNotifier] = None
+    
+    def serve_forever(self):
+        """Executa o event loop até shutdown() ser chamado"""
+        asyncio.run(self._serve())
+    
+    def shutdown(self):
+        """Solicita o encerramento do servidor (pode ser chamado de qualquer thread)"""
+        # Vale também antes de serve_forever (falha na partida rápida)
+        self._shutdown_requested = True
+        if self._loop and self._stop_event:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+    
+    def attach_servo(self, servo):
+        """
+        Liga SSE e long-poll ao servo criado depois do início do servidor
+        (partida rápida). Pode ser chamado de qualquer thread.
+        """
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._attach_notifier, servo)
+    
+    def _attach_notifier(self, servo):
+        if servo is not None and self.notifier is None:
+            self.notifier = state_events.AsyncStateNotifier(servo)
+            self.notifier.attach(self._loop)
+    
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if self._shutdown_requested:
+            self._stop_event.set()
+        # Servo já criado (sem partida rápida); senão chega por attach_servo
+        self._attach_notifier(getattr(self.handler_class, 'servo', None))
+        host, port = self.server_address
+        server = await asyncio.start_server(
+            self._handle_client, host, port, limit=self.MAX_HEADER_BYTES
+        )
+        try:
+            await self._stop_event.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            self.executor.shutdown(wait=False)
+            if self.notifier:
+                self.notifier.detach()
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende as requisições de uma conexão (persistente se keep-alive)"""
+        peer = writer.get_extra_info('peername') or ('', 0)
+        requests_handled = 0
+        try:
+            while True:
+                # Primeira requisição: timeout de leitura; seguintes: timeout ocioso
+                timeout = self.idle_timeout_s if requests_handled else self.READ_TIMEOUT_S
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+                method, path, content_length = self._parse_head(head)
+                
+                if (method == 'GET' and path == self.WEBSOCKET_PATH and getattr(self.handler_class, 'websocket_enabled', False)
+                        and getattr(self.handler_class, 'ready', True)):
+                    headers = self._parse_headers(head)
+                    if ws_control.is_upgrade_request(headers):
+                        await self._serve_websocket(reader, writer, headers, peer)
+                        return
+                
+                if method == 'GET' and self.notifier and getattr(self.handler_class, 'events_enabled', False):
+                    if path == self.EVENTS_PATH:
+                        await self._serve_events(reader, writer, head, peer)
+                        return
+                    # Long-poll: espera a mudança aqui, sem ocupar uma thread do executor
+                    long_poll = self._long_poll_params(head)
+                    if long_poll:
+                        await self.notifier.wait(*long_poll)
+                
+                if content_length > self.MAX_BODY_BYTES:
+                    metrics.HTTP_REQUESTS.labels(method, 'other', 413).inc()
+                    writer.write(self._error_response(413, 'Corpo da requisição muito grande'))
+                    await writer.drain()
+                    return
+                
+                body = b''
+                if content_length > 0:
+                    body = await asyncio.wait_for(reader.readexactly(content_length), self.READ_TIMEOUT_S)
+                
+                response, close = await self.dispatch(method, path, head + body, peer[:2], requests_handled)
+                writer.write(response)
+                await writer.drain()
+                requests_handled += 1
+                
+                if close or not self.keep_alive:
+                    return
+        
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                asyncio.TimeoutError, ConnectionError, ValueError):
+            # Cliente desconectou, ficou ocioso ou enviou requisição malformada
+            pass
+        finally:
+            writer.close()
+    
+    async def _serve_websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                               headers: dict, peer):
+        """Conclui o handshake e atende a conexão WebSocket até o cliente sair"""
+        writer.write(ws_control.handshake_response(headers['sec-websocket-key']))
+        await writer.drain()
+        if self.logger:
+            self.logger.info(f"WebSocket conectado: {peer[0]}")
+        await ws_control.serve_async(
+            reader, writer, self.handler_class.websocket_session(),
+            executor=self.executor,
+            notifier=self.notifier,
+            idle_timeout_s=self.handler_class.ws_idle_timeout_s
+        )
+        if self.logger:
+            self.logger.info(f"WebSocket encerrado: {peer[0]}")
+    
+    async def _serve_events(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            head: bytes, peer):
+        """Atende um stream SSE (GET /events) até o cliente desconectar"""
+        slots = self.handler_class.events_slots
+        if not slots.acquire(blocking=False):
+            metrics.HTTP_REQUESTS.labels('GET', self.EVENTS_PATH, 503).inc()
+            writer.write(self._error_response(503, 'Limite de streams de eventos atingido'))
+            await writer.drain()
+            return
+        
+        try:
+            metrics.HTTP_REQUESTS.labels('GET', self.EVENTS_PATH, 200).inc()
+            writer.write(state_events.response_head())
+            await writer.drain()
+            if self.logger:
+                self.logger.info(f"Stream de eventos conectado: {peer[0]}")
+            await state_events.serve_async(
+                reader, writer, self.notifier, self.handler_class.state_snapshot,
+                heartbeat_s=self.handler_class.events_heartbeat_s,
+                last_id=state_events.parse_last_event_id(self._parse_headers(head).get('last-event-id'))
+            )
+            if self.logger:
+                self.logger.info(f"Stream de eventos encerrado: {peer[0]}")
+        finally:
+            slots.release()
+    
+    def _long_poll_params(self, head: bytes):
+        """(since, timeout) se a requisição for um long-poll válido"""
+        long_poll_params = getattr(self.handler_class, 'long_poll_params', None)
+        if long_poll_params is None:
+            return None
+        try:
+            target = head.split(b'\r\n', 1)[0].decode('latin-1').split()[1]
+            return long_poll_params(target)
+        except (IndexError, ValueError):
+            # Parâmetros inválidos: o handler responde 400
+            return None
+    
+    async def dispatch(self, method: str, path: str, raw_request: bytes, client_address,
+                       requests_handled: int = 0):
+        """
+        Executa o handler inline (rotas rápidas) ou no executor limitado.
+        
+        Returns:
+            Tupla (bytes da resposta HTTP completa, fechar conexão)
+        """
+        if (method, path) in self.fast_routes or any(
+                method == m and path.startswith(p) for m, p in self.FAST_PREFIXES):
+            return self._run_handler(raw_request, client_address, requests_handled)
+        
+        if self.pending >= self.max_pending:
+            metrics.HTTP_REQUESTS.labels(method, self.handler_class.route_label(path), 503).inc()
+            return self._error_response(503, 'Servidor ocupado, tente novamente'), True
+        
+        self.pending += 1
+        try:
+            return await self._loop.run_in_executor(
+                self.executor, self._run_handler, raw_request, client_address, requests_handled
+            )
+        finally:
+            self.pending -= 1
+    
+    def _run_handler(self, raw_request: bytes, client_address, requests_handled: int = 0):
+        """
+        Executa o handler sobre a requisição bufferizada e mede o tempo no servidor.
+        
+        Returns:
+            Tupla (bytes da resposta, fechar conexão)
+        """
+        start = time.perf_counter()
+        handler = self.handler_class(raw_request, client_address, self, requests_handled)
+        response = handler.wfile.getvalue()
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        
+        # Injeta Server-Timing logo após a linha de status
+        timing = f"\r\nServer-Timing: app;dur={elapsed_ms:.3f}".encode('ascii')
+        return response.replace(b'\r\n', timing + b'\r\n', 1), handler.close_connection
+    
+    @staticmethod
+    def _parse_head(head: bytes):
+        """
+        Extrai método, caminho (sem query string) e Content-Length do cabeçalho.
+        
+        Returns:
+            Tupla (método, caminho, content_length)
+        """
+        lines = head.split(b'\r\n')
+        parts = lines[0].decode('latin-1').split()
+        if len(parts) < 2:
+            raise ValueError("Linha de requisição inválida")
+        
+        method = parts[0].upper()
+        path = parts[1].split('?', 1)[0]
+        content_length = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                content_length = int(value.strip())
+                break
+        
+        return method, path, content_length
+    
+    @staticmethod
+    def _parse_headers(head: bytes) -> dict:
+        """Cabeçalhos da requisição com nomes em minúsculas"""
+        headers = {}
+        for line in head.split(b'\r\n')[1:]:
+            name, sep, value = line.partition(b':')
+            if sep:
+                headers[name.strip().decode('latin-1').lower()] = value.strip().decode('latin-1')
+        return headers
+    
+    @staticmethod
+    def _error_response(status_code: int, message: str) -> bytes:
+        """Monta uma resposta JSON de erro sem passar pelo handler"""
+        reasons = {413: 'Payload Too Large', 503: 'Service Unavailable'}
+        body = json.dumps({'status': 'error', 'message': message}).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status_code} {reasons.get(status_code, 'Error')}\r\n"
+            "Content-Type: application/json\r\n"
+            "Connection: close\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        return head.encode('ascii') + body
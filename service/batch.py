@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lotes de comandos (POST /batch): uma sequência ordenada de operações
+(ângulo, espera, sweep, parada) validada uma única vez e executada no
+servidor por uma thread dedicada. Um ciclo de liberação vira uma única
+requisição, com resultado e tempos de cada passo na resposta.
+"""
+
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+from journal import SOURCE_BATCH
+from utils import parse_angle_value, parse_flag, parse_sweep_params
+
+# Operações aceitas
+OP_ANGLE = 'angle'    # {"op": "angle", "angle": NN, "settle": false}
+OP_DWELL = 'dwell'    # {"op": "dwell", "ms": NN}
+OP_SWEEP = 'sweep'    # {"op": "sweep", "from", "to", "delay_s", "step", "profile"}
+OP_STOP = 'stop'      # {"op": "stop"}
+OPERATIONS = (OP_ANGLE, OP_DWELL, OP_SWEEP, OP_STOP)
+
+# Limites de um lote
+MAX_STEPS = 64
+MAX_DURATION_S = 300.0
+
+
+def compile_steps(steps, servo) -> List[dict]:
+    """
+    Valida o lote inteiro antes de executar qualquer passo.
+    
+    Args:
+        steps: Lista de operações recebida em JSON
+        servo: ServoControl (passos do sweep e tempo de acomodação)
+    
+    Returns:
+        Lista de passos normalizados, com "estimate_s"
+    
+    Raises:
+        ValueError: Lote inválido (mensagem com o índice do passo)
+    """
+    if not isinstance(steps, list) or not steps:
+        raise ValueError('"steps" deve ser uma lista não vazia')
+    if len(steps) > MAX_STEPS:
+        raise ValueError(f"Máximo de {MAX_STEPS} passos por lote")
+    
+    settle_s = servo.SETTLE_S
+    compiled = []
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise ValueError(f"Passo {index}: deve ser um objeto")
+        op = step.get('op')
+        if op == OP_ANGLE:
+            valid, angle, error = parse_angle_value(step.get('angle'))
+            if valid:
+                valid, settle, error = parse_flag(step, 'settle', False)
+            if not valid:
+                raise ValueError(f"Passo {index}: {error}")
+            compiled.append({'op': op, 'angle': angle, 'settle': settle,
+                             'estimate_s': settle_s if settle else 0.0})
+        elif op == OP_DWELL:
+            try:
+                duration_s = float(step.get('ms')) / 1000.0
+            except (TypeError, ValueError):
+                raise ValueError(f'Passo {index}: "ms" obrigatório (número)')
+            # NaN e Infinity (aceitos pelo json.loads) escapam das comparações abaixo
+            if not math.isfinite(duration_s):
+                raise ValueError(f'Passo {index}: "ms" deve ser finito')
+            if duration_s < 0:
+                raise ValueError(f'Passo {index}: "ms" não pode ser negativo')
+            compiled.append({'op': op, 'duration_s': duration_s, 'estimate_s': duration_s})
+        elif op == OP_SWEEP:
+            valid, params, error = parse_sweep_params(step, settle_s)
+            if not valid:
+                raise ValueError(f"Passo {index}: {error}")
+            angles, step_period_s = servo.sweep_plan(params['from'], params['to'], params['delay_s'],
+                                                     params['step'], params['profile'])
+            compiled.append(dict(params, op=op, estimate_s=len(angles) * step_period_s))
+        elif op == OP_STOP:
+            compiled.append({'op': op, 'estimate_s': 0.0})
+        else:
+            raise ValueError(f"Passo {index}: operação desconhecida {op!r} (use {', '.join(OPERATIONS)})")
+    
+    if sum(step['estimate_s'] for step in compiled) > MAX_DURATION_S:
+        raise ValueError(f"Duração estimada do lote acima de {MAX_DURATION_S:.0f}s")
+    return compiled
+
+
+class BatchRunner:
+    """
+    Thread única que executa um lote por vez.
+    Os passos seguem uma linha do tempo: esperas consecutivas não acumulam o
+    atraso de acordar de cada uma.
+    """
+    
+    def __init__(self, servo, logger=None):
+        """
+        Args:
+            servo: Instância de ServoControl
+            logger: Instância do logger (opcional)
+        """
+        self.servo = servo
+        self.logger = logger
+        self.pending = queue.Queue(maxsize=1)
+        self.abort_event = threading.Event()
+        self.busy = False
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        
+        # Contadores
+        self.executed = 0
+        self.aborted = 0
+        self.failed = 0
+    
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='batch-runner', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+        self.abort()
+        try:
+            self.pending.put_nowait(None)
+        except queue.Full:
+            pass
+        if self.thread:
+            self.thread.join(timeout=2.0)
+    
+    def submit(self, steps: List[dict]) -> Optional[Future]:
+        """
+        Agenda um lote já validado.
+        
+        Returns:
+            Future com o resultado, ou None se outro lote estiver em execução
+        """
+        with self.lock:
+            if self.busy:
+                return None
+            self.busy = True
+        future = Future()
+        self.abort_event.clear()
+        self.pending.put((steps, future))
+        return future
+    
+    def abort(self):
+        """Interrompe o lote em execução (POST /stop)"""
+        self.abort_event.set()
+    
+    def stats(self) -> dict:
+        return {
+            'busy': self.busy,
+            'executed': self.executed,
+            'aborted': self.aborted,
+            'failed': self.failed,
+        }
+    
+    def _run(self):
+        while self.running:
+            item = self.pending.get()
+            if item is None:
+                return
+            steps, future = item
+            try:
+                result = self.execute(steps)
+                future.set_result(result)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Erro no lote: {e}", exc_info=True)
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.busy = False
+    
+    def execute(self, steps: List[dict]) -> dict:
+        """
+        Executa os passos em ordem e mede cada um.
+        
+        Returns:
+            Dicionário com "completed", "aborted", "total_ms" e "steps"
+            (index, op, ok, scheduled_ms, start_ms, lateness_ms, duration_ms)
+        """
+        results = []
+        aborted = False
+        failed = False
+        t0 = time.perf_counter()
+        timeline = 0.0  # Início previsto do próximo passo (segundos desde t0)
+        
+        for index, step in enumerate(steps):
+            op = step['op']
+            if aborted or failed:
+                results.append({'index': index, 'op': op, 'ok': False, 'skipped': True})
+                continue
+            
+            if op == OP_DWELL:
+                scheduled = timeline
+                timeline += step['duration_s']
+                remaining = t0 + timeline - time.perf_counter()
+                if remaining > 0 and self.abort_event.wait(remaining):
+                    aborted = True
+                start = scheduled
+                ok, error = not aborted, ('Lote interrompido' if aborted else None)
+            else:
+                if self.abort_event.is_set():
+                    aborted = True
+                    results.append({'index': index, 'op': op, 'ok': False, 'skipped': True})
+                    continue
+                scheduled = timeline
+                start = time.perf_counter() - t0
+                ok, error = self._apply(step)
+                # Operações levam o tempo que levam: a linha do tempo segue do fim real
+                timeline = max(timeline, time.perf_counter() - t0)
+                if not ok:
+                    if self.abort_event.is_set():
+                        aborted = True
+                    else:
+                        failed = True
+            
+            end = time.perf_counter() - t0
+            result = {
+                'index': index,
+                'op': op,
+                'ok': ok,
+                'scheduled_ms': round(scheduled * 1000.0, 3),
+                'start_ms': round(start * 1000.0, 3),
+                'lateness_ms': round(max(0.0, start - scheduled) * 1000.0, 3),
+                'duration_ms': round((end - start) * 1000.0, 3),
+            }
+            if error:
+                result['error'] = error
+            results.append(result)
+        
+        self.executed += 1
+        if aborted:
+            self.aborted += 1
+        if failed:
+            self.failed += 1
+        total_ms = round((time.perf_counter() - t0) * 1000.0, 3)
+        if self.logger:
+            state = 'interrompido' if aborted else ('com falha' if failed else 'concluído')
+            self.logger.info(f"Lote de {len(steps)} passos {state} em {total_ms}ms")
+        return {
+            'completed': not (aborted or failed),
+            'aborted': aborted,
+            'total_ms': total_ms,
+            'steps': results,
+        }
+    
+    def _apply(self, step: dict):
+        """Executa uma operação no servo. Returns: (ok, erro)"""
+        op = step['op']
+        if op == OP_ANGLE:
+            if self.servo.set_angle(step['angle'], settle=step['settle'], source=SOURCE_BATCH):
+                return True, None
+            return False, 'Falha ao mover servo'
+        
+        if op == OP_STOP:
+            self.servo.stop_sweep()
+            return True, None
+        
+        # OP_SWEEP: aguarda o fim (interrompido por POST /stop via stop_sweep)
+        finished = threading.Event()
+        outcome = {'completed': False}
+        
+        def on_finish(completed: bool):
+            outcome['completed'] = completed
+            finished.set()
+        
+        self.servo.sweep(step['from'], step['to'], step['delay_s'], step=step['step'], on_finish=on_finish,
+                         profile=step['profile'])
+        finished.wait()
+        if outcome['completed']:
+            return True, None
+        if self.abort_event.is_set():
+            return False, 'Lote interrompido'
+        return False, 'Sweep interrompido'
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Calibração por servo: curva ângulo → pulsewidth (µs) com vários pontos,
+compilada em uma tabela de consulta com resolução de 0.1°. No caminho
+quente, converter um ângulo é apenas um índice na tabela.
+
+As curvas ficam em um arquivo JSON e podem ser recarregadas sem reiniciar
+o serviço. A medição é feita pelo fluxo guiado de POST /calibrate.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Resolução da tabela: 10 entradas por grau (0.1°)
+STEPS_PER_DEGREE = 10
+TABLE_SIZE = 180 * STEPS_PER_DEGREE + 1
+
+# Limites de pulsewidth aceitos pelo pigpio (µs)
+MIN_PULSEWIDTH = 500
+MAX_PULSEWIDTH = 2500
+
+# Ângulos de referência sugeridos no fluxo guiado
+DEFAULT_GUIDE_ANGLES = (0, 30, 60, 90, 120, 150, 180)
+
+
+class PulseTable:
+    """Tabela ângulo → pulsewidth pré-calculada (índice = ângulo * 10)"""
+    
+    def __init__(self, values: Sequence[int], source: str = 'linear',
+                 points: Optional[List[Tuple[float, int]]] = None):
+        self.values = array('H', values)
+        self.source = source
+        self.points = points or []
+    
+    def lookup(self, angle: float) -> int:
+        """Pulsewidth para o ângulo (limitado a 0-180°)"""
+        index = int(angle * STEPS_PER_DEGREE + 0.5)
+        if index < 0:
+            index = 0
+        elif index >= TABLE_SIZE:
+            index = TABLE_SIZE - 1
+        return self.values[index]
+    
+    def to_dict(self) -> dict:
+        return {
+            'source': self.source,
+            'points': [[a, pw] for a, pw in self.points],
+            'resolution_deg': 1.0 / STEPS_PER_DEGREE,
+            'pulsewidth_0': self.values[0],
+            'pulsewidth_90': self.values[90 * STEPS_PER_DEGREE],
+            'pulsewidth_180': self.values[-1],
+        }
+
+
+def linear_table(frequency: int, min_duty: float, max_duty: float) -> PulseTable:
+    """
+    Tabela equivalente ao mapeamento linear por duty cycle (min_duty/max_duty).
+    
+    Args:
+        frequency: Frequência PWM em Hz
+        min_duty: Duty cycle em % para 0°
+        max_duty: Duty cycle em % para 180°
+    """
+    period_us = 1000000 / frequency
+    min_pw = (min_duty / 100.0) * period_us
+    max_pw = (max_duty / 100.0) * period_us
+    values = [int(min_pw + (i / STEPS_PER_DEGREE / 180.0) * (max_pw - min_pw)) for i in range(TABLE_SIZE)]
+    return PulseTable(values, source='linear')
+
+
+def parse_pulsewidth(value) -> int:
+    """
+    Valida um pulsewidth recebido em JSON (fluxo guiado: pulse e record).
+    
+    Raises:
+        ValueError: Ausente, não numérico ou fora dos limites do pigpio
+    """
+    try:
+        pulsewidth = int(value)
+    except (TypeError, ValueError, OverflowError):
+        # OverflowError: Infinity (ou 1e400), aceito pelo json.loads
+        raise ValueError('Parâmetro "pulsewidth" obrigatório (us)')
+    if not MIN_PULSEWIDTH <= pulsewidth <= MAX_PULSEWIDTH:
+        raise ValueError(f"Pulsewidth deve estar entre {MIN_PULSEWIDTH} e {MAX_PULSEWIDTH}us")
+    return pulsewidth
+
+
+def validate_points(points) -> List[Tuple[float, int]]:
+    """
+    Valida e ordena os pontos de uma curva.
+    
+    Args:
+        points: Lista de pares [ângulo, pulsewidth_us]
+    
+    Returns:
+        Lista de (ângulo, pulsewidth) ordenada por ângulo
+    
+    Raises:
+        ValueError: Curva inválida (mensagem para o usuário)
+    """
+    try:
+        parsed = sorted((float(a), int(pw)) for a, pw in points)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("Pontos devem ser pares [ângulo, pulsewidth_us]")
+    
+    if len(parsed) < 2:
+        raise ValueError("A curva precisa de pelo menos 2 pontos")
+    for angle, pulsewidth in parsed:
+        if not 0 <= angle <= 180:
+            raise ValueError(f"Ângulo fora de 0-180: {angle}")
+        if not MIN_PULSEWIDTH <= pulsewidth <= MAX_PULSEWIDTH:
+            raise ValueError(f"Pulsewidth fora de {MIN_PULSEWIDTH}-{MAX_PULSEWIDTH}us: {pulsewidth}")
+    
+    angles = [a for a, _ in parsed]
+    if len(set(angles)) != len(angles):
+        raise ValueError("Ângulos repetidos na curva")
+    
+    # A curva deve ser monotônica (servo montado em qualquer sentido)
+    deltas = [b[1] - a[1] for a, b in zip(parsed, parsed[1:])]
+    if not (all(d > 0 for d in deltas) or all(d < 0 for d in deltas)):
+        raise ValueError("Pulsewidth deve crescer (ou decrescer) estritamente com o ângulo")
+    
+    return parsed
+
+
+def compile_table(points) -> PulseTable:
+    """
+    Compila a curva em tabela por interpolação linear entre os pontos.
+    Fora do intervalo medido, estende o primeiro/último segmento (limitado
+    aos pulsewidths aceitos pelo pigpio).
+    """
+    parsed = validate_points(points)
+    values = []
+    segment = 0
+    for i in range(TABLE_SIZE):
+        angle = i / STEPS_PER_DEGREE
+        while segment < len(parsed) - 2 and angle > parsed[segment + 1][0]:
+            segment += 1
+        (a0, p0), (a1, p1) = parsed[segment], parsed[segment + 1]
+        pulsewidth = p0 + (angle - a0) * (p1 - p0) / (a1 - a0)
+        values.append(max(MIN_PULSEWIDTH, min(MAX_PULSEWIDTH, int(round(pulsewidth)))))
+    return PulseTable(values, source='calibrated', points=parsed)
+
+
+class CalibrationStore:
+    """
+    Arquivo JSON com as curvas de cada servo:
+        {"servos": {"<id>": {"points": [[ângulo, us], ...], "updated_at": "..."}}}
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+    
+    def load(self) -> Dict[str, List[Tuple[float, int]]]:
+        """
+        Lê as curvas do arquivo (curvas e entradas inválidas são ignoradas:
+        um arquivo editado à mão não impede a partida).
+        
+        Returns:
+            Dicionário id_do_servo -> pontos validados
+        """
+        with self.lock:
+            if not os.path.exists(self.path):
+                return {}
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        
+        servos = data.get('servos') if isinstance(data, dict) else None
+        if not isinstance(servos, dict):
+            return {}
+        curves = {}
+        for servo_id, entry in servos.items():
+            if not isinstance(entry, dict):
+                continue
+            try:
+                curves[servo_id] = validate_points(entry.get('points', []))
+            except ValueError:
+                continue
+        return curves
+    
+    def save(self, servo_id: str, points: List[Tuple[float, int]]):
+        """Grava a curva de um servo (escrita atômica: arquivo temporário + rename)"""
+        with self.lock:
+            data = {'servos': {}}
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            # Estrutura inválida (editada à mão): recomeça só o que não é mapeamento
+            if not isinstance(data, dict):
+                data = {}
+            if not isinstance(data.get('servos'), dict):
+                data['servos'] = {}
+            data['servos'][servo_id] = {
+                'points': [[a, pw] for a, pw in points],
+                'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            }
+            
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class CalibrationManager:
+    """
+    Fluxo guiado de calibração de um servo:
+        start  - inicia a sessão (movimentos normais ficam bloqueados)
+        pulse  - aplica um pulsewidth bruto para alinhar o braço ao ângulo de referência
+        record - registra o pulsewidth atual para um ângulo
+        save   - valida, grava no arquivo e aplica a nova tabela
+        cancel - descarta a sessão e volta à tabela anterior
+    """
+    
+    def __init__(self, servo, store: CalibrationStore, servo_id: Optional[str] = None,
+                 guide_angles: Sequence[float] = DEFAULT_GUIDE_ANGLES, logger=None):
+        """
+        Args:
+            servo: Instância de ServoControl
+            store: Arquivo de curvas
+            servo_id: Identificador do servo no arquivo (padrão: servo.servo_id)
+            guide_angles: Ângulos de referência sugeridos
+            logger: Instância do logger (opcional)
+        """
+        self.servo = servo
+        self.store = store
+        self.servo_id = servo_id or servo.servo_id
+        self.guide_angles = list(guide_angles)
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.session = None  # {'points': {ângulo: us}, 'pulsewidth': us, 'started_at': ...}
+    
+    def status(self) -> dict:
+        """Tabela em uso e sessão guiada (se houver)"""
+        with self.lock:
+            session = None
+            if self.session:
+                session = {
+                    'pulsewidth': self.session['pulsewidth'],
+                    'points': sorted([a, pw] for a, pw in self.session['points'].items()),
+                    'pending_angles': [a for a in self.guide_angles if a not in self.session['points']],
+                    'started_at': self.session['started_at'],
+                }
+            return {
+                'servo_id': self.servo_id,
+                'file': self.store.path,
+                'table': self.servo.pulse_table.to_dict(),
+                'session': session,
+            }
+    
+    def handle(self, action: str, data: dict) -> dict:
+        """
+        Executa uma ação do fluxo guiado.
+        
+        Raises:
+            ValueError: Ação ou parâmetros inválidos (mensagem para o usuário)
+        """
+        handlers = {
+            'start': self.start,
+            'pulse': lambda: self.pulse(data.get('pulsewidth')),
+            'record': lambda: self.record(data.get('angle'), data.get('pulsewidth')),
+            'save': self.save,
+            'cancel': self.cancel,
+        }
+        if action not in handlers:
+            raise ValueError(f"Ação de calibração desconhecida: {action}")
+        handlers[action]()
+        return self.status()
+    
+    def start(self):
+        with self.lock:
+            if self.session:
+                raise ValueError("Sessão de calibração já iniciada")
+            self.servo.stop_sweep()
+            pulsewidth = self.servo.angle_to_pulsewidth(90)
+            if not self.servo.set_pulsewidth(pulsewidth):
+                raise ValueError("Falha ao mover servo")
+            self.session = {'points': {}, 'pulsewidth': pulsewidth,
+                            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            self.servo.calibrating = True
+        self._log_info(f"Calibração guiada iniciada (servo {self.servo_id})")
+    
+    def pulse(self, pulsewidth):
+        with self.lock:
+            self._require_session()
+            pulsewidth = parse_pulsewidth(pulsewidth)
+            if not self.servo.set_pulsewidth(pulsewidth):
+                raise ValueError("Falha ao mover servo")
+            self.session['pulsewidth'] = pulsewidth
+    
+    def record(self, angle, pulsewidth=None):
+        with self.lock:
+            self._require_session()
+            try:
+                angle = float(angle)
+            except (TypeError, ValueError):
+                raise ValueError('Parâmetro "angle" obrigatório')
+            if not 0 <= angle <= 180:
+                raise ValueError("Ângulo deve estar entre 0 e 180")
+            if pulsewidth is not None:
+                self.session['pulsewidth'] = parse_pulsewidth(pulsewidth)
+            self.session['points'][angle] = self.session['pulsewidth']
+    
+    def save(self):
+        with self.lock:
+            self._require_session()
+            points = validate_points(self.session['points'].items())
+            table = compile_table(points)
+            self.store.save(self.servo_id, points)
+            self.session = None
+            self.servo.calibrating = False
+            self.servo.set_pulse_table(table)
+        self._log_info(f"Calibração salva (servo {self.servo_id}, {len(points)} pontos)")
+    
+    def cancel(self):
+        with self.lock:
+            self._require_session()
+            self.session = None
+            self.servo.calibrating = False
+        self._log_info("Calibração guiada cancelada")
+    
+    def reload(self) -> dict:
+        """Relê o arquivo e aplica a curva deste servo (linear se não houver)"""
+        curves = self.store.load()
+        points = curves.get(self.servo_id)
+        self.servo.set_pulse_table(compile_table(points) if points else None)
+        self._log_info(f"Calibração recarregada (servo {self.servo_id}: "
+                       f"{'curva com ' + str(len(points)) + ' pontos' if points else 'linear'})")
+        return self.status()
+    
+    def _require_session(self):
+        if not self.session:
+            raise ValueError('Nenhuma sessão de calibração ativa (use {"action": "start"})')
+    
+    def _log_info(self, message: str):
+        if self.logger:
+            self.logger.info(message)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recarga do config.yaml com o serviço rodando (sem systemctl restart).
+
+O arquivo é observado por inotify (diretório do config.yaml: editores que
+gravam por rename também são vistos), com polling do tamanho/mtime quando o
+inotify não está disponível. POST /config/reload força a recarga.
+
+A nova configuração é validada por inteiro antes de qualquer troca; se for
+inválida, a configuração em uso continua. Aplicado a quente:
+    - logging.level
+    - por servo: min_duty, max_duty (tabela de pulsewidth linear),
+      max_velocity_deg_s e max_accel_deg_s2
+As trocas são atribuições de atributos: um sweep em andamento não é
+interrompido (o motor por software usa a nova tabela no próximo passo, o
+waveform já compilado termina com a anterior). As demais mudanças só valem
+após reiniciar e são listadas em "restart_required".
+"""
+
+import ctypes
+import ctypes.util
+import math
+import os
+import re
+import select
+import struct
+import threading
+from typing import List, Optional
+
+from calibration import MAX_PULSEWIDTH, MIN_PULSEWIDTH
+from config_snapshot import load_config
+from motion_profile import DEFAULT_MAX_ACCEL_DEG_S2, DEFAULT_MAX_VELOCITY_DEG_S
+from servo_group import servo_entries
+
+# Campos de servo trocados a quente e nível de log
+DUTY_FIELDS = ('min_duty', 'max_duty')
+LIMIT_FIELDS = ('max_velocity_deg_s', 'max_accel_deg_s2')
+HOT_KEY = re.compile(r'^(servo|servos\[\d+\])\.(%s)$' % '|'.join(DUTY_FIELDS + LIMIT_FIELDS))
+LOG_LEVEL_KEY = 'logging.level'
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+DEFAULT_POLL_INTERVAL_S = 2.0
+DEFAULT_DEBOUNCE_S = 0.2
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+def flatten(config, prefix: str = '') -> dict:
+    """Valores folha por chave pontilhada ("servo.min_duty", "servos[1].pwm_pin")"""
+    items = {}
+    if isinstance(config, dict):
+        for key, value in config.items():
+            items.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(config, list) and config and all(isinstance(item, dict) for item in config):
+        for index, item in enumerate(config):
+            items.update(flatten(item, f"{prefix}[{index}]"))
+    else:
+        items[prefix] = config
+    return items
+
+
+def validate(config: dict) -> List[dict]:
+    """
+    Valida o que é aplicado a quente (o restante é validado na partida).
+    
+    Returns:
+        Configuração de cada servo (servo_entries)
+    
+    Raises:
+        ValueError: Configuração inválida
+    """
+    if not isinstance(config, dict):
+        raise ValueError("config.yaml deve ser um mapeamento")
+    entries = servo_entries(config)
+    for entry in entries:
+        where = f"servo {entry['id']}"
+        try:
+            frequency = float(entry.get('frequency', 50))
+            min_duty = float(entry.get('min_duty', 2.5))
+            max_duty = float(entry.get('max_duty', 12.5))
+            limits = [float(entry[field]) for field in LIMIT_FIELDS if field in entry]
+        except (TypeError, ValueError):
+            raise ValueError(f"{where}: frequency, min_duty, max_duty e limites devem ser números")
+        # YAML aceita .nan e .inf, que passam pelas comparações abaixo
+        if not all(math.isfinite(value) for value in [frequency, min_duty, max_duty] + limits):
+            raise ValueError(f"{where}: frequency, min_duty, max_duty e limites devem ser finitos")
+        if frequency <= 0:
+            raise ValueError(f"{where}: frequency deve ser positiva")
+        if min_duty >= max_duty:
+            raise ValueError(f"{where}: min_duty deve ser menor que max_duty")
+        period_us = 1000000 / frequency
+        if min_duty / 100.0 * period_us < MIN_PULSEWIDTH or max_duty / 100.0 * period_us > MAX_PULSEWIDTH:
+            raise ValueError(f"{where}: min_duty/max_duty fora de {MIN_PULSEWIDTH}-{MAX_PULSEWIDTH}us")
+        if any(limit <= 0 for limit in limits):
+            raise ValueError(f"{where}: max_velocity_deg_s e max_accel_deg_s2 devem ser positivos")
+    
+    level = (config.get('logging') or {}).get('level', 'INFO')
+    if str(level).upper() not in LOG_LEVELS:
+        raise ValueError(f"logging.level inválido: {level!r} (use {', '.join(LOG_LEVELS)})")
+    return entries
+
+
+class ConfigReloader:
+    """Relê, valida e aplica a quente o config.yaml"""
+    
+    def __init__(self, path: str, config: dict, servos, logger=None):
+        """
+        Args:
+            path: Caminho do config.yaml
+            config: Configuração em uso (lida na partida)
+            servos: ServoGroup em execução
+            logger: TrichoLogger (nível trocado a quente)
+        """
+        self.path = path
+        self.config = config
+        self.servos = servos
+        self.logger = logger
+        self.reloads = 0
+        self.lock = threading.Lock()
+    
+    def reload(self) -> dict:
+        """
+        Relê o config.yaml e aplica o que mudou.
+        
+        Returns:
+            {"changed": {chave: {"old", "new"}}, "applied": [...], "restart_required": [...]}
+        
+        Raises:
+            ValueError: Arquivo ilegível ou configuração inválida (nada é aplicado)
+        """
+        import yaml
+        with self.lock:
+            try:
+                config = load_config(self.path)
+            except (OSError, yaml.YAMLError) as e:
+                raise ValueError(f"Erro ao ler {self.path}: {e}")
+            entries = validate(config)
+            
+            old, new = flatten(self.config), flatten(config)
+            changed = {key: {'old': old.get(key), 'new': new.get(key)}
+                       for key in sorted(set(old) | set(new)) if old.get(key) != new.get(key)}
+            applied = []
+            if any(HOT_KEY.match(key) for key in changed):
+                applied += self._apply_servos(entries)
+            if LOG_LEVEL_KEY in changed and self.logger:
+                self.logger.set_level(new.get(LOG_LEVEL_KEY) or 'INFO')
+                applied.append(LOG_LEVEL_KEY)
+            restart_required = [key for key in changed if not HOT_KEY.match(key) and key != LOG_LEVEL_KEY]
+            
+            self.config = config
+            self.reloads += 1
+        
+        if self.logger and changed:
+            self.logger.info(f"config.yaml recarregado: aplicado {applied or 'nada'}"
+                             + (f", requer reinício {restart_required}" if restart_required else ""))
+        return {'changed': changed, 'applied': applied, 'restart_required': restart_required}
+    
+    def _apply_servos(self, entries: List[dict]) -> List[str]:
+        """Troca tabelas e limites dos servos que existem em execução (por id)"""
+        applied = []
+        for entry in entries:
+            servo = self.servos.get(entry['id'])
+            if servo is None:
+                continue
+            values = {
+                'min_duty': float(entry.get('min_duty', 2.5)),
+                'max_duty': float(entry.get('max_duty', 12.5)),
+                'max_velocity_deg_s': float(entry.get('max_velocity_deg_s', DEFAULT_MAX_VELOCITY_DEG_S)),
+                'max_accel_deg_s2': float(entry.get('max_accel_deg_s2', DEFAULT_MAX_ACCEL_DEG_S2)),
+            }
+            fields = [field for field in DUTY_FIELDS + LIMIT_FIELDS if values[field] != getattr(servo, field)]
+            if any(field in DUTY_FIELDS for field in fields):
+                servo.set_duty_range(values['min_duty'], values['max_duty'])
+            if any(field in LIMIT_FIELDS for field in fields):
+                servo.set_motion_limits(values['max_velocity_deg_s'], values['max_accel_deg_s2'])
+            applied += [f"{entry['id']}.{field}" for field in fields]
+        return applied
+
+
+class ConfigWatcher:
+    """Thread que chama o callback quando o config.yaml muda (inotify ou polling)"""
+    
+    def __init__(self, path: str, callback, poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+                 debounce_s: float = DEFAULT_DEBOUNCE_S, logger=None):
+        """
+        Args:
+            path: Caminho do config.yaml
+            callback: Função sem argumentos chamada a cada mudança
+            poll_interval_s: Intervalo do polling (sem inotify)
+            debounce_s: Espera após o primeiro evento (gravação em várias escritas)
+            logger: Instância do logger (opcional)
+        """
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.poll_interval_s = poll_interval_s
+        self.debounce_s = debounce_s
+        self.logger = logger
+        self.method = None
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.inotify_fd = None
+        self.stamp = self._stamp()
+    
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+    
+    def start(self):
+        self.inotify_fd = _inotify_watch(os.path.dirname(self.path))
+        self.method = 'inotify' if self.inotify_fd is not None else 'poll'
+        self.thread = threading.Thread(target=self._run, name='config-watch', daemon=True)
+        self.thread.start()
+        if self.logger:
+            self.logger.info(f"Observando {self.path} ({self.method})")
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            if self.inotify_fd is not None:
+                if not self._wait_inotify():
+                    continue
+            elif self.stop_event.wait(self.poll_interval_s):
+                return
+            
+            # Vários eventos por gravação: espera o arquivo assentar e compara o carimbo
+            if self.stop_event.wait(self.debounce_s):
+                return
+            if self.inotify_fd is not None:
+                self._drain_inotify()
+            stamp = self._stamp()
+            if stamp is None or stamp == self.stamp:
+                continue
+            self.stamp = stamp
+            try:
+                self.callback()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Erro ao recarregar {self.path}: {e}", exc_info=True)
+    
+    def _wait_inotify(self) -> bool:
+        """True se algum evento do diretório foi do config.yaml"""
+        readable, _, _ = select.select([self.inotify_fd], [], [], 1.0)
+        if not readable:
+            return False
+        return os.path.basename(self.path) in self._drain_inotify()
+    
+    def _drain_inotify(self) -> set:
+        """Lê os eventos pendentes e retorna os nomes de arquivo envolvidos"""
+        names = set()
+        while True:
+            try:
+                data = os.read(self.inotify_fd, 4096)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                names.add(data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace'))
+                offset += length
+
+
+def _inotify_watch(directory: str) -> Optional[int]:
+    """Descritor inotify (não bloqueante) do diretório, ou None sem suporte"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if fd < 0:
+            return None
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(directory or '.'), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
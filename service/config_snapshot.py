@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cópia pré-processada do config.yaml para a partida rápida.
+O config.yaml lido é gravado em JSON ao lado dele (<config>.snapshot),
+com o tamanho e o mtime do original; enquanto o config.yaml não muda, a
+partida lê o JSON e nem importa o yaml.
+"""
+
+import json
+import os
+
+SNAPSHOT_EXTENSION = '.snapshot'
+VERSION = 1
+
+
+def _source_stamp(path: str) -> list:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_config(path: str) -> dict:
+    """
+    Lê o config.yaml pela cópia em JSON, se ela corresponder ao arquivo atual.
+    Senão, lê o YAML e grava a cópia de novo.
+    
+    Raises:
+        OSError: config.yaml não encontrado
+    """
+    stamp = _source_stamp(path)
+    try:
+        with open(path + SNAPSHOT_EXTENSION, 'r') as f:
+            snapshot = json.load(f)
+        if snapshot.get('version') == VERSION and snapshot.get('source') == stamp:
+            return snapshot['config']
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    import yaml
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    _write_snapshot(path, stamp, config)
+    return config
+
+
+def _write_snapshot(path: str, stamp: list, config: dict):
+    snapshot_path = path + SNAPSHOT_EXTENSION
+    try:
+        with open(snapshot_path + '.tmp', 'w') as f:
+            json.dump({'version': VERSION, 'source': stamp, 'config': config}, f)
+        os.replace(snapshot_path + '.tmp', snapshot_path)
+    except (OSError, TypeError, ValueError):
+        # Diretório somente leitura ou valor sem equivalente em JSON: sem cópia
+        try:
+            os.remove(snapshot_path + '.tmp')
+        except OSError:
+            pass
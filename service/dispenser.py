@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Liberação periódica: o dispensador abre e fecha a uma taxa fixa (cápsulas
+por minuto, ou derivada da velocidade de solo e do espaçamento desejado).
+
+Cada ciclo tem um deadline absoluto (monotonic_ns) contado a partir do
+anterior, como nas missões: o tempo de execução de um ciclo não atrasa os
+seguintes. A thread dorme até pouco antes do deadline e faz espera ativa no
+trecho final. O fechamento é agendado hold_ms após a abertura.
+
+Ciclos atrasados (thread sem CPU, servo ocupado):
+    skip      - ciclos cujo horário já passou de um período inteiro são
+                descartados; a fase do cronograma é mantida
+    catch_up  - os ciclos perdidos são executados em seguida (até
+                max_catch_up; o excedente é descartado), mantendo a
+                contagem total de liberações
+
+A taxa pode mudar com a liberação em andamento: o próximo ciclo fica um
+período novo após o último iniciado (inclusive o que está aberto agora).
+"""
+
+import math
+import threading
+import time
+from array import array
+
+import metrics
+from journal import SOURCE_DISPENSE
+from mission import DEFAULT_SPIN_S
+
+POLICY_SKIP = 'skip'
+POLICY_CATCH_UP = 'catch_up'
+POLICIES = (POLICY_SKIP, POLICY_CATCH_UP)
+
+DEFAULT_MAX_CATCH_UP = 3
+# Período máximo entre ciclos (taxa mínima de 1 ciclo por hora)
+MAX_PERIOD_S = 3600
+# Atrasos guardados para GET /dispense/report (a contagem e o histograma seguem)
+DEFAULT_MAX_RECORDS = 100000
+
+# Estados
+IDLE = 'idle'
+RUNNING = 'running'
+STOPPED = 'stopped'
+
+TIMING_ERROR = metrics.REGISTRY.histogram(
+    'tricho_dispense_timing_error_seconds', 'Atraso da abertura de cada ciclo da liberação periódica',
+    buckets=metrics.JITTER_BUCKETS)
+CYCLES = metrics.REGISTRY.counter(
+    'tricho_dispense_cycles_total', 'Ciclos da liberação periódica por resultado', ('result',))
+
+
+def parse_rate(data: dict) -> float:
+    """
+    Taxa em ciclos por minuto: "rate_per_min" ou "ground_speed_m_s" e "spacing_m".
+    
+    Raises:
+        ValueError: Parâmetros ausentes ou não positivos
+    """
+    by_speed = data.get('ground_speed_m_s') is not None and data.get('spacing_m') is not None
+    if data.get('rate_per_min') is None and not by_speed:
+        raise ValueError('Informe "rate_per_min" ou "ground_speed_m_s" e "spacing_m"')
+    try:
+        if data.get('rate_per_min') is not None:
+            rate = float(data['rate_per_min'])
+        else:
+            rate = 60.0 * float(data['ground_speed_m_s']) / float(data['spacing_m'])
+    except (TypeError, ValueError, ZeroDivisionError):
+        raise ValueError('"rate_per_min", "ground_speed_m_s" e "spacing_m" devem ser números positivos')
+    # Infinity (aceito pelo json.loads) ou overflow da velocidade / espaçamento
+    if not math.isfinite(rate):
+        raise ValueError("A taxa deve ser finita")
+    if not rate > 0:
+        raise ValueError("A taxa deve ser positiva")
+    return rate
+
+
+class PeriodicDispenser:
+    """Ciclos abre/fecha com deadlines absolutos em uma thread dedicada"""
+    
+    def __init__(self, servo, open_angle: float = 120, closed_angle: float = 60, hold_ms: float = 150,
+                 policy: str = POLICY_SKIP, max_catch_up: int = DEFAULT_MAX_CATCH_UP,
+                 spin_s: float = DEFAULT_SPIN_S, max_records: int = DEFAULT_MAX_RECORDS, logger=None):
+        """
+        Args:
+            servo: Instância de ServoControl
+            open_angle: Ângulo de liberação
+            closed_angle: Ângulo de repouso (fechado)
+            hold_ms: Tempo aberto em cada ciclo
+            policy: "skip" ou "catch_up" para ciclos atrasados
+            max_catch_up: Ciclos atrasados executados em seguida (catch_up)
+            spin_s: Espera ativa antes de cada abertura (segundos)
+            max_records: Atrasos por ciclo guardados para o relatório
+            logger: Instância do logger (opcional)
+        """
+        self.servo = servo
+        self.open_angle = open_angle
+        self.closed_angle = closed_angle
+        self.hold_ns = int(hold_ms * 1e6)
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.spin_ns = int(spin_s * 1e9)
+        self.max_records = max_records
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.wake = threading.Event()   # Parada e mudança de taxa
+        self.thread = None
+        self.state = IDLE
+        self.rate_per_min = None
+        self.period_ns = 0
+        self.max_cycles = None
+        self.reset_progress()
+    
+    def reset_progress(self):
+        self.cycle = 0                   # Próximo ciclo do cronograma (executados + descartados)
+        self.anchor_cycle = 0            # Cronograma: deadline(c) = anchor_ns + (c - anchor_cycle) * período
+        self.anchor_ns = 0
+        self.last_deadline_ns = None     # Deadline do último ciclo iniciado
+        self.dispensing = False          # Ciclo self.cycle aberto (no hold)
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors_us = array('i')      # Atraso da abertura de cada ciclo executado (µs)
+        self.cycles = array('I')         # Índice do ciclo no cronograma
+        self.started_at = None
+        self.finished_at = None
+        self.stop_requested = False
+    
+    # Comandos
+    
+    def start(self, data: dict) -> dict:
+        """
+        Inicia a liberação periódica.
+        
+        Args:
+            data: {"rate_per_min"} ou {"ground_speed_m_s", "spacing_m"}; opcionais:
+                  "policy", "open_angle", "closed_angle", "hold_ms", "cycles" (limite)
+        
+        Raises:
+            ValueError: Parâmetros inválidos ou liberação já em andamento
+        """
+        rate = parse_rate(data)
+        policy = data.get('policy', self.policy)
+        if policy not in POLICIES:
+            raise ValueError(f'"policy" deve ser {" ou ".join(POLICIES)}')
+        try:
+            open_angle = float(data.get('open_angle', self.open_angle))
+            closed_angle = float(data.get('closed_angle', self.closed_angle))
+            hold_ns = int(float(data.get('hold_ms', self.hold_ns / 1e6)) * 1e6)
+            max_cycles = int(data['cycles']) if data.get('cycles') is not None else None
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError('"open_angle", "closed_angle", "hold_ms" e "cycles" devem ser numéricos')
+        if not (0 <= open_angle <= 180 and 0 <= closed_angle <= 180):
+            raise ValueError("Ângulos devem estar entre 0 e 180")
+        if hold_ns <= 0 or (max_cycles is not None and max_cycles <= 0):
+            raise ValueError('"hold_ms" e "cycles" devem ser positivos')
+        period_ns = self._period_ns(rate, hold_ns)
+        
+        with self.lock:
+            if self.state == RUNNING:
+                raise ValueError("Liberação periódica já em andamento (use stop antes)")
+            self.reset_progress()
+            self.open_angle = open_angle
+            self.closed_angle = closed_angle
+            self.hold_ns = hold_ns
+            self.policy = policy
+            self.max_cycles = max_cycles
+            self.rate_per_min = rate
+            self.period_ns = period_ns
+            self.anchor_ns = time.monotonic_ns()
+            self.wake.clear()
+            self.state = RUNNING
+            self.started_at = time.time()
+            self.thread = threading.Thread(target=self._run, name='dispense', daemon=True)
+            self.thread.start()
+        self._log_info(f"Liberação periódica iniciada: {rate:.2f}/min ({period_ns / 1e9:.3f}s), "
+                       f"{open_angle}°/{closed_angle}°, {hold_ns / 1e6:.0f}ms, {policy}")
+        return self.status()
+    
+    def set_rate(self, data: dict) -> dict:
+        """
+        Troca a taxa com a liberação em andamento: o próximo ciclo fica um
+        período novo após o último iniciado.
+        
+        Raises:
+            ValueError: Taxa inválida ou liberação parada
+        """
+        rate = parse_rate(data)
+        with self.lock:
+            if self.state != RUNNING:
+                raise ValueError("Liberação periódica não está em andamento")
+            period_ns = self._period_ns(rate, self.hold_ns)
+            # Durante o hold, self.cycle é o ciclo aberto: o cronograma novo começa no seguinte
+            self.anchor_cycle = self.cycle + 1 if self.dispensing else self.cycle
+            self.anchor_ns = (self.last_deadline_ns + period_ns if self.last_deadline_ns is not None
+                              else self.anchor_ns)
+            self.rate_per_min = rate
+            self.period_ns = period_ns
+            self.wake.set()
+        self._log_info(f"Taxa de liberação: {rate:.2f}/min ({period_ns / 1e9:.3f}s)")
+        return self.status()
+    
+    def stop(self, wait: bool = True) -> dict:
+        """
+        Interrompe a liberação (o servo termina fechado).
+        
+        Args:
+            wait: Se True, aguarda a thread terminar (POST /stop não espera)
+        """
+        with self.lock:
+            if self.state == RUNNING:
+                self.stop_requested = True
+                self.wake.set()
+        if wait and self.thread:
+            self.thread.join(timeout=2.0)
+        return self.status()
+    
+    # Consulta
+    
+    def status(self) -> dict:
+        return {
+            'state': self.state,
+            'rate_per_min': self.rate_per_min,
+            'period_s': self.period_ns / 1e9 if self.period_ns else None,
+            'policy': self.policy,
+            'open_angle': self.open_angle,
+            'closed_angle': self.closed_angle,
+            'hold_ms': self.hold_ns / 1e6,
+            'cycles_limit': self.max_cycles,
+            'cycles_scheduled': self.cycle,
+            'cycles_done': self.done,
+            'cycles_skipped': self.skipped,
+            'cycles_failed': self.failed,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'timing_error_us': self.timing_summary(),
+        }
+    
+    def timing_summary(self) -> dict:
+        errors = sorted(self.errors_us)
+        if not errors:
+            return {'count': 0}
+        return {
+            'count': len(errors),
+            'mean': round(sum(errors) / len(errors), 1),
+            'p50': errors[len(errors) // 2],
+            'p99': errors[min(len(errors) - 1, int(len(errors) * 0.99))],
+            'max': errors[-1],
+        }
+    
+    def report(self, offset: int = 0, limit: int = 1000) -> dict:
+        """Atraso da abertura de cada ciclo executado (µs), com o índice no cronograma"""
+        rows = [{'cycle': cycle, 'error_us': error}
+                for cycle, error in zip(self.cycles[offset:offset + limit], self.errors_us[offset:offset + limit])]
+        return {'offset': offset, 'count': len(self.errors_us), 'cycles': rows}
+    
+    # Execução
+    
+    def _period_ns(self, rate: float, hold_ns: int) -> int:
+        # Taxa positiva ínfima (1e-300): o período estouraria int() e a espera do Event
+        if 60.0 / rate > MAX_PERIOD_S:
+            raise ValueError(f"Taxa baixa demais (mínimo: {60.0 / MAX_PERIOD_S:g}/min, "
+                             f"período máximo de {MAX_PERIOD_S}s)")
+        period_ns = int(60e9 / rate)
+        if period_ns < 2 * hold_ns:
+            raise ValueError(f"Taxa {rate:.2f}/min alta demais para hold_ms={hold_ns / 1e6:.0f} "
+                             f"(período mínimo: 2 × hold_ms)")
+        return period_ns
+    
+    def _deadline(self, cycle: int) -> int:
+        return self.anchor_ns + (cycle - self.anchor_cycle) * self.period_ns
+    
+    def _wait_until(self, deadline_ns: int) -> bool:
+        """Dorme até deadline_ns (espera ativa no final); False se acordado por parada ou nova taxa"""
+        while True:
+            remaining = deadline_ns - time.monotonic_ns() - self.spin_ns
+            if remaining <= 0:
+                break
+            if self.wake.wait(remaining / 1e9):
+                self.wake.clear()
+                return False
+        while time.monotonic_ns() < deadline_ns:
+            pass
+        return True
+    
+    def _run(self):
+        earliest_ns = 0   # Tempo fechado mínimo entre ciclos (catch_up)
+        try:
+            while not self.stop_requested:
+                if self.max_cycles is not None and self.cycle >= self.max_cycles:
+                    break
+                with self.lock:
+                    deadline = self._deadline(self.cycle)
+                    period_ns = self.period_ns
+                if not self._wait_until(max(deadline, earliest_ns)):
+                    continue
+                if self.stop_requested:
+                    break
+                
+                now = time.monotonic_ns()
+                behind = (now - deadline) // period_ns   # Horários seguintes que também já passaram
+                drop = behind if self.policy == POLICY_SKIP else behind - self.max_catch_up
+                if drop > 0:
+                    with self.lock:
+                        self.cycle += drop
+                        self.skipped += drop
+                    CYCLES.labels('skipped').inc(drop)
+                    continue
+                
+                opened_ns = self._dispense(deadline, now)
+                earliest_ns = opened_ns + 2 * self.hold_ns
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Erro na liberação periódica: {e}", exc_info=True)
+        finally:
+            # Termina fechado
+            self.servo.set_angle(self.closed_angle, settle=False, source=SOURCE_DISPENSE)
+        
+        with self.lock:
+            self.state = STOPPED
+            self.finished_at = time.time()
+        summary = self.timing_summary()
+        self._log_info(f"Liberação periódica encerrada: {self.done} ciclos, {self.skipped} descartados, "
+                       f"atraso p50 {summary.get('p50', 0)}us, máx {summary.get('max', 0)}us")
+    
+    def _dispense(self, deadline: int, now: int) -> int:
+        """Abre, espera hold e fecha; retorna o instante da abertura"""
+        error_ns = now - deadline
+        with self.lock:
+            # Referência de set_rate já na abertura (a taxa pode mudar no hold)
+            self.last_deadline_ns = deadline
+            self.dispensing = True
+        ok = self.servo.set_angle(self.open_angle, settle=False, source=SOURCE_DISPENSE, deadline_ns=deadline)
+        opened_ns = now
+        # Fechamento agendado a partir da abertura real (não encurta o tempo
+        # aberto); nova taxa não interrompe, a parada fecha na hora
+        while not self._wait_until(opened_ns + self.hold_ns) and not self.stop_requested:
+            pass
+        ok = self.servo.set_angle(self.closed_angle, settle=False, source=SOURCE_DISPENSE,
+                                  deadline_ns=opened_ns + self.hold_ns) and ok
+        
+        with self.lock:
+            self.dispensing = False
+            if len(self.errors_us) < self.max_records:
+                self.errors_us.append(min(error_ns // 1000, 2 ** 31 - 1))
+                self.cycles.append(self.cycle)
+            self.cycle += 1
+            self.done += 1
+            if not ok:
+                self.failed += 1
+        TIMING_ERROR.observe(error_ns / 1e9)
+        CYCLES.labels('done' if ok else 'failed').inc()
+        return opened_ns
+    
+    def _log_info(self, message: str):
+        if self.logger:
+            self.logger.info(message)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planos de voo compilados (.tfp): layout binário de largura fixa lido por
+mmap, para planos com dezenas de milhares de pontos de liberação sem
+json.load nem cópia para a memória. Cada coluna do cronograma (ver
+mission.MissionPlan) fica contígua no arquivo e vira um memoryview; só as
+páginas tocadas pela missão são lidas do cartão.
+
+Layout (little-endian, como na Raspberry Pi):
+    cabeçalho (64 bytes): "TFP1", versão, modo, ações, eventos, nome
+    offsets_ns  int64  × ações
+    segment_of  uint32 × ações
+    events      uint32 × ações
+    angles_cd   uint16 × ações
+
+Índice lateral (<arquivo>.tfp.idx), refeito se o .tfp mudar:
+    segmentos (segmento, primeira ação, fim) e uma amostra (ação, tempo) a
+    cada INDEX_STRIDE ações para começar/retomar no meio por tempo.
+    Só é gravado depois de uma passada de validação pelas colunas: um .idx
+    correspondente ao .tfp atual dispensa essa passada nas cargas seguintes.
+
+Conversão dos planos .json/.txt:
+    python3 service/flight_file.py convert plano.json [saida.tfp]
+    python3 service/flight_file.py info plano.tfp
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterator, Optional, Tuple
+
+from mission import MAX_EVENTS, MODE_TIMED, MODE_WAYPOINT, NO_EVENT, MissionPlan, compile_plan, parse_events
+
+EXTENSION = '.tfp'
+INDEX_EXTENSION = '.idx'
+
+MAGIC = b'TFP1'
+VERSION = 1
+HEADER = struct.Struct('<4sHBxII48s')
+MODES = (MODE_TIMED, MODE_WAYPOINT)
+
+INDEX_MAGIC = b'TFPX'
+# v2: o índice só existe para um .tfp já validado (v1 era gravado sem validar)
+INDEX_VERSION = 2
+INDEX_HEADER = struct.Struct('<4sHHqqII')
+INDEX_STRIDE = 256
+
+# Colunas em ordem de largura (mantém o alinhamento sem padding)
+COLUMNS = (('offsets_ns', 'q'), ('segment_of', 'I'), ('events', 'I'), ('angles_cd', 'H'))
+
+
+def write(plan: MissionPlan, path: str):
+    """Grava um cronograma compilado no formato .tfp (e o índice lateral)"""
+    if sys.byteorder != 'little':
+        raise ValueError("Formato .tfp exige arquitetura little-endian")
+    name = plan.name.encode('utf-8')[:48]
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, MODES.index(plan.mode), len(plan), plan.event_count, name))
+        for attribute, typecode in COLUMNS:
+            f.write(array(typecode, getattr(plan, attribute)).tobytes())
+    os.replace(tmp_path, path)
+    with FlightFile(path) as flight:
+        flight.index()
+
+
+class FlightFile:
+    """
+    Plano .tfp mapeado em memória.
+    As colunas são memoryviews sobre o mmap: plan() monta um MissionPlan
+    sem copiar as ações.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Raises:
+            ValueError: Arquivo inválido ou truncado
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Formato .tfp exige arquitetura little-endian")
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{os.path.basename(path)}: arquivo .tfp truncado")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        
+        magic, version, mode, count, events, name = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or mode >= len(MODES):
+            self.close()
+            raise ValueError(f"{os.path.basename(path)}: não é um plano .tfp v{VERSION}")
+        if size != HEADER.size + count * sum(struct.calcsize(t) for _, t in COLUMNS):
+            self.close()
+            raise ValueError(f"{os.path.basename(path)}: arquivo .tfp truncado")
+        
+        self.mode = MODES[mode]
+        self.name = name.rstrip(b'\0').decode('utf-8', 'replace')
+        self.count = count
+        self.event_count = events
+        self.columns = {}
+        view = memoryview(self.map)
+        offset = HEADER.size
+        for attribute, typecode in COLUMNS:
+            width = struct.calcsize(typecode) * count
+            self.columns[attribute] = view[offset:offset + width].cast(typecode)
+            offset += width
+        self.segments = None
+        self.samples = None
+        self.sample_offsets = None
+    
+    def __len__(self):
+        return self.count
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        # As colunas apontam para o mmap: soltar antes de fechar
+        for column in getattr(self, 'columns', {}).values():
+            column.release()
+        self.columns = {}
+        if getattr(self, 'map', None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+    
+    def record(self, action: int) -> Tuple[int, int, int, int]:
+        """Ação como (offset_ns, segmento, evento, ângulo_cd)"""
+        return tuple(self.columns[attribute][action] for attribute, _ in COLUMNS)
+    
+    def iter_records(self, start: int = 0) -> Iterator[Tuple[int, int, int, int]]:
+        """Percorre as ações a partir de start, uma por vez"""
+        columns = [self.columns[attribute] for attribute, _ in COLUMNS]
+        for action in range(start, self.count):
+            yield tuple(column[action] for column in columns)
+    
+    def validate(self, max_events: int = MAX_EVENTS):
+        """
+        Confere o cronograma como compile_plan faria (o .tfp pode ter sido
+        editado ou corrompido depois da conversão). Os limites do cabeçalho
+        são conferidos sempre; as colunas só quando o índice lateral precisa
+        ser refeito (ver index()).
+        
+        Raises:
+            ValueError: Limite de eventos, ângulo, tempo ou ordem inválidos
+        """
+        label = os.path.basename(self.path)
+        if not self.count or not self.event_count:
+            raise ValueError(f"{label}: plano sem ações")
+        if self.event_count > max_events:
+            raise ValueError(f"{label}: máximo de {max_events} eventos por plano")
+        # Cada evento gera a ação e, com hold_ms, o retorno ao repouso
+        if self.count > 2 * self.event_count:
+            raise ValueError(f"{label}: mais ações ({self.count}) que o plano de {self.event_count} eventos")
+        self.index()
+    
+    def index(self) -> Tuple[dict, array, array]:
+        """
+        Índice por segmento e amostras por tempo.
+        Lido do .idx se corresponder ao .tfp atual; senão as colunas são
+        validadas e o índice refeito em uma passada e gravado de novo.
+        
+        Raises:
+            ValueError: Ângulo, tempo ou ordem inválidos (índice não gravado)
+        """
+        if self.segments is None:
+            loaded = self._read_index()
+            if loaded is None:
+                self._validate_columns()
+                loaded = self._build_index()
+                self._write_index(*loaded)
+            self.segments, self.samples, self.sample_offsets = loaded
+        return self.segments, self.samples, self.sample_offsets
+    
+    def plan(self) -> MissionPlan:
+        """MissionPlan com as colunas mapeadas (o FlightFile fica aberto com o plano)"""
+        segments, samples, sample_offsets = self.index()
+        plan = MissionPlan(self.name, self.mode, os.path.basename(self.path))
+        for attribute, _ in COLUMNS:
+            setattr(plan, attribute, self.columns[attribute])
+        plan.segments = segments
+        plan.samples = samples
+        plan.sample_offsets = sample_offsets
+        plan.event_count = self.event_count
+        plan.storage = 'mmap'
+        plan.flight_file = self
+        return plan
+    
+    def _source_stamp(self) -> Tuple[int, int]:
+        stat = os.fstat(self.file.fileno())
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _validate_columns(self):
+        label = os.path.basename(self.path)
+        offsets_ns = self.columns['offsets_ns']
+        segment_of = self.columns['segment_of']
+        events = self.columns['events']
+        angles_cd = self.columns['angles_cd']
+        seen = set()
+        previous_segment, previous_offset = None, 0
+        for action in range(self.count):
+            segment, offset = segment_of[action], offsets_ns[action]
+            if angles_cd[action] > 18000:
+                raise ValueError(f"{label}: ação {action}: ângulo fora de 0-180")
+            if offset < 0:
+                raise ValueError(f"{label}: ação {action}: tempo negativo")
+            if events[action] != NO_EVENT and events[action] >= self.event_count:
+                raise ValueError(f"{label}: ação {action}: evento {events[action]} inexistente")
+            if segment != previous_segment:
+                if segment in seen or (self.mode == MODE_TIMED and segment != 0):
+                    raise ValueError(f"{label}: ação {action}: segmentos fora de ordem")
+                seen.add(segment)
+            elif offset < previous_offset:
+                raise ValueError(f"{label}: ação {action}: ações fora de ordem no tempo")
+            previous_segment, previous_offset = segment, offset
+    
+    def _build_index(self) -> Tuple[dict, array, array]:
+        segment_of = self.columns['segment_of']
+        offsets_ns = self.columns['offsets_ns']
+        segments = {}
+        samples = array('I')
+        first = 0
+        for action in range(1, self.count + 1):
+            if action == self.count or segment_of[action] != segment_of[first]:
+                segments[segment_of[first]] = (first, action)
+                samples.extend(range(first, action, INDEX_STRIDE))
+                first = action
+        sample_offsets = array('q', (offsets_ns[action] for action in samples))
+        return segments, samples, sample_offsets
+    
+    def _read_index(self) -> Optional[Tuple[dict, array, array]]:
+        try:
+            with open(self.path + INDEX_EXTENSION, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < INDEX_HEADER.size:
+            return None
+        magic, version, stride, size, mtime_ns, n_segments, n_samples = INDEX_HEADER.unpack_from(data, 0)
+        if (magic != INDEX_MAGIC or version != INDEX_VERSION or stride != INDEX_STRIDE
+                or (size, mtime_ns) != self._source_stamp()
+                or len(data) != INDEX_HEADER.size + 12 * n_segments + 12 * n_samples):
+            return None
+        offset = INDEX_HEADER.size
+        table = array('I', data[offset:offset + 12 * n_segments])
+        segments = {table[i]: (table[i + 1], table[i + 2]) for i in range(0, len(table), 3)}
+        offset += 12 * n_segments
+        sample_offsets = array('q', data[offset:offset + 8 * n_samples])
+        samples = array('I', data[offset + 8 * n_samples:])
+        return segments, samples, sample_offsets
+    
+    def _write_index(self, segments: dict, samples: array, sample_offsets: array):
+        table = array('I')
+        for segment, (first, end) in segments.items():
+            table.extend((segment, first, end))
+        size, mtime_ns = self._source_stamp()
+        path = self.path + INDEX_EXTENSION
+        try:
+            with open(path + '.tmp', 'wb') as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, INDEX_STRIDE, size, mtime_ns,
+                                          len(segments), len(samples)))
+                f.write(table.tobytes())
+                f.write(sample_offsets.tobytes())
+                f.write(samples.tobytes())
+            os.replace(path + '.tmp', path)
+        except OSError:
+            # Diretório somente leitura: o índice fica só na memória (e as
+            # colunas são validadas de novo a cada carga)
+            pass
+
+
+def convert(source: str, destination: Optional[str] = None) -> str:
+    """
+    Converte um plano .json/.txt para .tfp (valida como no POST /missions/load).
+    
+    Returns:
+        Caminho do arquivo .tfp gravado
+    """
+    destination = destination or os.path.splitext(source)[0] + EXTENSION
+    plan = compile_plan(parse_events(source), source=os.path.basename(source))
+    write(plan, destination)
+    return destination
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planos de voo compilados (.tfp)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert_parser = commands.add_parser('convert', help="Converte .json/.txt para .tfp")
+    convert_parser.add_argument('source')
+    convert_parser.add_argument('destination', nargs='?')
+    info_parser = commands.add_parser('info', help="Resumo de um arquivo .tfp")
+    info_parser.add_argument('path')
+    args = parser.parse_args()
+    
+    try:
+        path = convert(args.source, args.destination) if args.command == 'convert' else args.path
+        with FlightFile(path) as flight:
+            summary = dict(flight.plan().summary(), path=path)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Erro: {e}")
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
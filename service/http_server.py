@@ -8,21 +8,193 @@ Substitui a solução Bluetooth por HTTP REST API
 import sys
 import os
 import signal
-import yaml
+import argparse
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+import time
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
 # Importa módulos do serviço
 from logger import create_logger
-from servo_control import ServoControl
+import metrics
+from batch import BatchRunner, compile_steps
+from config_snapshot import load_config
+from response_cache import ResponseCache, etag_matches
+from motion_profile import PROFILE_STEP
+from utils import parse_angle_value, parse_flag, parse_profile, parse_sweep_params
+import state_events
+import ws_control
 
 
 class ServoHTTPHandler(BaseHTTPRequestHandler):
     """Handler para requisições HTTP"""
     
+    # HTTP/1.1: conexões persistentes (keep-alive) com Content-Length em todas as respostas
+    protocol_version = "HTTP/1.1"
+    
+    # Tempo máximo ocioso de uma conexão persistente (segundos)
+    timeout = 15
+    
+    # Cabeçalhos e corpo saem em escritas separadas: sem TCP_NODELAY o Nagle
+    # somado ao ACK atrasado do cliente adiciona ~40ms por resposta em keep-alive
+    disable_nagle_algorithm = True
+    
+    # Máximo de requisições por conexão antes de responder "Connection: close"
+    max_requests_per_connection = 1000
+    requests_handled = 0
+    
     servo = None
     logger = None
+    jobs = None
+    motion = None
+    udp = None
+    batch = None
+    missions = None
+    dispenser = None
+    journal = None
+    servos = None
+    calibration = {}
+    calibrators = {}  # id do servo -> CalibrationManager
+    config_reloader = None
+    config_watcher = None
+    
+    # Instrumentação de temporização dos pulsos (GET /timing); None: desligada
+    timing_trace = None
+    timing_capacity = 65536
+    
+    # Respostas pré-serializadas de /, /ping, /status e /angle
+    response_cache = ResponseCache()
+    
+    # Canal WebSocket (GET /ws)
+    websocket_enabled = True
+    ws_idle_timeout_s = 60
+    
+    # Notificação de mudanças de estado (GET /events e GET /status?since=)
+    events_enabled = True
+    events_heartbeat_s = state_events.DEFAULT_HEARTBEAT_S
+    longpoll_max_s = state_events.DEFAULT_LONGPOLL_MAX_S
+    events_slots = threading.BoundedSemaphore(state_events.DEFAULT_MAX_CLIENTS)
+    
+    # Long-poll esperando na thread do handler (o motor asyncio espera no event loop)
+    blocking_waits = True
+    
+    # Partida rápida: False até os servos e componentes subirem (start_services)
+    ready = True
+    # Rotas atendidas antes disso (as demais respondem 503)
+    STARTUP_ROUTES = {'/', '/ping', '/status', '/metrics'}
+    
+    # Rotas com série própria em /metrics (demais caminhos: "other")
+    METRIC_ROUTES = {'/', '/ping', '/status', '/angle', '/jobs', '/metrics', '/ws', '/events',
+                     '/calibrate', '/sweep', '/batch', '/missions', '/journal', '/stop',
+                     '/servos', '/servos/angles', '/config/reload', '/dispense',
+                     '/timing', '/timing/events'}
+    METRIC_PREFIXES = (('/jobs/', '/jobs/<id>'), ('/calibrate/', '/calibrate/<action>'),
+                       ('/missions/', '/missions/<action>'), ('/servos/', '/servos/<id>/angle'),
+                       ('/dispense/', '/dispense/<action>'), ('/timing/', '/timing/<action>'))
+    
+    request_start = None
+    
+    @classmethod
+    def route_label(cls, path: str) -> str:
+        """Rota normalizada para labels de métricas (limita a cardinalidade)"""
+        if path in cls.METRIC_ROUTES:
+            return path
+        for prefix, template in cls.METRIC_PREFIXES:
+            if path.startswith(prefix):
+                return template
+        return 'other'
+    
+    @classmethod
+    def websocket_session(cls):
+        """Cria a sessão de controle de uma conexão WebSocket"""
+        return ws_control.ControlSession(cls.servo, motion=cls.motion, jobs=cls.jobs, logger=cls.logger,
+                                         stop=cls.stop_all)
+    
+    @classmethod
+    def calibrator_for(cls, servo_id=None):
+        """CalibrationManager do servo (padrão: principal); None se o id não existir"""
+        if servo_id is None and cls.servo:
+            servo_id = cls.servo.servo_id
+        return cls.calibrators.get(servo_id)
+    
+    @classmethod
+    def stop_all(cls):
+        """
+        Parada comum a POST /stop, ao WebSocket e ao UDP: descarta o alvo
+        pendente e interrompe lote, missão, liberação periódica e os sweeps
+        de todos os servos do grupo.
+        Não aguarda as threads: nenhuma delas move mais o servo após o sinal.
+        """
+        if cls.motion:
+            cls.motion.clear()
+        if cls.batch:
+            cls.batch.abort()
+        if cls.missions:
+            cls.missions.abort(wait=False)
+        if cls.dispenser:
+            cls.dispenser.stop(wait=False)
+        # Todos os servos do grupo: qualquer um pode estar em um sweep ou assentando
+        servos = cls.servos.servos.values() if cls.servos else ([cls.servo] if cls.servo else [])
+        for servo in servos:
+            servo.stop_sweep(wait=False)
+    
+    @classmethod
+    def long_poll_params(cls, target: str):
+        """
+        Parâmetros de long-poll de GET /status?since=<versão>[&timeout=<s>].
+        
+        Returns:
+            Tupla (since, timeout) ou None se não for long-poll
+            
+        Raises:
+            ValueError: since/timeout inválidos
+        """
+        parsed = urlparse(target)
+        if parsed.path != '/status':
+            return None
+        params = parse_qs(parsed.query)
+        if 'since' not in params:
+            return None
+        since = int(params['since'][0])
+        timeout = float(params.get('timeout', [cls.longpoll_max_s])[0])
+        return since, max(0.0, min(timeout, cls.longpoll_max_s))
+    
+    @classmethod
+    def set_timing(cls, enabled: bool):
+        """Liga (criando o buffer na primeira vez) ou desliga a instrumentação em todos os servos"""
+        if enabled and cls.timing_trace is None:
+            from timing_trace import TimingTrace
+            cls.timing_trace = TimingTrace(cls.timing_capacity)
+        for servo in (cls.servos.servos.values() if cls.servos else []):
+            servo.trace = cls.timing_trace if enabled else None
+    
+    @classmethod
+    def timing_enabled(cls) -> bool:
+        return bool(cls.servo and cls.servo.trace)
+    
+    @classmethod
+    def state_version(cls) -> int:
+        """Versão atual do estado do servo (0 sem servo)"""
+        return cls.servo.state_version if cls.servo else 0
+    
+    @classmethod
+    def status_response(cls) -> dict:
+        """Corpo de GET /status (também enviado nos eventos de /events)"""
+        return {
+            'status': 'ok',
+            'servo_initialized': cls.servo.is_initialized if cls.servo else False,
+            'servo_angle': int(cls.servo.get_angle()) if cls.servo else 0,
+            'is_sweeping': cls.servo.is_sweeping() if cls.servo else False,
+            'gpio_pin': cls.servo.pin if cls.servo else None,
+            'state_version': cls.state_version()
+        }
+    
+    @classmethod
+    def state_snapshot(cls):
+        """Versão e corpo JSON (em cache) do estado atual"""
+        version = cls.state_version()
+        return version, cls.response_cache.get('/status', version, cls.status_response).body
     
     def do_GET(self):
         """Processa requisições GET"""
@@ -31,19 +203,47 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
         params = parse_qs(parsed.query)
         
         try:
+            if not self.ready and path not in self.STARTUP_ROUTES:
+                self.send_json({'status': 'error', 'message': 'Serviço iniciando'}, 503)
+                return
+            
             # PING - Teste de conectividade
             if path == '/ping':
-                self.send_json({'status': 'ok', 'message': 'PONG'})
+                self.send_cached('/ping', 0, lambda: {'status': 'ok', 'message': 'PONG'})
             
-            # STATUS - Informações do sistema
+            # STATUS - Informações do sistema (contadores internos com ?detail=1)
             elif path == '/status':
-                response = {
-                    'status': 'ok',
-                    'servo_initialized': self.servo.is_initialized if self.servo else False,
-                    'servo_angle': int(self.servo.get_angle()) if self.servo else 0,
-                    'gpio_pin': 4
-                }
-                self.send_json(response)
+                if params.get('detail', ['0'])[0] not in ('0', ''):
+                    response = self.status_response()
+                    if self.motion:
+                        response['motion'] = self.motion.stats()
+                    if self.udp:
+                        response['udp'] = self.udp.stats()
+                    if self.batch:
+                        response['batch'] = self.batch.stats()
+                    if self.missions:
+                        response['mission'] = self.missions.status()
+                    if self.dispenser:
+                        response['dispense'] = self.dispenser.status()
+                    if self.journal:
+                        response['journal'] = self.journal.stats()
+                    if self.logger:
+                        response['logging'] = self.logger.stats()
+                    response['response_cache'] = self.response_cache.stats()
+                    response['ready'] = self.ready
+                    self.send_json(response)
+                    return
+                
+                # Long-poll: responde quando a versão mudar (ou no timeout)
+                try:
+                    long_poll = self.long_poll_params(self.path)
+                except ValueError:
+                    self.send_json({'status': 'error', 'message': '"since" e "timeout" devem ser numéricos'}, 400)
+                    return
+                if long_poll and self.blocking_waits and self.servo:
+                    self.servo.wait_for_change(*long_poll)
+                
+                self.send_cached('/status', self.state_version(), self.status_response)
             
             # GET_ANGLE - Ângulo atual
             elif path == '/angle':
@@ -51,20 +251,179 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
                     self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
                     return
                 
-                angle = int(self.servo.get_angle())
-                self.send_json({'status': 'ok', 'angle': angle})
+                self.send_cached('/angle', self.state_version(),
+                                 lambda: {'status': 'ok', 'angle': int(self.servo.get_angle())})
+            
+            # JOBS - Lista jobs recentes
+            elif path == '/jobs':
+                jobs = self.jobs.list() if self.jobs else []
+                self.send_json({'status': 'ok', 'jobs': [job.to_dict() for job in jobs]})
+            
+            # JOB - Progresso de um job
+            elif path.startswith('/jobs/'):
+                job = self.jobs.get(path[len('/jobs/'):]) if self.jobs else None
+                if not job:
+                    self.send_json({'status': 'error', 'message': 'Job não encontrado'}, 404)
+                    return
+                
+                self.send_json(dict({'status': 'ok'}, **job.to_dict()))
+            
+            # CALIBRAÇÃO - Tabela em uso e sessão guiada
+            elif path == '/calibrate':
+                if not self.calibrators:
+                    self.send_json({'status': 'error', 'message': 'Calibração indisponível'}, 500)
+                    return
+                calibrator = self.calibrator_for(params.get('servo', [None])[0])
+                if not calibrator:
+                    self.send_json({'status': 'error', 'message': 'Servo não encontrado'}, 404)
+                    return
+                
+                self.send_json(dict({'status': 'ok'}, **calibrator.status()))
+            
+            # MISSÕES - Planos de voo disponíveis e missão carregada
+            elif path == '/missions':
+                if not self.missions:
+                    self.send_json({'status': 'error', 'message': 'Missões indisponíveis'}, 500)
+                    return
+                
+                self.send_json({'status': 'ok', 'files': self.missions.list_files(),
+                                'mission': self.missions.status()})
+            
+            # MISSÃO - Progresso e atraso de cada ação executada
+            elif path in ('/missions/current', '/missions/report'):
+                if not self.missions:
+                    self.send_json({'status': 'error', 'message': 'Missões indisponíveis'}, 500)
+                    return
+                
+                if path == '/missions/current':
+                    self.send_json(dict({'status': 'ok'}, **self.missions.status()))
+                    return
+                try:
+                    offset = int(params.get('offset', ['0'])[0])
+                    limit = int(params.get('limit', ['1000'])[0])
+                except ValueError:
+                    self.send_json({'status': 'error', 'message': '"offset" e "limit" devem ser inteiros'}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **self.missions.report(max(0, offset), max(0, limit))))
+            
+            # LIBERAÇÃO PERIÓDICA - Estado e atraso de cada ciclo
+            elif path in ('/dispense', '/dispense/report'):
+                if not self.dispenser:
+                    self.send_json({'status': 'error', 'message': 'Liberação periódica indisponível'}, 500)
+                    return
+                
+                if path == '/dispense':
+                    self.send_json(dict({'status': 'ok'}, **self.dispenser.status()))
+                    return
+                try:
+                    offset = int(params.get('offset', ['0'])[0])
+                    limit = int(params.get('limit', ['1000'])[0])
+                except ValueError:
+                    self.send_json({'status': 'error', 'message': '"offset" e "limit" devem ser inteiros'}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **self.dispenser.report(max(0, offset), max(0, limit))))
+            
+            # TIMING - Atraso, jitter, espera pelo lock e chamada ao pigpio de cada pulso
+            elif path in ('/timing', '/timing/events'):
+                trace = self.timing_trace
+                if path == '/timing':
+                    from timing_trace import summarize
+                    response = {'status': 'ok', 'enabled': self.timing_enabled()}
+                    if trace:
+                        response.update(trace.status())
+                        response['summary'] = summarize(trace.events(None, trace.capacity)['events'])
+                    self.send_json(response)
+                    return
+                if not trace:
+                    self.send_json({'status': 'error', 'message': 'Instrumentação desligada (POST /timing/enable)'}, 404)
+                    return
+                
+                try:
+                    since = int(params['since'][0]) if 'since' in params else None
+                    limit = int(params.get('limit', ['1000'])[0])
+                except ValueError:
+                    self.send_json({'status': 'error', 'message': '"since" e "limit" devem ser inteiros'}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **trace.events(since, max(1, min(limit, 10000)))))
+            
+            # JOURNAL - Registros de atuação (cursor em "next")
+            elif path == '/journal':
+                if not self.journal:
+                    self.send_json({'status': 'error', 'message': 'Journal de atuação desativado'}, 404)
+                    return
+                
+                try:
+                    since = int(params['since'][0]) if 'since' in params else None
+                    limit = int(params.get('limit', ['1000'])[0])
+                except ValueError:
+                    self.send_json({'status': 'error', 'message': '"since" e "limit" devem ser inteiros'}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **self.journal.read(since, max(1, min(limit, 10000)))))
+            
+            # SERVOS - Estado de cada servo do grupo
+            elif path == '/servos':
+                if not self.servos:
+                    self.send_json({'status': 'error', 'message': 'Servos não inicializados'}, 500)
+                    return
+                
+                self.send_json({'status': 'ok', 'servos': self.servos.status()})
+            
+            # SERVOS - Ângulo de um servo
+            elif path.startswith('/servos/') and path.endswith('/angle'):
+                servo = self.servos.get(path[len('/servos/'):-len('/angle')]) if self.servos else None
+                if not servo:
+                    self.send_json({'status': 'error', 'message': 'Servo não encontrado'}, 404)
+                    return
+                
+                self.send_json({'status': 'ok', 'angle': servo.get_angle(), 'is_sweeping': servo.is_sweeping()})
+            
+            # METRICS - Métricas no formato do Prometheus
+            elif path == '/metrics':
+                self.send_text(metrics.REGISTRY.render(), 'text/plain; version=0.0.4; charset=utf-8')
+            
+            # EVENTS - Stream SSE das mudanças de estado
+            elif path == '/events' and self.events_enabled:
+                self.handle_events()
+            
+            # WS - Canal de controle WebSocket
+            elif path == '/ws' and self.websocket_enabled:
+                self.handle_websocket()
             
             # ROOT - Informações da API
             elif path == '/':
-                self.send_json({
+                self.send_cached('/', 0, lambda: {
                     'service': 'Trichogramma Pi HTTP Server',
                     'version': '1.0.0',
                     'endpoints': {
                         'GET /ping': 'Testa conectividade',
-                        'GET /status': 'Status do sistema',
+                        'GET /status': 'Status do sistema (?detail=1: contadores; ?since=<versão>: long-poll)',
+                        'GET /events': 'Stream Server-Sent Events com o estado a cada mudança',
                         'GET /angle': 'Ângulo atual do servo',
-                        'POST /calibrate': 'Executa calibração',
-                        'POST /angle': 'Define ângulo (body: {"angle": NN})',
+                        'GET /jobs': 'Jobs de movimento recentes',
+                        'GET /jobs/<id>': 'Progresso de um job',
+                        'GET /calibrate': 'Tabela de calibração em uso e sessão guiada (?servo=<id>, padrão: principal)',
+                        'GET /missions': 'Planos de voo disponíveis e missão carregada',
+                        'GET /missions/current': 'Estado da missão e resumo do atraso das ações',
+                        'GET /missions/report': 'Atraso de cada ação executada (?offset=&limit=)',
+                        'GET /dispense': 'Liberação periódica: taxa, ciclos e resumo do atraso',
+                        'GET /dispense/report': 'Atraso de cada ciclo da liberação periódica (?offset=&limit=)',
+                        'GET /journal': 'Journal de atuação (?since=<seq>&limit=N)',
+                        'GET /timing': 'Instrumentação dos pulsos: atraso, jitter, espera pelo lock e chamada ao pigpio',
+                        'GET /timing/events': 'Eventos da instrumentação (?since=<seq>&limit=N)',
+                        'GET /servos': 'Servos configurados e estado de cada um',
+                        'GET /servos/<id>/angle': 'Ângulo atual de um servo',
+                        'GET /metrics': 'Métricas no formato do Prometheus',
+                        'GET /ws': 'Canal WebSocket: envia ângulos e recebe o estado do servo',
+                        'POST /calibrate': 'Inicia calibração em segundo plano (202 + job_id)',
+                        'POST /calibrate/<ação>': 'Calibração guiada: start, pulse, record, save, cancel, reload (body: {"servo"} opcional, padrão: principal)',
+                        'POST /sweep': 'Inicia sweep em segundo plano (body: {"from", "to", "delay_s", "step", "profile"})',
+                        'POST /batch': 'Executa uma sequência de passos (body: {"steps": [{"op": ...}, ...]})',
+                        'POST /missions/<ação>': 'Missão: load (body: {"file"}), start (body: {"at_s"} opcional), pause, resume, abort, waypoint (body: {"index"})',
+                        'POST /dispense/<ação>': 'Liberação periódica: start (body: {"rate_per_min"} ou {"ground_speed_m_s", "spacing_m"}), rate, stop',
+                        'POST /timing/<ação>': 'Instrumentação dos pulsos: enable, disable, reset',
+                        'POST /angle': 'Define ângulo (body: {"angle": NN, "profile": "step|trapezoid|scurve"})',
+                        'POST /servos/<id>/angle': 'Define o ângulo de um servo (body: {"angle": NN})',
+                        'POST /servos/angles': 'Move vários servos juntos (body: {"angles": {"<id>": NN, ...}})',
                         'POST /stop': 'Para movimento'
                     }
                 })
@@ -88,24 +447,165 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
             body = self.rfile.read(content_length).decode('utf-8') if content_length > 0 else '{}'
             data = json.loads(body) if body else {}
             
-            # CALIBRAR - Executa calibração
+            if not self.ready:
+                self.send_json({'status': 'error', 'message': 'Serviço iniciando'}, 503)
+                return
+            
+            # CALIBRAR - Inicia calibração em segundo plano
             if path == '/calibrate':
                 if not self.servo or not self.servo.is_initialized:
                     self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
                     return
                 
-                self.servo.stop_sweep()
-                self.servo.sweep(0, 180, 0.5, step=10.0)
+                if self.servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
+                    return
                 
-                # Aguarda sweep terminar
-                import time
-                while self.servo.is_sweeping():
-                    time.sleep(0.1)
+                job = self.jobs.submit_calibration(
+                    from_angle=self.calibration.get('sweep_angle_from', 0),
+                    to_angle=self.calibration.get('sweep_angle_to', 180),
+                    delay_s=self.calibration.get('sweep_delay_s', 0.5),
+                    step=self.calibration.get('sweep_step', 10.0)
+                )
+                self.send_json({'status': 'ok', 'message': 'Calibração iniciada', 'job_id': job.id}, 202)
+            
+            # CALIBRAÇÃO GUIADA - Mede a curva ângulo → pulsewidth do servo
+            elif path.startswith('/calibrate/'):
+                if not self.calibrators:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
+                calibrator = self.calibrator_for(data.get('servo'))
+                if not calibrator:
+                    self.send_json({'status': 'error', 'message': 'Servo não encontrado'}, 404)
+                    return
+                if not calibrator.servo.is_initialized:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
                 
-                # Volta para 90°
-                self.servo.set_angle(90)
+                action = path[len('/calibrate/'):]
+                try:
+                    if action == 'reload':
+                        result = calibrator.reload()
+                    else:
+                        result = calibrator.handle(action, data)
+                except ValueError as e:
+                    self.send_json({'status': 'error', 'message': str(e)}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **result))
+            
+            # SWEEP - Inicia sweep em segundo plano
+            elif path == '/sweep':
+                if not self.servo or not self.servo.is_initialized:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
+                if self.servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
+                    return
+                
+                valid, params, error = parse_sweep_params(data, self.servo.SETTLE_S)
+                if not valid:
+                    self.send_json({'status': 'error', 'message': error}, 400)
+                    return
                 
-                self.send_json({'status': 'ok', 'message': 'Calibração concluída'})
+                job = self.jobs.submit_sweep(params['from'], params['to'], params['delay_s'], params['step'],
+                                             params['profile'])
+                self.send_json({'status': 'ok', 'message': 'Sweep iniciado', 'job_id': job.id}, 202)
+            
+            # BATCH - Sequência de passos executada no servidor, uma resposta no fim
+            elif path == '/batch':
+                if not self.servo or not self.servo.is_initialized or not self.batch:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
+                if self.servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
+                    return
+                
+                try:
+                    steps = compile_steps(data.get('steps'), self.servo)
+                except ValueError as e:
+                    self.send_json({'status': 'error', 'message': str(e)}, 400)
+                    return
+                
+                future = self.batch.submit(steps)
+                if future is None:
+                    self.send_json({'status': 'error', 'message': 'Outro lote em execução'}, 409)
+                    return
+                
+                result = future.result()
+                failed = not result['completed'] and not result['aborted']
+                self.send_json(dict({'status': 'error' if failed else 'ok'}, **result), 500 if failed else 200)
+            
+            # MISSÕES - Carrega e controla a execução de um plano de voo
+            elif path.startswith('/missions/'):
+                if not self.missions or not self.servo.is_initialized:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
+                
+                action = path[len('/missions/'):]
+                commands = {
+                    'load': lambda: self.missions.load(data.get('file', '')),
+                    'start': lambda: self.missions.start(data.get('at_s')),
+                    'pause': self.missions.pause,
+                    'resume': self.missions.resume,
+                    'abort': self.missions.abort,
+                    'waypoint': lambda: self.missions.waypoint(data.get('index')),
+                }
+                if action not in commands:
+                    self.send_json({'status': 'error', 'message': f'Ação desconhecida: {action}'}, 404)
+                    return
+                if action == 'start' and self.servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
+                    return
+                
+                try:
+                    result = commands[action]()
+                except ValueError as e:
+                    self.send_json({'status': 'error', 'message': str(e)}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **result))
+            
+            # TIMING - Liga, desliga ou zera a instrumentação dos pulsos
+            elif path.startswith('/timing/'):
+                action = path[len('/timing/'):]
+                if action in ('enable', 'disable'):
+                    self.set_timing(action == 'enable')
+                elif action == 'reset':
+                    if self.timing_trace:
+                        self.timing_trace.clear()
+                else:
+                    self.send_json({'status': 'error', 'message': f'Ação desconhecida: {action}'}, 404)
+                    return
+                
+                response = {'status': 'ok', 'enabled': self.timing_enabled()}
+                if self.timing_trace:
+                    response.update(self.timing_trace.status())
+                self.send_json(response)
+            
+            # LIBERAÇÃO PERIÓDICA - Ciclos abre/fecha a uma taxa fixa
+            elif path.startswith('/dispense/'):
+                if not self.dispenser or not self.servo.is_initialized:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
+                
+                action = path[len('/dispense/'):]
+                commands = {
+                    'start': lambda: self.dispenser.start(data),
+                    'rate': lambda: self.dispenser.set_rate(data),
+                    'stop': self.dispenser.stop,
+                }
+                if action not in commands:
+                    self.send_json({'status': 'error', 'message': f'Ação desconhecida: {action}'}, 404)
+                    return
+                if action == 'start' and self.servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
+                    return
+                
+                try:
+                    result = commands[action]()
+                except ValueError as e:
+                    self.send_json({'status': 'error', 'message': str(e)}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **result))
             
             # SET_ANGLE - Define ângulo
             elif path == '/angle':
@@ -113,25 +613,105 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
                     self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
                     return
                 
-                angle = data.get('angle')
-                if angle is None:
-                    self.send_json({'status': 'error', 'message': 'Parâmetro "angle" obrigatório'}, 400)
+                valid, angle, error = parse_angle_value(data.get('angle'))
+                if valid:
+                    valid, profile, error = parse_profile(data.get('profile'))
+                if not valid:
+                    self.send_json({'status': 'error', 'message': error}, 400)
+                    return
+                if self.servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
                     return
                 
-                try:
-                    angle = int(angle)
-                    if angle < 0 or angle > 180:
-                        self.send_json({'status': 'error', 'message': 'Ângulo deve estar entre 0 e 180'}, 400)
+                # Perfil de movimento: trajetória por frame PWM em segundo plano
+                if profile != PROFILE_STEP:
+                    duration_s = self.servo.move(angle, profile)
+                    self.send_json({'status': 'ok', 'angle': angle, 'profile': profile,
+                                    'duration_s': round(duration_s, 3)})
+                    return
+                
+                # Fila de movimento: retorna assim que o comando é enfileirado
+                if self.motion:
+                    self.motion.submit(angle)
+                    self.send_json({'status': 'ok', 'angle': angle, 'queued': True})
+                    return
+                
+                success = self.servo.set_angle(angle)
+                if success:
+                    self.send_json({'status': 'ok', 'angle': angle})
+                else:
+                    self.send_json({'status': 'error', 'message': 'Falha ao mover servo'}, 500)
+            
+            # SERVOS - Ângulo de um servo do grupo
+            elif path.startswith('/servos/') and path.endswith('/angle'):
+                servo_id = path[len('/servos/'):-len('/angle')]
+                servo = self.servos.get(servo_id) if self.servos else None
+                if not servo:
+                    self.send_json({'status': 'error', 'message': 'Servo não encontrado'}, 404)
+                    return
+                if not servo.is_initialized:
+                    self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
+                    return
+                
+                valid, angle, error = parse_angle_value(data.get('angle'))
+                if valid:
+                    valid, settle, error = parse_flag(data, 'settle', True)
+                if not valid:
+                    self.send_json({'status': 'error', 'message': error}, 400)
+                    return
+                if servo.calibrating:
+                    self.send_json({'status': 'error', 'message': 'Calibração guiada em andamento'}, 409)
+                    return
+                
+                if servo.set_angle(angle, settle=settle):
+                    self.send_json({'status': 'ok', 'servo': servo_id, 'angle': angle})
+                else:
+                    self.send_json({'status': 'error', 'message': 'Falha ao mover servo'}, 500)
+            
+            # SERVOS - Vários servos na mesma passada
+            elif path == '/servos/angles':
+                if not self.servos:
+                    self.send_json({'status': 'error', 'message': 'Servos não inicializados'}, 500)
+                    return
+                
+                targets = data.get('angles')
+                if not isinstance(targets, dict) or not targets:
+                    self.send_json({'status': 'error', 'message': '"angles" deve ser um objeto {id: ângulo}'}, 400)
+                    return
+                angles = {}
+                for servo_id, value in targets.items():
+                    valid, angle, error = parse_angle_value(value)
+                    if not valid:
+                        self.send_json({'status': 'error', 'message': f"{servo_id}: {error}"}, 400)
                         return
-                    
-                    success = self.servo.set_angle(angle)
-                    if success:
-                        self.send_json({'status': 'ok', 'angle': angle})
-                    else:
-                        self.send_json({'status': 'error', 'message': 'Falha ao mover servo'}, 500)
-                        
-                except ValueError:
-                    self.send_json({'status': 'error', 'message': 'Ângulo inválido'}, 400)
+                    angles[servo_id] = angle
+                valid, settle, error = parse_flag(data, 'settle', True)
+                if not valid:
+                    self.send_json({'status': 'error', 'message': error}, 400)
+                    return
+                
+                try:
+                    results = self.servos.set_angles(angles, settle=settle)
+                except ValueError as e:
+                    self.send_json({'status': 'error', 'message': str(e)}, 400)
+                    return
+                if all(results.values()):
+                    self.send_json({'status': 'ok', 'angles': angles})
+                else:
+                    self.send_json({'status': 'error', 'message': 'Falha ao mover servos', 'results': results}, 500)
+            
+            # CONFIG - Relê o config.yaml e aplica a quente o que for possível
+            elif path == '/config/reload':
+                if not self.config_reloader:
+                    self.send_json({'status': 'error', 'message': 'Recarga de configuração indisponível'}, 500)
+                    return
+                
+                try:
+                    result = self.config_reloader.reload()
+                except ValueError as e:
+                    self.send_json({'status': 'error', 'message': str(e)}, 400)
+                    return
+                self.send_json(dict({'status': 'ok'}, **result))
             
             # STOP - Para movimento
             elif path == '/stop':
@@ -139,7 +719,7 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
                     self.send_json({'status': 'error', 'message': 'Servo não inicializado'}, 500)
                     return
                 
-                self.servo.stop_sweep()
+                self.stop_all()
                 self.send_json({'status': 'ok', 'message': 'Movimento parado'})
             
             else:
@@ -152,13 +732,94 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
                 self.logger.error(f"Erro no POST: {e}", exc_info=True)
             self.send_json({'status': 'error', 'message': str(e)}, 500)
     
+    def handle_websocket(self):
+        """Faz o upgrade para WebSocket e atende a conexão nesta thread"""
+        if not ws_control.is_upgrade_request(self.headers):
+            self.send_json({'status': 'error', 'message': 'Upgrade para WebSocket necessário'}, 426)
+            return
+        
+        self.wfile.write(ws_control.handshake_response(self.headers['Sec-WebSocket-Key']))
+        self.wfile.flush()
+        self.close_connection = True
+        if self.logger:
+            self.logger.info(f"WebSocket conectado: {self.address_string()}")
+        ws_control.serve_blocking(self.connection, self.websocket_session(),
+                                  idle_timeout_s=self.ws_idle_timeout_s)
+        if self.logger:
+            self.logger.info(f"WebSocket encerrado: {self.address_string()}")
+    
+    def handle_events(self):
+        """Atende um stream SSE nesta thread até o cliente desconectar"""
+        if not self.events_slots.acquire(blocking=False):
+            self.send_json({'status': 'error', 'message': 'Limite de streams de eventos atingido'}, 503)
+            return
+        
+        try:
+            self.record_request(200)
+            self.close_connection = True
+            self.wfile.write(state_events.response_head())
+            self.wfile.flush()
+            state_events.serve_blocking(
+                self.connection, self.servo, self.state_snapshot,
+                heartbeat_s=self.events_heartbeat_s,
+                last_id=state_events.parse_last_event_id(self.headers.get('Last-Event-ID'))
+            )
+        finally:
+            self.events_slots.release()
+    
+    def parse_request(self):
+        # Início da medição: depois de ler a linha da requisição (exclui o tempo ocioso do keep-alive)
+        self.request_start = time.perf_counter()
+        return super().parse_request()
+    
+    def send_cached(self, route, version, build):
+        """
+        Envia a resposta JSON pré-serializada da rota para a versão do estado.
+        Se o cliente já tem esta versão (If-None-Match), responde 304 sem corpo.
+        """
+        etag = self.response_cache.etag(route, version)
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.response_cache.not_modified += 1
+            self.send_body(b'', None, 304, etag=etag)
+            return
+        
+        entry = self.response_cache.get(route, version, build)
+        self.send_body(entry.body, 'application/json', etag=entry.etag)
+    
     def send_json(self, data, status_code=200):
         """Envia resposta JSON"""
+        self.send_body(json.dumps(data).encode('utf-8'), 'application/json', status_code)
+    
+    def send_text(self, text, content_type='text/plain; charset=utf-8', status_code=200):
+        """Envia resposta em texto"""
+        self.send_body(text.encode('utf-8'), content_type, status_code)
+    
+    def send_body(self, body, content_type, status_code=200, etag=None):
+        """Envia a resposta e registra contagem e latência da rota"""
+        self.record_request(status_code)
+        self.requests_handled += 1
         self.send_response(status_code)
-        self.send_header('Content-Type', 'application/json')
+        if status_code != 304:
+            self.send_header('Content-Type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
+        if etag:
+            # O cliente pode guardar a resposta, mas revalida a cada consulta
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if status_code != 304:
+            self.send_header('Content-Length', str(len(body)))
+        if self.requests_handled >= self.max_requests_per_connection:
+            # Limite por conexão atingido: o cliente reabre na próxima requisição
+            self.send_header('Connection', 'close')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
+    
+    def record_request(self, status_code):
+        """Atualiza as métricas HTTP da requisição atual"""
+        route = self.route_label(urlparse(self.path).path)
+        metrics.HTTP_REQUESTS.labels(self.command, route, status_code).inc()
+        if self.request_start is not None:
+            metrics.HTTP_DURATION.labels(self.command, route).observe(time.perf_counter() - self.request_start)
     
     def log_message(self, format, *args):
         """Override para usar nosso logger"""
@@ -166,61 +827,326 @@ class ServoHTTPHandler(BaseHTTPRequestHandler):
             self.logger.info(f"{self.address_string()} - {format % args}")
 
 
+def start_services(config: dict, config_path: str, logger, server, startup_config: dict,
+                   started_at: float) -> bool:
+    """
+    Cria o journal, os servos e os componentes que dependem deles e os
+    publica no handler. Na partida rápida roda em uma thread, com o
+    servidor HTTP já respondendo /ping.
+    
+    Returns:
+        False se a configuração dos servos for inválida
+    """
+    from calibration import CalibrationManager, CalibrationStore
+    from config_reload import DEFAULT_DEBOUNCE_S, DEFAULT_POLL_INTERVAL_S, ConfigReloader, ConfigWatcher
+    from dispenser import DEFAULT_MAX_CATCH_UP, POLICY_SKIP, PeriodicDispenser
+    from journal import DEFAULT_CAPACITY, ActuationJournal
+    from jobs import JobManager
+    from mission import MissionRunner
+    from motion_queue import MotionQueue
+    from servo_group import ServoGroup
+    from udp_command import UDPCommandServer
+    
+    # Journal de atuação: registro binário de cada movimento (arquivo circular)
+    journal_config = config.get('journal', {})
+    journal = None
+    if journal_config.get('enabled', True):
+        journal_path = os.path.join(
+            os.path.dirname(os.path.abspath(config_path)),
+            journal_config.get('file', 'journal.bin')
+        )
+        try:
+            journal = ActuationJournal(journal_path, capacity=journal_config.get('capacity', DEFAULT_CAPACITY))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Journal de atuação desativado ({journal_path}): {e}")
+    
+    # Curvas de calibração: compiladas em tabela antes do primeiro movimento
+    calibration_config = config.get('calibration', {})
+    calibration_store = CalibrationStore(os.path.join(
+        os.path.dirname(os.path.abspath(config_path)),
+        calibration_config.get('file', 'calibration.json')
+    ))
+    try:
+        curves = calibration_store.load()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Erro ao ler {calibration_store.path}: {e}. Usando mapeamento linear.")
+        curves = {}
+    
+    # Inicializa servos (lista "servos" ou a seção "servo"); o primeiro é o principal
+    try:
+        servos = ServoGroup.from_config(config, curves, journal=journal, logger=logger,
+                                        restore_position=startup_config.get('skip_homing', True))
+    except ValueError as e:
+        logger.error(f"Configuração de servos inválida: {e}")
+        return False
+    # pigpiod pode ainda estar subindo (o serviço não espera por ele no systemd)
+    if not servos.retry_initialize(startup_config.get('pigpio_wait_s', 10)):
+        logger.warning("Servo(s) não inicializado(s): pigpiod indisponível")
+    # Inicializado ou não, o estado mudou: /status não pode seguir servindo o
+    # corpo em cache de antes da partida, que também estava na versão 0
+    for group_servo in servos.servos.values():
+        group_servo.bump_state()
+    servo = servos.primary
+    logger.info(f"Servos: {', '.join(f'{s.servo_id} (GPIO {s.pin})' for s in servos.servos.values())}")
+    
+    # Configura handler
+    ServoHTTPHandler.servo = servo
+    ServoHTTPHandler.servos = servos
+    ServoHTTPHandler.journal = journal
+    ServoHTTPHandler.jobs = JobManager(servo, logger=logger)
+    ServoHTTPHandler.calibration = calibration_config
+    # Calibração guiada e recarga por servo (POST /calibrate/<ação> com "servo")
+    ServoHTTPHandler.calibrators = {
+        servo_id: CalibrationManager(
+            group_servo, calibration_store,
+            guide_angles=calibration_config.get('guide_angles', [0, 30, 60, 90, 120, 150, 180]),
+            logger=logger
+        ) for servo_id, group_servo in servos.servos.items()
+    }
+    
+    # Fila de comandos de ângulo (coalescência "o mais recente vence")
+    motion_config = config.get('motion', {})
+    motion = None
+    if motion_config.get('coalesce', True):
+        motion = MotionQueue(servo, frame_period_s=motion_config.get('frame_period_s'), logger=logger)
+        motion.start()
+    ServoHTTPHandler.motion = motion
+    if motion and hasattr(server, 'fast_routes'):
+        # Com a fila de movimento, POST /angle apenas enfileira: rota rápida do motor asyncio
+        server.fast_routes.add(('POST', '/angle'))
+    
+    # Comandos binários por UDP (companion do controlador de voo)
+    udp_config = config.get('udp', {})
+    udp = None
+    if udp_config.get('enabled', False):
+        udp = UDPCommandServer(
+            servo,
+            motion=motion,
+            stop=ServoHTTPHandler.stop_all,
+            host=udp_config.get('host', '0.0.0.0'),
+            port=udp_config.get('port', 8090),
+            replay_window=udp_config.get('replay_window', 64),
+            max_senders=udp_config.get('max_senders', 16),
+            logger=logger
+        )
+        udp.start()
+    ServoHTTPHandler.udp = udp
+    
+    # Lotes de comandos (POST /batch) executados por uma thread dedicada
+    batch = BatchRunner(servo, logger=logger)
+    batch.start()
+    ServoHTTPHandler.batch = batch
+    
+    # Missões: planos de voo do diretório, executados com deadlines precisos
+    mission_config = config.get('mission', {})
+    missions = MissionRunner(
+        servo,
+        directory=mission_config.get('directory', '/home/pi/flight_data'),
+        spin_s=mission_config.get('spin_us', 500) / 1e6,
+        max_events=mission_config.get('max_events', 100000),
+        logger=logger
+    )
+    ServoHTTPHandler.missions = missions
+    
+    # Liberação periódica a taxa fixa (POST /dispense/start)
+    dispense_config = config.get('dispense', {})
+    ServoHTTPHandler.dispenser = PeriodicDispenser(
+        servo,
+        open_angle=dispense_config.get('open_angle', 120),
+        closed_angle=dispense_config.get('closed_angle', 60),
+        hold_ms=dispense_config.get('hold_ms', 150),
+        policy=dispense_config.get('policy', POLICY_SKIP),
+        max_catch_up=dispense_config.get('max_catch_up', DEFAULT_MAX_CATCH_UP),
+        spin_s=mission_config.get('spin_us', 500) / 1e6,
+        logger=logger
+    )
+    
+    # Instrumentação de temporização dos pulsos (opcional; POST /timing/enable liga depois)
+    instrumentation_config = config.get('instrumentation', {})
+    ServoHTTPHandler.timing_capacity = instrumentation_config.get('capacity', 65536)
+    if instrumentation_config.get('enabled', False):
+        ServoHTTPHandler.set_timing(True)
+    
+    # Recarga do config.yaml (POST /config/reload e, opcionalmente, observando o arquivo)
+    reload_config = config.get('reload', {})
+    reloader = ConfigReloader(config_path, config, servos, logger=logger)
+    ServoHTTPHandler.config_reloader = reloader
+    if reload_config.get('watch', True):
+        
+        def reload_from_watch():
+            try:
+                reloader.reload()
+            except ValueError as e:
+                logger.warning(f"config.yaml alterado, mas não aplicado: {e}")
+        
+        watcher = ConfigWatcher(
+            config_path, reload_from_watch,
+            poll_interval_s=reload_config.get('poll_interval_s', DEFAULT_POLL_INTERVAL_S),
+            debounce_s=reload_config.get('debounce_s', DEFAULT_DEBOUNCE_S),
+            logger=logger
+        )
+        watcher.start()
+        ServoHTTPHandler.config_watcher = watcher
+    
+    if hasattr(server, 'attach_servo'):
+        # SSE e long-poll no event loop do motor asyncio
+        server.attach_servo(servo)
+    ServoHTTPHandler.ready = True
+    logger.info(f"Serviço pronto em {time.monotonic() - started_at:.3f}s desde a partida")
+    return True
+
+
 def main():
     """Função principal"""
+    started_at = time.monotonic()
     print("Trichogramma Pi HTTP Server")
     print("=" * 60)
     
-    # Carrega configuração
-    config_path = os.path.join(os.path.dirname(__file__), "..", "config.yaml")
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    parser = argparse.ArgumentParser(description="Trichogramma Pi HTTP Server")
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(__file__), "..", "config.yaml"),
+                        help="Caminho do config.yaml")
+    args = parser.parse_args()
+    
+    # Carrega configuração (cópia em JSON enquanto o config.yaml não muda)
+    config_path = args.config
+    config = load_config(config_path)
     
     # Inicializa logger
     log_config = config.get('logging', {})
     logger = create_logger(
         log_config.get('logfile', '/var/log/trichogramma-service.log'),
-        log_config.get('level', 'INFO')
+        log_config.get('level', 'INFO'),
+        async_mode=log_config.get('async', False),
+        queue_size=log_config.get('queue_size', 1000),
+        drop_policy=log_config.get('drop_policy', 'drop_new')
     )
     
     logger.info("=" * 60)
     logger.info("Trichogramma Pi HTTP Server iniciando...")
     logger.info("=" * 60)
     
-    # Inicializa servo
-    servo_config = config.get('servo', {})
-    servo = ServoControl(
-        pin=servo_config.get('pwm_pin', 4),
-        frequency=servo_config.get('frequency', 50),
-        min_duty=servo_config.get('min_duty', 2.5),
-        max_duty=servo_config.get('max_duty', 12.5),
-        logger=logger
-    )
-    
-    # Configura handler
-    ServoHTTPHandler.servo = servo
+    # Métricas do logging assíncrono
+    metrics.LOG_QUEUE_DEPTH.set_function(lambda: logger.stats().get('queue_depth'))
+    metrics.LOG_DROPPED.set_function(lambda: logger.stats().get('dropped'))
     ServoHTTPHandler.logger = logger
     
+    # Canal de controle WebSocket
+    ws_config = config.get('websocket', {})
+    ServoHTTPHandler.websocket_enabled = ws_config.get('enabled', True)
+    ServoHTTPHandler.ws_idle_timeout_s = ws_config.get('idle_timeout_s', 60)
+    
+    # Notificação de mudanças (SSE e long-poll)
+    events_config = config.get('events', {})
+    ServoHTTPHandler.events_enabled = events_config.get('enabled', True)
+    ServoHTTPHandler.events_heartbeat_s = events_config.get('heartbeat_s', state_events.DEFAULT_HEARTBEAT_S)
+    ServoHTTPHandler.longpoll_max_s = events_config.get('longpoll_max_s', state_events.DEFAULT_LONGPOLL_MAX_S)
+    ServoHTTPHandler.events_slots = threading.BoundedSemaphore(
+        events_config.get('max_clients', state_events.DEFAULT_MAX_CLIENTS))
+    
     # Inicia servidor HTTP
-    host = '0.0.0.0'  # Escuta em todas as interfaces
-    port = 8080
+    http_config = config.get('http', {})
+    host = http_config.get('host', '0.0.0.0')  # Escuta em todas as interfaces
+    port = http_config.get('port', 8080)
+    engine = http_config.get('engine', 'classic')
     
-    server = HTTPServer((host, port), ServoHTTPHandler)
+    # Conexões persistentes (HTTP/1.1 keep-alive)
+    keep_alive = http_config.get('keep_alive', True)
+    if keep_alive:
+        ServoHTTPHandler.timeout = http_config.get('idle_timeout_s', 15)
+        ServoHTTPHandler.max_requests_per_connection = http_config.get('max_requests_per_connection', 1000)
+    else:
+        ServoHTTPHandler.protocol_version = "HTTP/1.0"
     
-    logger.info(f"Servidor HTTP rodando em {host}:{port}")
+    if engine == 'asyncio':
+        from async_server import AsyncHTTPServer
+        server = AsyncHTTPServer(
+            (host, port),
+            ServoHTTPHandler,
+            max_workers=http_config.get('max_workers', 4),
+            max_pending=http_config.get('max_pending', 16),
+            logger=logger,
+            keep_alive=keep_alive,
+            idle_timeout_s=http_config.get('idle_timeout_s', 15)
+        )
+    elif keep_alive or ServoHTTPHandler.websocket_enabled or ServoHTTPHandler.events_enabled:
+        # Conexões persistentes (keep-alive, WebSocket, SSE e long-poll) ocupariam o único thread
+        # do HTTPServer: uma thread por conexão
+        server = ThreadingHTTPServer((host, port), ServoHTTPHandler)
+        server.daemon_threads = True
+    else:
+        server = HTTPServer((host, port), ServoHTTPHandler)
+    
+    logger.info(f"Servidor HTTP ({engine}) rodando em {host}:{port}")
     logger.info("Endpoints disponíveis:")
     logger.info("  GET  /ping")
     logger.info("  GET  /status")
     logger.info("  GET  /angle")
+    logger.info("  GET  /jobs/<id>")
+    logger.info("  GET  /metrics")
+    logger.info("  GET  /journal?since=<seq>")
+    if ServoHTTPHandler.websocket_enabled:
+        logger.info("  GET  /ws (WebSocket)")
+    if ServoHTTPHandler.events_enabled:
+        logger.info("  GET  /events (SSE) e GET /status?since=<versão> (long-poll)")
     logger.info("  POST /calibrate")
+    logger.info("  POST /calibrate/<start|pulse|record|save|cancel|reload>")
+    logger.info("  POST /sweep")
+    logger.info("  POST /batch (body: {\"steps\": [...]})")
+    logger.info("  GET  /missions, POST /missions/<load|start|pause|resume|abort|waypoint>")
+    logger.info("  GET  /dispense, POST /dispense/<start|rate|stop>")
     logger.info("  POST /angle (body: {\"angle\": NN})")
+    logger.info("  GET  /servos, POST /servos/<id>/angle, POST /servos/angles")
+    logger.info("  GET  /timing, GET /timing/events, POST /timing/<enable|disable|reset>")
+    logger.info("  POST /config/reload")
     logger.info("  POST /stop")
     
+    def stop_services():
+        handler = ServoHTTPHandler
+        if handler.config_watcher:
+            handler.config_watcher.stop()
+        if handler.udp:
+            handler.udp.stop()
+        if handler.missions:
+            handler.missions.abort()
+        if handler.dispenser:
+            handler.dispenser.stop()
+        if handler.batch:
+            handler.batch.stop()
+        if handler.motion:
+            handler.motion.stop()
+        if handler.servos:
+            handler.servos.cleanup()
+        if handler.journal:
+            handler.journal.close()
+    
+    # Partida rápida: o listener já está aberto; servos e componentes sobem em
+    # segundo plano (rotas que dependem deles respondem 503 até lá)
+    startup_config = config.get('startup', {})
+    startup_failed = threading.Event()
+    if startup_config.get('fast_start', True):
+        ServoHTTPHandler.ready = False
+        
+        def start_in_background():
+            if not start_services(config, config_path, logger, server, startup_config, started_at):
+                # Configuração inválida: encerra o serve_forever daqui (o handler de
+                # sinal rodaria na própria thread dele) e main() sai com código 1
+                startup_failed.set()
+                stop_services()
+                server.shutdown()
+        
+        threading.Thread(target=start_in_background, name='startup', daemon=True).start()
+    elif not start_services(config, config_path, logger, server, startup_config, started_at):
+        sys.exit(1)
+    
     # Handler de sinais
     def signal_handler(signum, frame):
         logger.info("Encerrando servidor...")
-        servo.cleanup()
-        server.shutdown()
+        stop_services()
+        # Escreve as mensagens ainda na fila do logging assíncrono
+        logger.flush()
+        # O handler roda na thread do serve_forever: shutdown() do servidor
+        # clássico esperaria por ela mesma. O SystemExit encerra o loop.
+        threading.Thread(target=server.shutdown, name='shutdown', daemon=True).start()
         sys.exit(0)
     
     signal.signal(signal.SIGTERM, signal_handler)
@@ -231,9 +1157,14 @@ def main():
     except KeyboardInterrupt:
         logger.info("Servidor interrompido")
     finally:
-        servo.cleanup()
+        if ServoHTTPHandler.servos:
+            ServoHTTPHandler.servos.cleanup()
+        if ServoHTTPHandler.journal:
+            ServoHTTPHandler.journal.close()
+        logger.flush()
+    if startup_failed.is_set():
+        sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jobs de movimento em segundo plano (sweeps e calibração).
+O servidor HTTP responde 202 com o ID do job e o cliente consulta o progresso
+em GET /jobs/<id>, sem manter o socket aberto durante o movimento.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from journal import SOURCE_JOB
+from motion_profile import PROFILE_STEP
+
+
+class Job:
+    """
+    Estado e progresso de um job de movimento.
+    """
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    CANCELLED = 'cancelled'
+    FAILED = 'failed'
+    
+    def __init__(self, kind: str, params: dict, total_steps: int, step_duration_s: float):
+        """
+        Inicializa o job.
+        
+        Args:
+            kind: Tipo do job ("sweep" ou "calibrate")
+            params: Parâmetros do movimento (ecoados no status)
+            total_steps: Número total de passos previstos
+            step_duration_s: Duração estimada de cada passo (para ETA antes do 1º passo)
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.state = Job.PENDING
+        self.step = 0
+        self.total_steps = total_steps
+        self.step_duration_s = step_duration_s
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None  # time.monotonic()
+        self.finished_at = None  # time.monotonic()
+        self.done = threading.Event()
+    
+    def start(self):
+        self.state = Job.RUNNING
+        self.started_at = time.monotonic()
+    
+    def advance(self, step: int):
+        self.step = step
+    
+    def finish(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.error = error
+        self.finished_at = time.monotonic()
+        self.done.set()
+    
+    def elapsed_s(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+    
+    def eta_s(self) -> Optional[float]:
+        """
+        Estima o tempo restante a partir da taxa medida (ou da estimativa inicial).
+        
+        Returns:
+            Segundos restantes, 0 se finalizado
+        """
+        if self.done.is_set():
+            return 0.0
+        remaining = max(0, self.total_steps - self.step)
+        if self.step > 0:
+            return remaining * (self.elapsed_s() / self.step)
+        return remaining * self.step_duration_s
+    
+    def to_dict(self) -> dict:
+        """Representação JSON do job"""
+        eta = self.eta_s()
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'step': self.step,
+            'total_steps': self.total_steps,
+            'progress': round(self.step / self.total_steps, 3) if self.total_steps else 0.0,
+            'elapsed_s': round(self.elapsed_s(), 3),
+            'eta_s': round(eta, 3) if eta is not None else None,
+            'created_at': self.created_at,
+            'params': self.params,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """
+    Executa jobs de movimento em threads de segundo plano e guarda um
+    histórico limitado para consulta de progresso.
+    """
+    
+    def __init__(self, servo, logger=None, max_history: int = 32):
+        """
+        Inicializa o gerenciador.
+        
+        Args:
+            servo: Instância de ServoControl
+            logger: Instância do logger (opcional)
+            max_history: Número máximo de jobs mantidos para consulta
+        """
+        self.servo = servo
+        self.logger = logger
+        self.max_history = max_history
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self.lock = threading.Lock()
+        # Tempo de acomodação do servo somado ao delay de cada passo
+        self.settle_s = servo.SETTLE_S
+    
+    def submit_sweep(self, from_angle: float, to_angle: float, delay_s: float = 0.5,
+                     step: float = 10.0, profile: str = PROFILE_STEP) -> Job:
+        """
+        Agenda um sweep em segundo plano.
+        
+        Returns:
+            Job criado (estado inicial "pending")
+        """
+        params = {'from': from_angle, 'to': to_angle, 'delay_s': delay_s, 'step': step, 'profile': profile}
+        angles, step_period_s = self.servo.sweep_plan(from_angle, to_angle, delay_s, step, profile)
+        job = Job('sweep', params, len(angles), step_period_s)
+        return self._start(job, self._run_sweep, from_angle, to_angle, delay_s, step, profile)
+    
+    def submit_calibration(self, from_angle: float = 0, to_angle: float = 180,
+                           delay_s: float = 0.5, step: float = 10.0, home_angle: float = 90) -> Job:
+        """
+        Agenda a calibração: sweep completo seguido de retorno à posição inicial.
+        
+        Returns:
+            Job criado (estado inicial "pending")
+        """
+        params = {'from': from_angle, 'to': to_angle, 'delay_s': delay_s,
+                  'step': step, 'home': home_angle}
+        # Passos do sweep + retorno à posição inicial
+        total = len(self.servo.sweep_angles(from_angle, to_angle, step)) + 1
+        job = Job('calibrate', params, total, delay_s + self.settle_s)
+        return self._start(job, self._run_calibration, from_angle, to_angle, delay_s, step, home_angle)
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+    
+    def list(self) -> List[Job]:
+        with self.lock:
+            return list(self.jobs.values())
+    
+    def _start(self, job: Job, target, *args) -> Job:
+        with self.lock:
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.max_history:
+                self.jobs.popitem(last=False)
+        
+        thread = threading.Thread(target=self._run, args=(job, target) + args, daemon=True)
+        thread.start()
+        return job
+    
+    def _run(self, job: Job, target, *args):
+        """Executa o job e registra o estado final"""
+        job.start()
+        self.servo.bump_state()
+        self._log_info(f"Job {job.id} ({job.kind}) iniciado")
+        try:
+            completed = target(job, *args)
+            job.finish(Job.COMPLETED if completed else Job.CANCELLED)
+        except Exception as e:
+            self._log_error(f"Erro no job {job.id}: {e}")
+            job.finish(Job.FAILED, str(e))
+        # Progresso do job faz parte do estado publicado (WebSocket)
+        self.servo.bump_state()
+        self._log_info(f"Job {job.id} ({job.kind}) finalizado: {job.state}")
+    
+    def _sweep_and_wait(self, job: Job, from_angle, to_angle, delay_s, step, profile=PROFILE_STEP) -> bool:
+        """
+        Dispara o sweep e aguarda seu término (sem polling).
+        
+        Returns:
+            True se o sweep chegou ao fim, False se foi interrompido
+        """
+        finished = threading.Event()
+        result = {'completed': False}
+        
+        def on_finish(completed: bool):
+            result['completed'] = completed
+            finished.set()
+        
+        self.servo.sweep(from_angle, to_angle, delay_s, step=step,
+                         on_step=lambda current, total: self._advance(job, current),
+                         on_finish=on_finish, profile=profile)
+        finished.wait()
+        return result['completed']
+    
+    def _run_sweep(self, job: Job, from_angle, to_angle, delay_s, step, profile) -> bool:
+        return self._sweep_and_wait(job, from_angle, to_angle, delay_s, step, profile)
+    
+    def _run_calibration(self, job: Job, from_angle, to_angle, delay_s, step, home_angle) -> bool:
+        if not self._sweep_and_wait(job, from_angle, to_angle, delay_s, step):
+            return False
+        
+        # Volta para a posição inicial
+        if not self.servo.set_angle(home_angle, source=SOURCE_JOB):
+            raise RuntimeError("Falha ao mover servo para a posição inicial")
+        self._advance(job, job.total_steps)
+        return True
+    
+    def _advance(self, job: Job, step: int):
+        job.advance(step)
+        self.servo.bump_state()
+    
+    def _log_info(self, message: str):
+        if self.logger:
+            self.logger.info(message)
+    
+    def _log_error(self, message: str):
+        if self.logger:
+            self.logger.error(message)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Journal de atuação: cada movimento do servo (set_angle, passo de sweep,
+pulso da calibração) e cada parada vira um registro binário de tamanho fixo
+em um arquivo circular mapeado por mmap. Escrever um registro é um
+struct.pack_into na memória (sem formatação de texto nem escrita síncrona
+no cartão); o kernel grava as páginas no disco.
+
+Registro (24 bytes, little-endian):
+    seq (uint64), t_ns (int64, time.monotonic_ns), ângulo em centésimos de
+    grau (uint16, 0xFFFF = desconhecido), pulsewidth em µs (uint16),
+    origem (uint8), servo (uint8, posição no grupo; 0 = principal)
+
+Leitura offline (auditoria):
+    python3 service/journal.py dump /var/lib/trichogramma/journal.bin [--since N]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterator, List, Optional
+
+MAGIC = b'TJRN'
+VERSION = 1
+
+# Cabeçalho: magic, versão, tamanho do registro, capacidade, próximo seq,
+# primeiro seq desta inicialização e relógio de parede - monotônico (ns)
+HEADER = struct.Struct('<4sHHIQQq')
+HEADER_SIZE = 64
+NEXT_SEQ = struct.Struct('<Q')
+NEXT_SEQ_OFFSET = 12
+RECORD = struct.Struct('<QqHHBB2x')
+
+DEFAULT_CAPACITY = 65536
+UNKNOWN_ANGLE = 0xFFFF
+
+# Registros examinados (do mais recente para trás) ao procurar a última posição de um servo
+LAST_ANGLE_SCAN = 4096
+
+# Origem do registro
+SOURCE_API = 1           # POST /angle direto
+SOURCE_MOTION = 2        # Fila de movimento (POST /angle e WebSocket coalescidos)
+SOURCE_WEBSOCKET = 3
+SOURCE_UDP = 4
+SOURCE_BATCH = 5
+SOURCE_MISSION = 6
+SOURCE_SWEEP = 7         # Passo de sweep por software
+SOURCE_WAVE_SWEEP = 8    # Passo de sweep por waveform (horário do DMA)
+SOURCE_CALIBRATION = 9   # Pulso bruto da calibração guiada
+SOURCE_JOB = 10          # Retorno à posição de repouso de um job
+SOURCE_INIT = 11
+SOURCE_STOP = 12         # Sweep interrompido (posição no momento da parada)
+SOURCE_DISPENSE = 13     # Liberação periódica (abre e fecha)
+
+SOURCE_NAMES = {
+    SOURCE_API: 'api', SOURCE_MOTION: 'motion', SOURCE_WEBSOCKET: 'websocket', SOURCE_UDP: 'udp',
+    SOURCE_BATCH: 'batch', SOURCE_MISSION: 'mission', SOURCE_SWEEP: 'sweep',
+    SOURCE_WAVE_SWEEP: 'wave_sweep', SOURCE_CALIBRATION: 'calibration', SOURCE_JOB: 'job',
+    SOURCE_INIT: 'init', SOURCE_STOP: 'stop', SOURCE_DISPENSE: 'dispense',
+}
+
+
+class ActuationJournal:
+    """
+    Arquivo circular de registros de atuação.
+    seq cresce sem voltar a zero; o registro seq fica na posição
+    seq % capacity, e leitores detectam sobrescrita comparando o seq gravado.
+    """
+    
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY, readonly: bool = False):
+        """
+        Args:
+            path: Arquivo do journal (criado se não existir)
+            capacity: Número de registros do anel (arquivo existente mantém o seu)
+            readonly: Abre só para leitura (ferramentas de auditoria)
+        
+        Raises:
+            ValueError: Arquivo existente com formato inválido
+        """
+        self.path = path
+        self.servo_names: List[str] = []  # Nome de cada índice de servo (ServoGroup)
+        self.lock = threading.Lock()
+        self.readonly = readonly
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        if not exists:
+            if readonly:
+                raise ValueError(f"{path}: journal não encontrado")
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, capacity, 0, 0, 0).ljust(HEADER_SIZE, b'\0'))
+                f.truncate(HEADER_SIZE + capacity * RECORD.size)
+        
+        self.file = open(path, 'rb' if readonly else 'r+b')
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self.map = mmap.mmap(self.file.fileno(), 0, access=access)
+        magic, version, record_size, self.capacity, self.next_seq, self.boot_seq, self.wall_offset_ns = \
+            HEADER.unpack_from(self.map, 0)
+        if (magic != MAGIC or version != VERSION or record_size != RECORD.size
+                or len(self.map) != HEADER_SIZE + self.capacity * RECORD.size):
+            self.close()
+            raise ValueError(f"{path}: não é um journal de atuação v{VERSION}")
+        
+        if not readonly:
+            # Nova inicialização: o relógio monotônico recomeçou
+            self.boot_seq = self.next_seq
+            self.wall_offset_ns = time.time_ns() - time.monotonic_ns()
+            self._write_header()
+    
+    def close(self):
+        if self.map is not None:
+            if not self.readonly:
+                self.map.flush()
+            self.map.close()
+            self.map = None
+        self.file.close()
+    
+    def _write_header(self):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, RECORD.size, self.capacity,
+                         self.next_seq, self.boot_seq, self.wall_offset_ns)
+    
+    def append(self, source: int, angle: Optional[float], pulsewidth: int, t_ns: Optional[int] = None,
+               servo: int = 0):
+        """
+        Acrescenta um registro (caminho de atuação: só escrita na memória).
+        
+        Args:
+            source: Origem (SOURCE_*)
+            angle: Ângulo em graus (None: desconhecido, ex. pulso bruto)
+            pulsewidth: Pulso aplicado em µs
+            t_ns: Instante (time.monotonic_ns); padrão: agora
+            servo: Índice do servo no grupo
+        """
+        if t_ns is None:
+            t_ns = time.monotonic_ns()
+        angle_cd = UNKNOWN_ANGLE if angle is None else int(round(angle * 100))
+        with self.lock:
+            if self.map is None:
+                return
+            seq = self.next_seq
+            RECORD.pack_into(self.map, HEADER_SIZE + (seq % self.capacity) * RECORD.size,
+                             seq, t_ns, angle_cd, pulsewidth, source, servo)
+            self.next_seq = seq + 1
+            # Só o contador no cabeçalho (o resto não muda até reiniciar)
+            NEXT_SEQ.pack_into(self.map, NEXT_SEQ_OFFSET, self.next_seq)
+    
+    def oldest_seq(self) -> int:
+        return max(0, self.next_seq - self.capacity)
+    
+    def iter_records(self, since: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Registros com seq > since (todos os ainda no anel se since for None).
+        
+        Yields:
+            Tuplas (seq, t_ns, angle_cd, pulsewidth, source, servo)
+        """
+        if self.readonly:
+            self.next_seq = NEXT_SEQ.unpack_from(self.map, NEXT_SEQ_OFFSET)[0]
+        end = self.next_seq
+        start = self.oldest_seq() if since is None else max(since + 1, self.oldest_seq())
+        for seq in range(start, end):
+            record = RECORD.unpack_from(self.map, HEADER_SIZE + (seq % self.capacity) * RECORD.size)
+            if record[0] != seq:
+                # Sobrescrito durante a leitura
+                continue
+            yield record
+    
+    def read(self, since: Optional[int] = None, limit: int = 1000) -> dict:
+        """
+        Registros para a API (GET /journal?since=).
+        
+        Returns:
+            Dicionário com "records" (até limit), "next" (cursor para o próximo
+            since), "oldest" e "lost" (registros já sobrescritos desde since)
+        """
+        records: List[dict] = []
+        last = since if since is not None else self.oldest_seq() - 1
+        for seq, t_ns, angle_cd, pulsewidth, source, servo in self.iter_records(since):
+            if len(records) >= limit:
+                break
+            records.append({
+                'seq': seq,
+                't_ns': t_ns,
+                'time': self.wall_time(seq, t_ns),
+                'angle': None if angle_cd == UNKNOWN_ANGLE else angle_cd / 100.0,
+                'pulsewidth': pulsewidth,
+                'source': SOURCE_NAMES.get(source, str(source)),
+                'servo': self.servo_name(servo),
+            })
+            last = seq
+        lost = 0
+        if since is not None:
+            lost = max(0, self.oldest_seq() - (since + 1))
+        return {'records': records, 'next': last, 'oldest': self.oldest_seq(), 'lost': lost}
+    
+    def last_angle(self, servo: int = 0) -> Optional[float]:
+        """
+        Última posição registrada do servo (inclusive de inicializações
+        anteriores): permite partir sem o movimento de homing.
+        
+        Returns:
+            Ângulo em graus, ou None se desconhecido (sem registro recente do
+            servo ou último registro com pulso bruto da calibração)
+        """
+        end = self.next_seq
+        for seq in range(end - 1, max(self.oldest_seq(), end - LAST_ANGLE_SCAN) - 1, -1):
+            record = RECORD.unpack_from(self.map, HEADER_SIZE + (seq % self.capacity) * RECORD.size)
+            if record[0] != seq or record[5] != servo:
+                continue
+            return None if record[2] == UNKNOWN_ANGLE else record[2] / 100.0
+        return None
+    
+    def servo_name(self, index: int) -> str:
+        return self.servo_names[index] if index < len(self.servo_names) else str(index)
+    
+    def wall_time(self, seq: int, t_ns: int) -> Optional[float]:
+        """Horário de parede (epoch) de registros desta inicialização"""
+        if seq < self.boot_seq:
+            return None
+        return round((t_ns + self.wall_offset_ns) / 1e9, 6)
+    
+    def stats(self) -> dict:
+        return {
+            'path': self.path,
+            'capacity': self.capacity,
+            'next_seq': self.next_seq,
+            'oldest_seq': self.oldest_seq(),
+            'boot_seq': self.boot_seq,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journal de atuação do servo")
+    commands = parser.add_subparsers(dest='command', required=True)
+    dump_parser = commands.add_parser('dump', help="Lista os registros em CSV")
+    dump_parser.add_argument('path')
+    dump_parser.add_argument('--since', type=int, default=None, help="Só registros com seq > since")
+    args = parser.parse_args()
+    
+    try:
+        journal = ActuationJournal(args.path, readonly=True)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Erro: {e}")
+    print("seq,t_ns,time,angle,pulsewidth,source,servo")
+    for seq, t_ns, angle_cd, pulsewidth, source, servo in journal.iter_records(args.since):
+        angle = '' if angle_cd == UNKNOWN_ANGLE else f"{angle_cd / 100.0:.2f}"
+        wall = journal.wall_time(seq, t_ns)
+        print(f"{seq},{t_ns},{'' if wall is None else f'{wall:.6f}'},{angle},{pulsewidth},"
+              f"{SOURCE_NAMES.get(source, source)},{servo}")
+    journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,63 @@
 """
 Sistema de logging centralizado para o Trichogramma Pi Service.
 Fornece logging rotativo para arquivo e console simultaneamente.
+No modo assíncrono, a escrita em disco e no console sai da thread que
+registra a mensagem (caminho de atuação) para uma thread dedicada.
 """
 
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+# Políticas de descarte quando a fila assíncrona está cheia
+DROP_NEW = "drop_new"        # Descarta a mensagem nova
+DROP_OLDEST = "drop_oldest"  # Descarta a mensagem mais antiga da fila
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler que nunca bloqueia: com a fila cheia, descarta uma mensagem
+    conforme a política e conta os descartes por nível.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = DROP_NEW):
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+        self.enqueued = 0
+        self.dropped = 0
+        self.dropped_by_level = {}
+        self.counter_lock = threading.Lock()
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+            return
+        except queue.Full:
+            pass
+        
+        dropped = record
+        if self.drop_policy == DROP_OLDEST:
+            try:
+                dropped = self.queue.get_nowait()
+                self.queue.put_nowait(record)
+                self.enqueued += 1
+            except (queue.Empty, queue.Full):
+                dropped = record
+        
+        with self.counter_lock:
+            self.dropped += 1
+            self.dropped_by_level[dropped.levelname] = self.dropped_by_level.get(dropped.levelname, 0) + 1
+
+
+class _DrainingQueueListener(QueueListener):
+    """QueueListener cujo sinal de parada espera espaço na fila limitada"""
+    
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
 
 
 class TrichoLogger:
@@ -16,7 +68,8 @@ class TrichoLogger:
     Escreve logs tanto em arquivo quanto no console.
     """
     
-    def __init__(self, logfile: str, level: str = "INFO", max_bytes: int = 10485760, backup_count: int = 5):
+    def __init__(self, logfile: str, level: str = "INFO", max_bytes: int = 10485760, backup_count: int = 5,
+                 async_mode: bool = False, queue_size: int = 1000, drop_policy: str = DROP_NEW):
         """
         Inicializa o sistema de logging.
         
@@ -25,11 +78,16 @@ class TrichoLogger:
             level: Nível de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             max_bytes: Tamanho máximo do arquivo antes de rotacionar (padrão: 10MB)
             backup_count: Número de arquivos de backup a manter
+            async_mode: Se True, escreve arquivo e console em uma thread dedicada
+            queue_size: Capacidade da fila do modo assíncrono
+            drop_policy: "drop_new" ou "drop_oldest" quando a fila está cheia
         """
         self.logfile = logfile
         self.level = getattr(logging, level.upper(), logging.INFO)
         self.logger = logging.getLogger("TrichogrammaService")
         self.logger.setLevel(self.level)
+        self.queue_handler = None
+        self.listener = None
         
         # Remove handlers existentes para evitar duplicação
         self.logger.handlers.clear()
@@ -81,6 +139,74 @@ class TrichoLogger:
         console_handler.setLevel(self.level)
         console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
+        
+        if async_mode:
+            self._start_async(queue_size, drop_policy)
+    
+    def _start_async(self, queue_size: int, drop_policy: str):
+        """Move os handlers para uma QueueListener alimentada por fila limitada"""
+        if drop_policy not in (DROP_NEW, DROP_OLDEST):
+            print(f"AVISO: drop_policy desconhecida '{drop_policy}'. Usando {DROP_NEW}")
+            drop_policy = DROP_NEW
+        
+        handlers = list(self.logger.handlers)
+        self.logger.handlers.clear()
+        
+        log_queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = DroppingQueueHandler(log_queue, drop_policy)
+        self.logger.addHandler(self.queue_handler)
+        self.listener = _DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+    
+    def stats(self) -> dict:
+        """
+        Contadores do logging assíncrono.
+        
+        Returns:
+            Dicionário com modo, profundidade da fila e descartes
+        """
+        if not self.queue_handler:
+            return {'mode': 'sync'}
+        return {
+            'mode': 'async',
+            'queue_depth': self.queue_handler.queue.qsize(),
+            'queue_size': self.queue_handler.queue.maxsize,
+            'drop_policy': self.queue_handler.drop_policy,
+            'enqueued': self.queue_handler.enqueued,
+            'dropped': self.queue_handler.dropped,
+            'dropped_by_level': dict(self.queue_handler.dropped_by_level),
+        }
+    
+    def flush(self):
+        """
+        Escreve tudo o que está na fila e encerra a thread de logging.
+        Chamado no encerramento do serviço; mensagens posteriores são escritas
+        de forma síncrona.
+        """
+        if self.listener:
+            listener, self.listener = self.listener, None
+            # Troca atômica: novas mensagens vão direto aos handlers enquanto a fila esvazia
+            self.logger.handlers = list(listener.handlers)
+            listener.stop()
+        for handler in self.logger.handlers:
+            handler.flush()
+    
+    def set_level(self, level: str):
+        """
+        Troca o nível do logger e dos handlers (recarga do config.yaml).
+        
+        Raises:
+            ValueError: Nível desconhecido
+        """
+        value = logging.getLevelName(str(level).upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Nível de logging desconhecido: {level}")
+        handlers = list(self.logger.handlers) + (list(self.listener.handlers) if self.listener else [])
+        for handler in handlers:
+            handler.setLevel(value)
+        self.level = value
+        self.logger.setLevel(value)
+        self.logger.warning(f"Nível de logging: {logging.getLevelName(value)}")
     
     def get_logger(self) -> logging.Logger:
         """
@@ -124,16 +250,20 @@ class TrichoLogger:
         self.logger.critical(message, exc_info=exc_info)
 
 
-def create_logger(logfile: str, level: str = "INFO") -> TrichoLogger:
+def create_logger(logfile: str, level: str = "INFO", async_mode: bool = False,
+                  queue_size: int = 1000, drop_policy: str = DROP_NEW) -> TrichoLogger:
     """
     Função auxiliar para criar um logger rapidamente.
     
     Args:
         logfile: Caminho do arquivo de log
         level: Nível de logging
+        async_mode: Escrita em thread dedicada com fila limitada
+        queue_size: Capacidade da fila do modo assíncrono
+        drop_policy: Política de descarte com a fila cheia
         
     Returns:
         Instância configurada de TrichoLogger
     """
-    return TrichoLogger(logfile, level)
+    return TrichoLogger(logfile, level, async_mode=async_mode, queue_size=queue_size, drop_policy=drop_policy)
 
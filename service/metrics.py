@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro de métricas no formato de texto do Prometheus (GET /metrics).
+Contadores e histogramas com um lock curto por série (sem lock global no
+caminho quente) e gauges calculados na coleta. Pensado para ficar sempre
+ligado no Pi Zero 2 W: registrar uma amostra custa cerca de 1µs.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# Buckets padrão em segundos (100µs a 2.5s)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Buckets para jitter e espera de lock (10µs a 50ms)
+JITTER_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                  0.0025, 0.005, 0.01, 0.025, 0.05)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    __slots__ = ('value', 'lock')
+    
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+    
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'lock')
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Último = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+    
+    def snapshot(self):
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+
+class _Metric:
+    """Base: série sem labels ou família de séries por combinação de labels"""
+    
+    kind = 'untyped'
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[tuple, object] = {}
+        self.lock = threading.Lock()  # Só na criação de uma série nova
+        if not self.labelnames:
+            self.children[()] = self._new_child()
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def labels(self, *values):
+        """Série para os valores de label informados (criada na primeira vez)"""
+        key = tuple(str(v) for v in values)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = sorted(self.children.items(), key=lambda item: item[0])
+        for key, child in items:
+            lines.extend(self._render_child(key, child))
+        return lines
+    
+    def _render_child(self, key, child):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+    
+    def _new_child(self):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1):
+        self.children[()].inc(amount)
+    
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+    
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+    
+    def observe(self, value: float):
+        self.children[()].observe(value)
+    
+    def _render_child(self, key, child):
+        counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.bounds + (float('inf'),), counts):
+            cumulative += n
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 9))}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Valor lido na coleta por uma função (sem custo no caminho quente)"""
+    
+    kind = 'gauge'
+    
+    def __init__(self, name: str, help_text: str, fn: Optional[Callable[[], float]] = None,
+                 kind: str = 'gauge'):
+        self.fn = fn
+        self.kind = kind  # "counter" para totais mantidos fora do registro
+        super().__init__(name, help_text)
+    
+    def _new_child(self):
+        return None
+    
+    def set_function(self, fn: Callable[[], float]):
+        self.fn = fn
+    
+    def _render_child(self, key, child):
+        if self.fn is None:
+            return []
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas em GET /metrics"""
+    
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+        self.started = time.time()
+    
+    def _register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+    
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+    
+    def gauge(self, name: str, help_text: str, fn: Optional[Callable[[], float]] = None,
+              kind: str = 'gauge') -> Gauge:
+        return self._register(Gauge(name, help_text, fn, kind))
+    
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registro do processo e métricas do serviço
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'tricho_http_requests_total', 'Requisições HTTP atendidas', ('method', 'route', 'status'))
+HTTP_DURATION = REGISTRY.histogram(
+    'tricho_http_request_duration_seconds', 'Tempo de processamento no servidor por rota', ('method', 'route'))
+SET_ANGLE_DURATION = REGISTRY.histogram(
+    'tricho_set_angle_duration_seconds', 'Duração de ServoControl.set_angle (inclui assentamento)')
+LOCK_WAIT = REGISTRY.histogram(
+    'tricho_servo_lock_wait_seconds', 'Espera pelo lock do servo em set_angle', buckets=JITTER_BUCKETS)
+SWEEP_STEP_JITTER = REGISTRY.histogram(
+    'tricho_sweep_step_jitter_seconds', 'Atraso de cada passo do sweep em software após o deadline',
+    buckets=JITTER_BUCKETS)
+STOP_LATENCY = REGISTRY.histogram(
+    'tricho_stop_latency_seconds', 'Do pedido de parada ao último pulso do movimento interrompido',
+    ('engine',), buckets=JITTER_BUCKETS)
+PIGPIO_ERRORS = REGISTRY.counter(
+    'tricho_pigpio_errors_total', 'Chamadas ao pigpio que falharam', ('call',))
+LOG_QUEUE_DEPTH = REGISTRY.gauge(
+    'tricho_log_queue_depth', 'Mensagens aguardando a thread de logging')
+LOG_DROPPED = REGISTRY.gauge(
+    'tricho_log_dropped_total', 'Mensagens de log descartadas com a fila cheia', kind='counter')
+UPTIME = REGISTRY.gauge(
+    'tricho_uptime_seconds', 'Tempo desde o início do processo', lambda: round(time.time() - REGISTRY.started, 3))
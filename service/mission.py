@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Missões de liberação: planos de voo em disco (eventos por tempo ou por
+waypoint) validados e compilados em um cronograma compacto na memória,
+executado por uma thread de alta precisão que comanda o ServoControl.
+
+Formato .json:
+    {"name": "talhao-3", "mode": "timed", "rest_angle": 60,
+     "events": [{"t": 1.5, "angle": 120, "hold_ms": 200}, ...]}
+    mode "waypoint": cada evento tem "waypoint" (índice) e "t" relativo à
+    chegada no waypoint (POST /missions/waypoint).
+
+Formato .txt (uma linha por evento, "#" inicia comentário):
+    <t_s> <ângulo> [hold_ms]            (timed)
+    w<índice> <t_s> <ângulo> [hold_ms]  (waypoint)
+
+Com hold_ms, o servo volta para rest_angle depois da espera.
+
+Formato .tfp: cronograma já compilado, mapeado do disco (ver flight_file.py).
+"""
+
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+from array import array
+from typing import List, Optional
+
+import metrics
+from journal import SOURCE_MISSION
+
+MODE_TIMED = 'timed'
+MODE_WAYPOINT = 'waypoint'
+
+# Limite de eventos por plano
+MAX_EVENTS = 100000
+
+# Espera ativa antes de cada ação (o sleep do SO acorda com atraso variável)
+DEFAULT_SPIN_S = 0.0005
+
+# Estados da missão
+IDLE = 'idle'
+LOADED = 'loaded'
+RUNNING = 'running'
+PAUSED = 'paused'
+COMPLETED = 'completed'
+ABORTED = 'aborted'
+
+NO_EVENT = 0xFFFFFFFF
+
+TIMING_ERROR = metrics.REGISTRY.histogram(
+    'tricho_mission_timing_error_seconds', 'Atraso de cada ação da missão em relação ao cronograma',
+    buckets=metrics.JITTER_BUCKETS)
+
+
+class MissionPlan:
+    """
+    Cronograma compilado: ações (movimentos) em arrays paralelos, ordenadas
+    por segmento e tempo. Segmento = missão inteira (timed) ou um waypoint.
+    """
+    
+    def __init__(self, name: str, mode: str, source: str = ''):
+        self.name = name
+        self.mode = mode
+        self.source = source
+        self.offsets_ns = array('q')   # Tempo da ação desde o início do segmento
+        self.angles_cd = array('H')    # Ângulo em centésimos de grau
+        self.events = array('I')       # Evento de origem (NO_EVENT para retornos)
+        self.segment_of = array('I')   # Segmento de cada ação
+        self.segments = {}             # segmento -> (primeira ação, fim exclusivo)
+        self.samples = array('I')      # Índice por tempo: ações amostradas (em ordem)
+        self.sample_offsets = array('q')  # e o tempo de cada uma
+        self.event_count = 0
+        self.storage = 'memory'        # 'mmap' quando as colunas vêm de um arquivo .tfp
+        self.flight_file = None        # FlightFile aberto (colunas mapeadas)
+    
+    def __len__(self):
+        return len(self.offsets_ns)
+    
+    def duration_s(self) -> float:
+        return self.offsets_ns[-1] / 1e9 if self.mode == MODE_TIMED and len(self) else 0.0
+    
+    def seek(self, segment: int, offset_ns: int) -> int:
+        """
+        Primeira ação do segmento com tempo >= offset_ns.
+        As amostras do índice limitam a busca binária a um trecho pequeno
+        (poucas páginas lidas quando as colunas estão mapeadas).
+        """
+        first, end = self.segments[segment]
+        lo, hi = first, end
+        left = bisect.bisect_left(self.samples, first)
+        right = bisect.bisect_left(self.samples, end)
+        if left < right:
+            position = bisect.bisect_left(self.sample_offsets, offset_ns, left, right)
+            if position > left:
+                lo = self.samples[position - 1]
+            if position < right:
+                hi = self.samples[position]
+        return bisect.bisect_left(self.offsets_ns, offset_ns, lo, hi)
+    
+    def summary(self) -> dict:
+        return {
+            'name': self.name,
+            'mode': self.mode,
+            'source': self.source,
+            'events': self.event_count,
+            'actions': len(self),
+            'segments': len(self.segments),
+            'duration_s': round(self.duration_s(), 3),
+            'storage': self.storage,
+            'memory_bytes': sum(a.itemsize * len(a) for a in
+                                (self.offsets_ns, self.angles_cd, self.events, self.segment_of)),
+        }
+
+
+def parse_events(path: str) -> dict:
+    """
+    Lê um plano .json ou .txt.
+    
+    Returns:
+        Dicionário {"name", "mode", "rest_angle", "events": [...]}
+    
+    Raises:
+        ValueError: Arquivo inválido
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON inválido: {e}")
+        if not isinstance(data, dict):
+            raise ValueError('O plano deve ser um objeto com "events"')
+        data.setdefault('name', name)
+        return data
+    
+    if path.endswith('.txt'):
+        events = []
+        mode = MODE_TIMED
+        rest_angle = None
+        with open(path, 'r') as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                fields = line.split()
+                if fields[0].lower() == 'rest':
+                    rest_angle = fields[1] if len(fields) > 1 else None
+                    continue
+                event = {}
+                if fields[0][0] in 'wW':
+                    mode = MODE_WAYPOINT
+                    event['waypoint'] = fields.pop(0)[1:]
+                if len(fields) < 2:
+                    raise ValueError(f"Linha {number}: use <t_s> <ângulo> [hold_ms]")
+                event['t'], event['angle'] = fields[0], fields[1]
+                if len(fields) > 2:
+                    event['hold_ms'] = fields[2]
+                events.append(event)
+        return {'name': name, 'mode': mode, 'rest_angle': rest_angle, 'events': events}
+    
+    raise ValueError("Formato não suportado (use .json ou .txt)")
+
+
+def compile_plan(data: dict, source: str = '', max_events: int = MAX_EVENTS) -> MissionPlan:
+    """
+    Valida o plano inteiro e compila o cronograma.
+    
+    Raises:
+        ValueError: Plano inválido (mensagem com o índice do evento)
+    """
+    mode = data.get('mode', MODE_TIMED)
+    if mode not in (MODE_TIMED, MODE_WAYPOINT):
+        raise ValueError(f'"mode" deve ser "{MODE_TIMED}" ou "{MODE_WAYPOINT}"')
+    events = data.get('events')
+    if not isinstance(events, list) or not events:
+        raise ValueError('"events" deve ser uma lista não vazia')
+    if len(events) > max_events:
+        raise ValueError(f"Máximo de {max_events} eventos por plano")
+    
+    rest_angle = data.get('rest_angle')
+    if rest_angle is not None:
+        rest_angle = _angle(rest_angle, 'rest_angle')
+    
+    # (segmento, offset_ns, ângulo_cd, evento)
+    actions = []
+    held = set()
+    for index, event in enumerate(events):
+        if not isinstance(event, dict):
+            raise ValueError(f"Evento {index}: deve ser um objeto")
+        try:
+            t_ns = int(round(float(event.get('t', 0)) * 1e9))
+            hold_ns = int(round(float(event.get('hold_ms', 0)) * 1e6))
+            segment = int(event.get('waypoint', 0)) if mode == MODE_WAYPOINT else 0
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f'Evento {index}: "t", "hold_ms" e "waypoint" devem ser numéricos')
+        if t_ns < 0 or hold_ns < 0 or segment < 0:
+            raise ValueError(f"Evento {index}: valores negativos não são permitidos")
+        if mode == MODE_WAYPOINT and 'waypoint' not in event:
+            raise ValueError(f'Evento {index}: "waypoint" obrigatório no modo waypoint')
+        angle_cd = _angle(event.get('angle'), f"Evento {index}: angle")
+        actions.append((segment, t_ns, angle_cd, index))
+        if hold_ns:
+            if rest_angle is None:
+                raise ValueError(f'Evento {index}: "hold_ms" exige "rest_angle" no plano')
+            actions.append((segment, t_ns + hold_ns, rest_angle, NO_EVENT))
+            held.add(index)
+    
+    actions.sort(key=lambda a: (a[0], a[1]))
+    
+    # Um evento com hold_ms volta ao repouso antes do próximo evento do segmento
+    for (segment, _, _, event), following in zip(actions, actions[1:]):
+        if event in held and following[0] == segment and following[3] != NO_EVENT:
+            raise ValueError(f"Evento {following[3]}: começa antes do retorno do evento {event}")
+    
+    plan = MissionPlan(str(data.get('name', '')), mode, source)
+    plan.event_count = len(events)
+    for position, (segment, offset_ns, angle_cd, event) in enumerate(actions):
+        plan.offsets_ns.append(offset_ns)
+        plan.angles_cd.append(angle_cd)
+        plan.events.append(event)
+        plan.segment_of.append(segment)
+        first, _ = plan.segments.get(segment, (position, position))
+        plan.segments[segment] = (first, position + 1)
+    return plan
+
+
+def load_plan(path: str, max_events: int = MAX_EVENTS) -> MissionPlan:
+    """Lê, valida e compila um plano de voo (.tfp: mapeado do arquivo já compilado)"""
+    from flight_file import EXTENSION, FlightFile
+    if path.endswith(EXTENSION):
+        flight = FlightFile(path)
+        try:
+            # Mesmos limites de compile_plan: o .tfp não passa por ele ao carregar
+            flight.validate(max_events)
+        except ValueError:
+            flight.close()
+            raise
+        return flight.plan()
+    return compile_plan(parse_events(path), source=os.path.basename(path), max_events=max_events)
+
+
+def _angle(value, label: str) -> int:
+    try:
+        angle = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} inválido")
+    if not 0 <= angle <= 180:
+        raise ValueError(f"{label} deve estar entre 0 e 180")
+    return int(round(angle * 100))
+
+
+class MissionRunner:
+    """
+    Executa o plano carregado em uma thread dedicada.
+    Cada ação tem um deadline absoluto (monotonic_ns): a thread dorme até
+    pouco antes e faz espera ativa no trecho final. A pausa desloca os
+    deadlines seguintes pelo tempo parado.
+    """
+    
+    def __init__(self, servo, directory: str, spin_s: float = DEFAULT_SPIN_S,
+                 max_events: int = MAX_EVENTS, logger=None):
+        """
+        Args:
+            servo: Instância de ServoControl
+            directory: Diretório dos planos de voo
+            spin_s: Espera ativa antes de cada ação (segundos)
+            max_events: Limite de eventos por plano
+            logger: Instância do logger (opcional)
+        """
+        self.servo = servo
+        self.directory = directory
+        self.spin_ns = int(spin_s * 1e9)
+        self.max_events = max_events
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.plan: Optional[MissionPlan] = None
+        self.state = IDLE
+        self.thread = None
+        self.wake = threading.Event()   # Pausa, retomada, abort e waypoints
+        self.waypoints = queue.Queue()
+        self.reset_progress()
+    
+    def reset_progress(self):
+        self.next_action = 0
+        self.errors_us = array('i')      # Atraso de cada ação executada (µs)
+        self.executed = array('I')       # Índice de cada ação executada (ordem de execução)
+        self.failed_actions = 0
+        self.started_at = None
+        self.finished_at = None
+        self.abort_requested = False
+        self.pause_requested = False
+        self.start_ns = 0                # Início no meio da missão (POST /missions/start {"at_s"})
+    
+    # Comandos
+    
+    def load(self, filename: str) -> dict:
+        """
+        Carrega um plano do diretório de voo.
+        
+        Raises:
+            ValueError: Arquivo inexistente, fora do diretório ou inválido
+        """
+        if os.path.basename(filename) != filename or filename.startswith('.'):
+            raise ValueError("Informe apenas o nome do arquivo")
+        path = os.path.join(self.directory, filename)
+        if not os.path.isfile(path):
+            raise ValueError(f"Arquivo não encontrado: {filename}")
+        with self.lock:
+            if self.state in (RUNNING, PAUSED):
+                raise ValueError("Missão em execução (use abort antes de carregar outra)")
+        plan = load_plan(path, self.max_events)
+        with self.lock:
+            # Um start pode ter chegado durante o parse (feito fora da trava)
+            if self.state in (RUNNING, PAUSED):
+                if plan.flight_file:
+                    plan.flight_file.close()
+                raise ValueError("Missão em execução (use abort antes de carregar outra)")
+            previous, self.plan = self.plan, plan
+            self.state = LOADED
+            self.reset_progress()
+        if previous and previous.flight_file:
+            previous.flight_file.close()
+        self._log_info(f"Missão carregada: {plan.source} ({plan.event_count} eventos, {len(plan)} ações)")
+        return self.status()
+    
+    def start(self, at_s=None) -> dict:
+        """
+        Inicia a missão.
+        
+        Args:
+            at_s: Começa (ou retoma) uma missão por tempo no meio, a partir
+                  da primeira ação com t >= at_s
+        """
+        with self.lock:
+            if self.plan is None:
+                raise ValueError("Nenhuma missão carregada")
+            if self.state in (RUNNING, PAUSED):
+                raise ValueError("Missão já em execução")
+            at_ns = 0
+            if at_s is not None:
+                if self.plan.mode != MODE_TIMED:
+                    raise ValueError('"at_s" só vale para missões por tempo')
+                try:
+                    at_ns = int(float(at_s) * 1e9)
+                except (TypeError, ValueError, OverflowError):
+                    raise ValueError('"at_s" deve ser numérico')
+                if not 0 <= at_ns <= self.plan.offsets_ns[-1]:
+                    raise ValueError(f'"at_s" deve estar entre 0 e {self.plan.duration_s():.3f}')
+            self.reset_progress()
+            self.start_ns = at_ns
+            self.waypoints = queue.Queue()
+            self.wake.clear()
+            self.state = RUNNING
+            self.started_at = time.time()
+            self.thread = threading.Thread(target=self._run, name='mission', daemon=True)
+            self.thread.start()
+        self._log_info(f"Missão iniciada: {self.plan.source}" + (f" em t={at_s}s" if at_ns else ""))
+        return self.status()
+    
+    def pause(self) -> dict:
+        with self.lock:
+            if self.state != RUNNING:
+                raise ValueError("Missão não está em execução")
+            self.pause_requested = True
+            self.state = PAUSED
+            self.wake.set()
+        return self.status()
+    
+    def resume(self) -> dict:
+        with self.lock:
+            if self.state != PAUSED:
+                raise ValueError("Missão não está pausada")
+            self.pause_requested = False
+            self.state = RUNNING
+            self.wake.set()
+        return self.status()
+    
+    def abort(self, wait: bool = True) -> dict:
+        """
+        Interrompe a missão.
+        
+        Args:
+            wait: Se True, aguarda a thread terminar (POST /stop não espera)
+        """
+        with self.lock:
+            if self.state in (RUNNING, PAUSED):
+                self.abort_requested = True
+                self.wake.set()
+        if wait and self.thread:
+            self.thread.join(timeout=2.0)
+        return self.status()
+    
+    def waypoint(self, index) -> dict:
+        """Chegada ao waypoint: agenda os eventos dele a partir de agora"""
+        now_ns = time.monotonic_ns()
+        try:
+            index = int(index)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError('Parâmetro "index" obrigatório (inteiro)')
+        with self.lock:
+            if self.plan is None or self.plan.mode != MODE_WAYPOINT:
+                raise ValueError("Nenhuma missão por waypoint carregada")
+            if self.state not in (RUNNING, PAUSED):
+                raise ValueError("Missão não está em execução")
+            if index not in self.plan.segments:
+                raise ValueError(f"Waypoint {index} não tem eventos no plano")
+            self.waypoints.put((index, now_ns))
+            self.wake.set()
+        return self.status()
+    
+    # Consulta
+    
+    def list_files(self) -> List[str]:
+        from utils import list_flight_files
+        return list_flight_files(self.directory)
+    
+    def status(self) -> dict:
+        plan = self.plan
+        total = len(plan) if plan else 0
+        return {
+            'state': self.state,
+            'plan': plan.summary() if plan else None,
+            'actions_done': self.next_action if plan and plan.mode == MODE_TIMED else len(self.errors_us),
+            'actions_total': total,
+            'failed_actions': self.failed_actions,
+            'started_at': self.started_at,
+            'timing_error_us': self.timing_summary(),
+        }
+    
+    def timing_summary(self) -> dict:
+        errors = sorted(self.errors_us)
+        if not errors:
+            return {'count': 0}
+        return {
+            'count': len(errors),
+            'mean': round(sum(errors) / len(errors), 1),
+            'p50': errors[len(errors) // 2],
+            'p99': errors[min(len(errors) - 1, int(len(errors) * 0.99))],
+            'max': errors[-1],
+        }
+    
+    def report(self, offset: int = 0, limit: int = 1000) -> dict:
+        """Atraso de cada ação executada (µs), com o evento de origem"""
+        plan = self.plan
+        errors = self.errors_us[offset:offset + limit]
+        rows = []
+        for i, error in enumerate(errors, offset):
+            event = plan.events[self.executed[i]] if plan else NO_EVENT
+            rows.append({'action': self.executed[i],
+                         'event': None if event == NO_EVENT else event,
+                         'error_us': error})
+        return {'offset': offset, 'count': len(self.errors_us), 'actions': rows}
+    
+    # Execução
+    
+    def _run(self):
+        plan = self.plan
+        try:
+            if plan.mode == MODE_TIMED:
+                first = plan.seek(0, self.start_ns) if self.start_ns else None
+                self._run_segment(plan, 0, time.monotonic_ns() - self.start_ns, first)
+            else:
+                while not self.abort_requested:
+                    try:
+                        segment, arrived_ns = self.waypoints.get_nowait()
+                    except queue.Empty:
+                        self.wake.wait()
+                        self.wake.clear()
+                        continue
+                    self._run_segment(plan, segment, arrived_ns)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Erro na missão: {e}", exc_info=True)
+            self.abort_requested = True
+        
+        with self.lock:
+            self.state = ABORTED if self.abort_requested else COMPLETED
+            self.finished_at = time.time()
+        summary = self.timing_summary()
+        self._log_info(f"Missão {self.state}: {len(self.errors_us)} ações, "
+                       f"atraso p50 {summary.get('p50', 0)}us, máx {summary.get('max', 0)}us")
+    
+    def _run_segment(self, plan: MissionPlan, segment: int, base_ns: int, start: Optional[int] = None):
+        """Executa as ações de um segmento (a partir de start) com base em base_ns"""
+        first, end = plan.segments[segment]
+        for action in range(first if start is None else start, end):
+            deadline = base_ns + plan.offsets_ns[action]
+            while True:
+                if self.abort_requested:
+                    return
+                if self.pause_requested:
+                    # Parado: os deadlines seguintes andam junto com o tempo pausado
+                    paused_ns = time.monotonic_ns()
+                    while self.pause_requested and not self.abort_requested:
+                        self.wake.wait()
+                        self.wake.clear()
+                    shift = time.monotonic_ns() - paused_ns
+                    base_ns += shift
+                    deadline += shift
+                    continue
+                remaining = deadline - time.monotonic_ns() - self.spin_ns
+                if remaining <= 0:
+                    break
+                if self.wake.wait(remaining / 1e9):
+                    self.wake.clear()
+            while time.monotonic_ns() < deadline:
+                pass
+            if self.abort_requested:
+                return
+            
+            error_ns = time.monotonic_ns() - deadline
+            if not self.servo.set_angle(plan.angles_cd[action] / 100.0, settle=False, source=SOURCE_MISSION,
+                                        deadline_ns=deadline):
+                self.failed_actions += 1
+            self.errors_us.append(min(error_ns // 1000, 2 ** 31 - 1))
+            self.executed.append(action)
+            self.next_action = action + 1
+            TIMING_ERROR.observe(error_ns / 1e9)
+    
+    def _log_info(self, message: str):
+        if self.logger:
+            self.logger.info(message)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfis de movimento com velocidade e aceleração limitadas.
+A trajetória é amostrada uma vez por frame PWM (50 Hz) e executada pelos
+mesmos motores do sweep: waveforms do pigpio (DMA) ou deadlines por software.
+
+Perfis:
+    step       - salto direto ao alvo (comportamento original)
+    trapezoid  - aceleração constante, velocidade de cruzeiro, desaceleração
+    scurve     - como o trapezoidal, com rampas de aceleração senoidais
+                 (aceleração contínua, sem degrau de corrente no servo)
+"""
+
+import math
+from typing import List
+
+PROFILE_STEP = 'step'
+PROFILE_TRAPEZOID = 'trapezoid'
+PROFILE_SCURVE = 'scurve'
+PROFILES = (PROFILE_STEP, PROFILE_TRAPEZOID, PROFILE_SCURVE)
+
+DEFAULT_MAX_VELOCITY_DEG_S = 360.0
+DEFAULT_MAX_ACCEL_DEG_S2 = 2400.0
+
+# Duração da rampa por (velocidade de pico / aceleração máxima): na rampa
+# senoidal a aceleração de pico é pi/2 vezes a média
+RAMP_FACTOR = {PROFILE_TRAPEZOID: 1.0, PROFILE_SCURVE: math.pi / 2}
+
+
+class Trajectory:
+    """Perfil de um deslocamento: rampa de aceleração, cruzeiro e rampa de desaceleração"""
+    
+    def __init__(self, from_angle: float, to_angle: float, max_velocity: float,
+                 max_accel: float, profile: str = PROFILE_TRAPEZOID):
+        """
+        Args:
+            from_angle: Ângulo inicial
+            to_angle: Ângulo final
+            max_velocity: Velocidade máxima (graus/segundo)
+            max_accel: Aceleração máxima (graus/segundo²)
+            profile: "trapezoid" ou "scurve"
+        
+        Raises:
+            ValueError: Perfil desconhecido ou limites não positivos
+        """
+        if profile not in RAMP_FACTOR:
+            raise ValueError(f"Perfil sem trajetória: {profile!r}")
+        if max_velocity <= 0 or max_accel <= 0:
+            raise ValueError("Velocidade e aceleração máximas devem ser positivas")
+        self.from_angle = from_angle
+        self.to_angle = to_angle
+        self.profile = profile
+        self.distance = abs(to_angle - from_angle)
+        self.direction = 1.0 if to_angle >= from_angle else -1.0
+        
+        factor = RAMP_FACTOR[profile]
+        # Cada rampa percorre v_pico * t_rampa / 2; sem espaço para cruzeiro,
+        # o pico é reduzido (perfil triangular)
+        self.peak_velocity = min(max_velocity, math.sqrt(self.distance * max_accel / factor))
+        self.ramp_s = factor * self.peak_velocity / max_accel if self.distance else 0.0
+        ramp_distance = self.peak_velocity * self.ramp_s / 2
+        self.cruise_s = (self.distance - 2 * ramp_distance) / self.peak_velocity if self.distance else 0.0
+        self.duration_s = 2 * self.ramp_s + self.cruise_s
+    
+    def _ramp_distance(self, t: float) -> float:
+        """Distância percorrida t segundos após o início da rampa de aceleração"""
+        if self.profile == PROFILE_TRAPEZOID:
+            return self.peak_velocity * t * t / (2 * self.ramp_s)
+        # v(t) = v_pico * (1 - cos(pi t / t_rampa)) / 2
+        return self.peak_velocity / 2 * (t - self.ramp_s / math.pi * math.sin(math.pi * t / self.ramp_s))
+    
+    def position(self, t: float) -> float:
+        """Ângulo no instante t (segundos desde o início)"""
+        if t <= 0 or not self.distance:
+            return self.from_angle
+        if t >= self.duration_s:
+            return self.to_angle
+        if t < self.ramp_s:
+            travelled = self._ramp_distance(t)
+        elif t <= self.ramp_s + self.cruise_s:
+            travelled = self.peak_velocity * (t - self.ramp_s / 2)
+        else:
+            travelled = self.distance - self._ramp_distance(self.duration_s - t)
+        return self.from_angle + self.direction * travelled
+    
+    def sample(self, frame_s: float) -> List[float]:
+        """
+        Ângulo de cada frame PWM, do início (t = 0) ao alvo.
+        
+        Returns:
+            Lista de ângulos, sempre terminando exatamente em to_angle
+        """
+        frames = max(1, int(math.ceil(self.duration_s / frame_s - 1e-9)))
+        return [self.position(i * frame_s) for i in range(frames)] + [self.to_angle]
+
+
+def trajectory_angles(from_angle: float, to_angle: float, profile: str, frame_s: float,
+                      max_velocity: float = DEFAULT_MAX_VELOCITY_DEG_S,
+                      max_accel: float = DEFAULT_MAX_ACCEL_DEG_S2) -> List[float]:
+    """
+    Ângulos por frame PWM de um deslocamento com o perfil pedido.
+    
+    Args:
+        from_angle: Ângulo inicial
+        to_angle: Ângulo final
+        profile: "trapezoid" ou "scurve"
+        frame_s: Período do frame PWM em segundos
+        max_velocity: Velocidade máxima (graus/segundo)
+        max_accel: Aceleração máxima (graus/segundo²)
+    """
+    return Trajectory(from_angle, to_angle, max_velocity, max_accel, profile).sample(frame_s)
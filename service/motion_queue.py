@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fila de comandos de movimento com política "o mais recente vence".
+Uma thread atuadora dedicada aplica os alvos de ângulo no ritmo do frame PWM;
+alvos que chegam antes do próximo frame substituem o pendente (coalescência).
+"""
+
+import threading
+import time
+from typing import Optional
+
+from journal import SOURCE_MOTION
+
+
+class MotionQueue:
+    """
+    Pipeline de comandos SET_ANGLE com uma thread atuadora.
+    Quem chama submit() retorna imediatamente, sem esperar o servo se posicionar.
+    """
+    
+    def __init__(self, servo, frame_period_s: Optional[float] = None, logger=None):
+        """
+        Inicializa a fila.
+        
+        Args:
+            servo: Instância de ServoControl
+            frame_period_s: Intervalo mínimo entre aplicações (padrão: 1 frame PWM)
+            logger: Instância do logger (opcional)
+        """
+        self.servo = servo
+        self.frame_period_s = frame_period_s or 1.0 / servo.frequency
+        self.logger = logger
+        self.cond = threading.Condition()
+        self.pending = None
+        self.running = False
+        self.thread = None
+        
+        # Contadores
+        self.received = 0
+        self.coalesced = 0
+        self.cleared = 0
+        self.applied = 0
+        self.errors = 0
+    
+    def start(self):
+        """Inicia a thread atuadora"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, name='motion-actuator', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Para a thread atuadora (alvo pendente é descartado)"""
+        with self.cond:
+            self.running = False
+            self.pending = None
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+    
+    def submit(self, angle: float):
+        """
+        Enfileira um alvo de ângulo. Se já houver um alvo pendente, ele é
+        substituído e contado como coalescido.
+        
+        Args:
+            angle: Ângulo desejado (0-180°)
+        """
+        with self.cond:
+            self.received += 1
+            if self.pending is not None:
+                self.coalesced += 1
+            self.pending = angle
+            self.cond.notify()
+    
+    def clear(self) -> bool:
+        """
+        Descarta o alvo pendente (POST /stop): um ângulo enfileirado antes da
+        parada não é aplicado depois dela. A thread atuadora continua ativa.
+        
+        Returns:
+            True se havia um alvo pendente
+        """
+        with self.cond:
+            if self.pending is None:
+                return False
+            self.pending = None
+            self.cleared += 1
+            return True
+    
+    def stats(self) -> dict:
+        """
+        Retorna os contadores da fila.
+        
+        Returns:
+            Dicionário com received, coalesced, cleared, applied, errors e pending
+        """
+        with self.cond:
+            return {
+                'received': self.received,
+                'coalesced': self.coalesced,
+                'cleared': self.cleared,
+                'applied': self.applied,
+                'errors': self.errors,
+                'pending': self.pending
+            }
+    
+    def _run(self):
+        """Loop da thread atuadora"""
+        next_frame = 0.0
+        while True:
+            with self.cond:
+                while self.running and self.pending is None:
+                    self.cond.wait()
+                
+                # Aguarda o próximo frame; novos alvos substituem o pendente
+                now = time.monotonic()
+                while self.running and now < next_frame:
+                    self.cond.wait(next_frame - now)
+                    now = time.monotonic()
+                
+                if not self.running:
+                    return
+                
+                # clear() (POST /stop) pode ter descartado o alvo durante a espera
+                if self.pending is None:
+                    continue
+                
+                angle = self.pending
+                self.pending = None
+            
+            try:
+                ok = self.servo.set_angle(angle, settle=False, source=SOURCE_MOTION)
+            except Exception as e:
+                ok = False
+                if self.logger:
+                    self.logger.error(f"Erro na thread atuadora: {e}", exc_info=True)
+            
+            with self.cond:
+                if ok:
+                    self.applied += 1
+                else:
+                    self.errors += 1
+            
+            next_frame = time.monotonic() + self.frame_period_s
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de respostas pré-serializadas para as rotas de leitura mais consultadas
+(GET /, /ping, /status, /angle). O corpo JSON de cada rota é gerado uma vez
+por versão do estado do servo e reutilizado até o estado mudar; o ETag
+permite responder 304 sem montar corpo algum.
+"""
+
+import json
+import os
+from typing import Callable, Optional
+
+# Identifica esta execução do serviço: o contador de versão recomeça a cada
+# inicialização e um ETag antigo não pode coincidir com o novo estado
+BOOT_ID = os.urandom(4).hex()
+
+
+class CachedResponse:
+    """Corpo serializado e ETag de uma rota em uma versão do estado"""
+    
+    __slots__ = ('version', 'etag', 'body')
+    
+    def __init__(self, version: int, etag: str, body: bytes):
+        self.version = version
+        self.etag = etag
+        self.body = body
+
+
+class ResponseCache:
+    """
+    Respostas por rota, válidas enquanto a versão do estado não muda.
+    Sem lock: a entrada é trocada por atribuição e, em uma corrida, o corpo
+    é apenas serializado duas vezes (os contadores são aproximados).
+    """
+    
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+    
+    @staticmethod
+    def etag(route: str, version: int) -> str:
+        """ETag da rota em uma versão (calculado sem montar o corpo)"""
+        return f'"{BOOT_ID}-{route.strip("/") or "root"}-{version}"'
+    
+    def get(self, route: str, version: int, build: Callable[[], dict]) -> CachedResponse:
+        """
+        Resposta da rota para a versão informada, serializada só se necessário.
+        
+        Args:
+            route: Chave da rota (ex.: "/status")
+            version: Versão atual do estado do servo
+            build: Função que monta o dicionário da resposta
+        """
+        entry = self.entries.get(route)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+        
+        body = json.dumps(build()).encode('utf-8')
+        entry = CachedResponse(version, self.etag(route, version), body)
+        self.entries[route] = entry
+        self.misses += 1
+        return entry
+    
+    def stats(self) -> dict:
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Verifica o cabeçalho If-None-Match (lista de ETags, "*" ou W/"...")"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag or candidate == '*':
+            return True
+    return False
+
@@ -8,7 +8,15 @@ Usa pigpio para PWM estável sem jitter/flickering.
 
 import threading
 import time
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
+
+import metrics
+from calibration import PulseTable, compile_table, linear_table
+from journal import (SOURCE_API, SOURCE_CALIBRATION, SOURCE_INIT, SOURCE_STOP, SOURCE_SWEEP,
+                     SOURCE_WAVE_SWEEP)
+from motion_profile import (DEFAULT_MAX_ACCEL_DEG_S2, DEFAULT_MAX_VELOCITY_DEG_S, PROFILE_STEP,
+                            trajectory_angles)
+from sweep_engine import WaveSweep, run_deadline_sweep
 
 try:
     import pigpio
@@ -16,7 +24,7 @@ try:
 except (ImportError, RuntimeError):
     # Permite importar o módulo mesmo fora da Raspberry Pi (para testes)
     PIGPIO_AVAILABLE = False
-    print("AVISO: pigpio não disponível. Modo simulação ativado.")
+    print("AVISO: pigpio não disponível. Use servo.backend: simulated para simular o servo.")
 
 
 class ServoControl:
@@ -25,8 +33,17 @@ class ServoControl:
     Usa BCM numbering para os pinos GPIO.
     """
     
+    # Tempo para o servo se posicionar após cada movimento (segundos)
+    SETTLE_S = 0.1
+    
     def __init__(self, pin: int, frequency: int = 50, min_duty: float = 2.5, 
-                 max_duty: float = 12.5, logger=None):
+                 max_duty: float = 12.5, logger=None, sweep_engine: str = "auto",
+                 backend: str = "pigpio", simulation: Optional[dict] = None,
+                 servo_id: Optional[str] = None, calibration_points: Optional[list] = None,
+                 journal=None, journal_index: int = 0,
+                 max_velocity_deg_s: float = DEFAULT_MAX_VELOCITY_DEG_S,
+                 max_accel_deg_s2: float = DEFAULT_MAX_ACCEL_DEG_S2,
+                 initial_angle: Optional[float] = None):
         """
         Inicializa o controle do servo usando pigpio.
         
@@ -36,47 +53,141 @@ class ServoControl:
             min_duty: Duty cycle mínimo em % (ângulo 0°)
             max_duty: Duty cycle máximo em % (ângulo 180°)
             logger: Instância do logger (opcional)
+            sweep_engine: Motor do sweep: "wave" (waveforms pigpio/DMA),
+                          "software" (deadlines em Python) ou "auto"
+            backend: "pigpio" (daemon pigpiod) ou "simulated" (sim_pigpio, para
+                     benchmarks e testes fora da Raspberry Pi)
+            simulation: Parâmetros do backend simulado (rtt_s, slew_deg_s)
+            servo_id: Identificador do servo no arquivo de calibração (padrão: "gpio<pin>")
+            calibration_points: Curva [[ângulo, pulsewidth_us], ...] medida para este servo;
+                                sem ela, usa o mapeamento linear de min_duty/max_duty
+            journal: ActuationJournal que registra cada movimento e parada (opcional)
+            journal_index: Índice do servo nos registros do journal (posição no grupo)
+            max_velocity_deg_s: Velocidade máxima dos perfis trapezoid/scurve (graus/s)
+            max_accel_deg_s2: Aceleração máxima dos perfis trapezoid/scurve (graus/s²)
+            initial_angle: Última posição conhecida (journal); se informada, a
+                           inicialização só mantém o servo nela, sem o homing em 90°
         """
         self.pin = pin
         self.frequency = frequency
         self.min_duty = min_duty
         self.max_duty = max_duty
         self.logger = logger
+        self.sweep_engine = sweep_engine
+        self.backend = backend
+        self.servo_id = servo_id or f"gpio{pin}"
+        self.journal = journal
+        self.journal_index = journal_index
+        self.max_velocity_deg_s = max_velocity_deg_s
+        self.max_accel_deg_s2 = max_accel_deg_s2
+        self.calibrating = False  # Sessão de calibração guiada em andamento
         self.current_angle = 90  # Posição inicial padrão
         self.pi = None  # Conexão pigpio
         self.is_initialized = False
+        self.wave_active = False  # Sweep por waveform transmitindo no pino
+        self.wave_sweep = None  # (WaveSweep, ângulos) em transmissão; parado direto por stop_sweep
         self.sweep_thread = None
-        self.stop_sweep_event = threading.Event()
+        self.stop_sweep_event = threading.Event()  # Um por sweep: o anterior continua sinalizado
+        
+        # Pedidos de parada: instante do último (STOP_LATENCY) e geração que
+        # interrompe o assentamento de set_angle (stop_signal é compartilhado
+        # pelos servos de um ServoGroup)
+        self.stop_requested_ns = 0
+        self.stop_generation = 0
+        self.stop_signal = threading.Condition()
         self.lock = threading.Lock()  # Lock para operações thread-safe
         
-        if PIGPIO_AVAILABLE:
+        # Versão do estado: incrementada a cada mudança de ângulo, sweep,
+        # inicialização ou progresso de job (chave do cache de respostas,
+        # ETags e notificações)
+        self.state_version = 0
+        self.state_changed = threading.Condition()
+        self.state_listeners = []  # Callbacks (versão) chamados a cada mudança
+        self.sweep_running = False
+        
+        # Instrumentação de temporização (timing_trace.TimingTrace); None: desligada
+        self.trace = None
+        
+        # Tabela ângulo → pulsewidth (0.1°), compilada antes do primeiro movimento
+        self.linear_table = linear_table(frequency, min_duty, max_duty)
+        self.pulse_table = self.linear_table
+        if calibration_points:
+            try:
+                self.pulse_table = compile_table(calibration_points)
+            except ValueError as e:
+                self._log_warning(f"Curva de calibração inválida ({e}). Usando mapeamento linear.")
+        
+        self.simulation = simulation
+        self.initialize(initial_angle)
+    
+    def initialize(self, initial_angle: Optional[float] = None, log_errors: bool = True) -> bool:
+        """
+        Conecta ao pigpio e posiciona o servo. Pode ser chamado de novo
+        enquanto o servo não estiver inicializado (pigpiod ainda subindo).
+        
+        Args:
+            initial_angle: Última posição conhecida: o pulso dela é aplicado sem
+                           assentamento (o servo não se move); None faz o homing em 90°
+            log_errors: Se False, falhas de conexão não são registradas (tentativas repetidas)
+        
+        Returns:
+            True se o servo ficou inicializado
+        """
+        if self.is_initialized:
+            return True
+        backend = self.backend
+        
+        # Seleciona o backend: daemon pigpiod real ou simulação com a mesma API
+        gpio = None
+        if backend == "simulated":
+            import sim_pigpio as gpio
+        elif PIGPIO_AVAILABLE:
+            gpio = pigpio
+        
+        if gpio:
             try:
                 # Conecta ao daemon pigpiod
-                self.pi = pigpio.pi()
+                if backend == "simulated":
+                    self.pi = gpio.pi(**(self.simulation or {}))
+                else:
+                    self.pi = gpio.pi()
                 
                 if not self.pi.connected:
                     raise RuntimeError("Não foi possível conectar ao pigpiod. Certifique-se que o daemon está rodando.")
                 
                 # Configura o pino como saída PWM
-                self.pi.set_mode(self.pin, pigpio.OUTPUT)
+                self.pi.set_mode(self.pin, gpio.OUTPUT)
                 
                 # Define a frequência PWM
                 self.pi.set_PWM_frequency(self.pin, self.frequency)
                 
-                # Move para posição inicial (90°)
-                self.set_angle(90)
-                
                 self.is_initialized = True
-                self._log_info(f"Servo inicializado no pino GPIO {self.pin} (BCM) via pigpio")
+                if initial_angle is None:
+                    # Move para posição inicial (90°)
+                    self.set_angle(90, source=SOURCE_INIT)
+                else:
+                    # Servo já parado na última posição: só mantém o pulso
+                    self.set_angle(initial_angle, settle=False, source=SOURCE_INIT)
+                self.bump_state()
+                
+                self._log_info(f"Servo inicializado no pino GPIO {self.pin} (BCM) via {backend}"
+                               + ("" if initial_angle is None else f" na última posição ({initial_angle}°, sem homing)"))
                 
             except Exception as e:
-                self._log_error(f"Erro ao inicializar pigpio: {e}", exc_info=True)
+                if log_errors:
+                    metrics.PIGPIO_ERRORS.labels('init').inc()
+                    self._log_error(f"Erro ao inicializar pigpio: {e}", exc_info=True)
                 self.is_initialized = False
                 if self.pi:
                     self.pi.stop()
                     self.pi = None
-        else:
-            self._log_warning("pigpio não disponível. Servo em modo simulação.")
+        elif log_errors:
+            self._log_warning("pigpio não disponível. Servo não inicializado (backend simulado: servo.backend = simulated).")
+        return self.is_initialized
+    
+    def backend_available(self) -> bool:
+        """False se o módulo do backend não pôde ser importado (novas tentativas não adiantam)"""
+        return self.backend == "simulated" or PIGPIO_AVAILABLE
     
     def _log_info(self, message: str):
         """Helper para log de info"""
@@ -99,10 +210,43 @@ class ServoControl:
         else:
             print(f"ERROR: {message}")
     
+    def bump_state(self):
+        """Registra uma mudança no estado visível do servo e acorda quem espera"""
+        with self.state_changed:
+            self.state_version += 1
+            version = self.state_version
+            self.state_changed.notify_all()
+        for listener in self.state_listeners:
+            listener(version)
+    
+    def wait_for_change(self, since: int, timeout: float) -> int:
+        """
+        Bloqueia até a versão do estado ser diferente de since.
+        
+        Args:
+            since: Última versão conhecida pelo cliente
+            timeout: Espera máxima em segundos
+            
+        Returns:
+            Versão atual (igual a since se o tempo esgotou sem mudanças)
+        """
+        with self.state_changed:
+            self.state_changed.wait_for(lambda: self.state_version != since, timeout)
+            return self.state_version
+    
+    def add_state_listener(self, listener: Callable[[int], None]):
+        """Registra um callback chamado (na thread que mudou o estado) a cada nova versão"""
+        self.state_listeners = self.state_listeners + [listener]
+    
+    def remove_state_listener(self, listener: Callable[[int], None]):
+        self.state_listeners = [l for l in self.state_listeners if l is not listener]
+    
     def angle_to_pulsewidth(self, angle: float) -> int:
         """
         Converte ângulo (0-180°) para pulsewidth em microsegundos.
         pigpio usa pulsewidth (500-2500us) ao invés de duty cycle.
+        A conversão é um índice na tabela pré-calculada (resolução de 0.1°),
+        linear por duty cycle ou pela curva de calibração do servo.
         
         Args:
             angle: Ângulo entre 0 e 180 graus
@@ -110,27 +254,86 @@ class ServoControl:
         Returns:
             Pulsewidth correspondente em microsegundos (us)
         """
-        # Garante que o ângulo está no range válido
-        angle = max(0, min(180, angle))
+        return self.pulse_table.lookup(angle)
+    
+    def set_pulse_table(self, table: Optional[PulseTable]):
+        """
+        Troca a tabela de conversão (None volta ao mapeamento linear).
+        A troca é uma atribuição: movimentos em andamento não são interrompidos.
+        """
+        self.pulse_table = table or self.linear_table
+        self._log_info(f"Tabela de pulsewidth: {self.pulse_table.source}")
+    
+    def set_duty_range(self, min_duty: float, max_duty: float):
+        """
+        Recompila o mapeamento linear (recarga do config.yaml). Com curva de
+        calibração ativa, ela continua em uso. Como em set_pulse_table, a troca
+        é uma atribuição: o servo não se move até o próximo comando.
+        """
+        table = linear_table(self.frequency, min_duty, max_duty)
+        uses_linear = self.pulse_table is self.linear_table
+        self.min_duty = min_duty
+        self.max_duty = max_duty
+        self.linear_table = table
+        if uses_linear:
+            self.pulse_table = table
+        self._log_info(f"Duty cycle {min_duty}%-{max_duty}% "
+                       f"({'em uso' if uses_linear else 'curva de calibração mantida'})")
+    
+    def set_motion_limits(self, max_velocity_deg_s: float, max_accel_deg_s2: float):
+        """Troca os limites dos perfis trapezoid/scurve (vale a partir do próximo movimento)"""
+        self.max_velocity_deg_s = max_velocity_deg_s
+        self.max_accel_deg_s2 = max_accel_deg_s2
+        self._log_info(f"Limites de movimento: {max_velocity_deg_s}°/s, {max_accel_deg_s2}°/s²")
+    
+    def set_pulsewidth(self, pulsewidth: int) -> bool:
+        """
+        Aplica um pulsewidth bruto, sem conversão de ângulo (calibração guiada).
         
-        # Conversão de duty cycle (%) para pulsewidth (us)
-        # Para 50Hz (20ms período):
-        # min_duty (2.5%) = 500us
-        # max_duty (12.5%) = 2500us
-        periodo_us = 1000000 / self.frequency  # 20000us para 50Hz
-        min_pw = (self.min_duty / 100.0) * periodo_us
-        max_pw = (self.max_duty / 100.0) * periodo_us
+        Args:
+            pulsewidth: Pulsewidth em microsegundos (500-2500)
+            
+        Returns:
+            True se bem-sucedido, False caso contrário
+        """
+        if not self.is_initialized or not self.pi:
+            self._log_error("Servo não inicializado. Não é possível mover.")
+            return False
         
-        # Interpolação linear entre min_pw e max_pw
-        pulsewidth = int(min_pw + (angle / 180.0) * (max_pw - min_pw))
-        return pulsewidth
+        trace = self.trace
+        requested_ns = time.monotonic_ns() if trace else 0
+        with self.lock:
+            if self.wave_active:
+                self._log_warning("Sweep por hardware em andamento. Use /stop antes de mover.")
+                return False
+            try:
+                if trace:
+                    locked_ns = time.monotonic_ns()
+                self.pi.set_servo_pulsewidth(self.pin, int(pulsewidth))
+                if trace:
+                    end_ns = time.monotonic_ns()
+                    trace.record(SOURCE_CALIBRATION, self.journal_index, requested_ns, locked_ns, locked_ns, end_ns)
+                if self.journal:
+                    self.journal.append(SOURCE_CALIBRATION, None, int(pulsewidth), servo=self.journal_index)
+            except Exception as e:
+                metrics.PIGPIO_ERRORS.labels('set_servo_pulsewidth').inc()
+                self._log_error(f"Erro ao aplicar pulsewidth: {e}", exc_info=True)
+                return False
+        
+        self._log_info(f"Pulsewidth bruto aplicado: {pulsewidth}us")
+        return True
     
-    def set_angle(self, angle: float) -> bool:
+    def set_angle(self, angle: float, settle: bool = True, source: int = SOURCE_API,
+                  deadline_ns: Optional[int] = None) -> bool:
         """
         Move o servo para o ângulo especificado usando pigpio.
         
         Args:
             angle: Ângulo desejado (0-180°)
+            settle: Se True, aguarda 100ms para o servo se posicionar
+            source: Origem do comando no journal de atuação (journal.SOURCE_*)
+            deadline_ns: Horário programado do pulso (monotonic_ns) em passos com
+                         deadline; referência do atraso na instrumentação
             
         Returns:
             True se bem-sucedido, False caso contrário
@@ -138,32 +341,98 @@ class ServoControl:
         if not self.is_initialized:
             self._log_error("Servo não inicializado. Não é possível mover.")
             return False
+        if self.calibrating:
+            self._log_warning("Calibração guiada em andamento. Movimento ignorado.")
+            return False
         
+        trace = self.trace
+        requested_ns = (deadline_ns or time.monotonic_ns()) if trace else 0
+        start = time.perf_counter()
         with self.lock:
+            locked_ns = time.monotonic_ns() if trace else 0
+            metrics.LOCK_WAIT.observe(time.perf_counter() - start)
             try:
                 # Garante que o ângulo está no range válido
                 angle = max(0, min(180, angle))
                 
-                # Calcula o pulsewidth correspondente
-                pulsewidth = self.angle_to_pulsewidth(angle)
-                
-                # Aplica o PWM via pigpio (PWM via hardware - sem jitter)
-                if self.pi:
-                    self.pi.set_servo_pulsewidth(self.pin, pulsewidth)
-                    self.current_angle = angle
-                    self._log_info(f"Servo movido para {angle}° (pulsewidth: {pulsewidth}us)")
-                    
-                    # Pequeno delay para o servo se posicionar
-                    time.sleep(0.1)
-                    
-                    return True
-                else:
-                    self._log_error("pigpio não conectado")
+                pulsewidth = self.apply_angle_locked(angle, source, requested_ns, locked_ns)
+                if pulsewidth is None:
                     return False
+                
+                # Pequeno delay para o servo se posicionar (interrompido por stop_sweep)
+                if settle:
+                    self._settle()
                     
             except Exception as e:
+                metrics.PIGPIO_ERRORS.labels('set_servo_pulsewidth').inc()
                 self._log_error(f"Erro ao mover servo: {e}", exc_info=True)
                 return False
+        
+        metrics.SET_ANGLE_DURATION.observe(time.perf_counter() - start)
+        
+        # Log fora do lock: a escrita não atrasa o próximo comando
+        self._log_info(f"Servo movido para {angle}° (pulsewidth: {pulsewidth}us)")
+        return True
+    
+    def _settle(self):
+        """Aguarda SETTLE_S ou até o próximo pedido de parada"""
+        self.settle_any([self])
+    
+    @classmethod
+    def settle_any(cls, servos: List['ServoControl']):
+        """
+        Aguarda SETTLE_S ou até o próximo pedido de parada de qualquer um dos
+        servos (que devem compartilhar stop_signal).
+        """
+        generations = [servo.stop_generation for servo in servos]
+        with servos[0].stop_signal:
+            servos[0].stop_signal.wait_for(
+                lambda: [servo.stop_generation for servo in servos] != generations, cls.SETTLE_S)
+    
+    def apply_angle_locked(self, angle: float, source: int = SOURCE_API,
+                           requested_ns: int = 0, locked_ns: int = 0) -> Optional[int]:
+        """
+        Aplica o pulso de um ângulo já limitado a 0-180°, sem assentamento.
+        Deve ser chamado com self.lock adquirido (set_angle e ServoGroup).
+        
+        Args:
+            angle: Ângulo (0-180°)
+            source: Origem no journal de atuação
+            requested_ns: Horário pedido (instrumentação; 0: a própria chamada)
+            locked_ns: Instante em que o lock foi adquirido (instrumentação)
+        
+        Returns:
+            Pulsewidth aplicado, ou None se o servo não pode mover agora
+            
+        Raises:
+            Exception: Erro do pigpio
+        """
+        if self.wave_active:
+            self._log_warning("Sweep por hardware em andamento. Use /stop antes de mover.")
+            return None
+        
+        # Aplica o PWM via pigpio (PWM via hardware - sem jitter)
+        if not self.pi:
+            self._log_error("pigpio não conectado")
+            return None
+        
+        pulsewidth = self.angle_to_pulsewidth(angle)
+        trace = self.trace
+        if trace:
+            start_ns = time.monotonic_ns()
+            self.pi.set_servo_pulsewidth(self.pin, pulsewidth)
+            trace.record(source, self.journal_index, requested_ns or start_ns, locked_ns or start_ns,
+                         start_ns, time.monotonic_ns())
+        else:
+            self.pi.set_servo_pulsewidth(self.pin, pulsewidth)
+        if self.journal:
+            self.journal.append(source, angle, pulsewidth, servo=self.journal_index)
+        changed = angle != self.current_angle
+        self.current_angle = angle
+        if changed:
+            # Notifica já com o pulso aplicado (antes do assentamento)
+            self.bump_state()
+        return pulsewidth
     
     def get_angle(self) -> float:
         """
@@ -174,81 +443,304 @@ class ServoControl:
         """
         return self.current_angle
     
-    def sweep(self, from_angle: float, to_angle: float, delay_s: float = 0.5, 
-              step: float = 10.0, stop_event: Optional[threading.Event] = None):
+    @staticmethod
+    def sweep_angles(from_angle: float, to_angle: float, step: float = 10.0) -> List[float]:
+        """
+        Calcula a sequência de ângulos de um sweep.
+        
+        Args:
+            from_angle: Ângulo inicial
+            to_angle: Ângulo final
+            step: Tamanho do passo em graus (positivo)
+            
+        Returns:
+            Lista de ângulos, sempre terminando exatamente em to_angle
+        """
+        angles = []
+        current = from_angle
+        if from_angle < to_angle:
+            # Sweep crescente
+            while current <= to_angle:
+                angles.append(current)
+                current += step
+        else:
+            # Sweep decrescente
+            while current >= to_angle:
+                angles.append(current)
+                current -= step
+        
+        # Garante que termina exatamente no ângulo final
+        angles.append(to_angle)
+        return angles
+    
+    def sweep_plan(self, from_angle: float, to_angle: float, delay_s: float = 0.5,
+                   step: float = 10.0, profile: str = PROFILE_STEP) -> Tuple[List[float], float]:
+        """
+        Ângulos e período entre passos de um sweep.
+        
+        Args:
+            from_angle: Ângulo inicial
+            to_angle: Ângulo final
+            delay_s: Delay entre cada passo (perfil "step")
+            step: Tamanho do passo em graus (perfil "step")
+            profile: "step" (passos fixos) ou "trapezoid"/"scurve" (um ponto
+                     da trajetória por frame PWM, limitado por max_velocity_deg_s
+                     e max_accel_deg_s2)
+        
+        Returns:
+            Tupla (ângulos, período_entre_passos_s)
+        
+        Raises:
+            ValueError: Perfil desconhecido
+        """
+        if profile == PROFILE_STEP:
+            # Período entre passos: acomodação do servo + delay pedido
+            return self.sweep_angles(from_angle, to_angle, step), delay_s + self.SETTLE_S
+        frame_s = 1.0 / self.frequency
+        angles = trajectory_angles(from_angle, to_angle, profile, frame_s,
+                                   self.max_velocity_deg_s, self.max_accel_deg_s2)
+        return angles, frame_s
+    
+    def sweep(self, from_angle: Optional[float], to_angle: float, delay_s: float = 0.5, 
+              step: float = 10.0, stop_event: Optional[threading.Event] = None,
+              on_step: Optional[Callable[[int, int], None]] = None,
+              on_finish: Optional[Callable[[bool], None]] = None, profile: str = PROFILE_STEP):
         """
         Realiza um sweep (varredura) entre dois ângulos.
         Executa em thread separada para não bloquear.
         
         Args:
-            from_angle: Ângulo inicial
+            from_angle: Ângulo inicial; None parte de onde o movimento anterior parou
             to_angle: Ângulo final
-            delay_s: Delay entre cada passo em segundos
-            step: Tamanho do passo em graus
+            delay_s: Delay entre cada passo em segundos (perfil "step")
+            step: Tamanho do passo em graus (perfil "step")
             stop_event: Event para parar o sweep (opcional)
+            on_step: Callback (passo_atual, total_passos) após cada passo (opcional)
+            on_finish: Callback (concluído) ao fim do sweep; False se interrompido (opcional)
+            profile: Perfil de movimento (ver sweep_plan)
         """
         if not self.is_initialized:
             self._log_error("Servo não inicializado. Não é possível fazer sweep.")
+            if on_finish:
+                on_finish(False)
+            return
+        if self.calibrating:
+            self._log_warning("Calibração guiada em andamento. Sweep ignorado.")
+            if on_finish:
+                on_finish(False)
             return
         
-        # Para qualquer sweep em andamento
-        self.stop_sweep()
-        
-        # Reseta o evento de parada
-        self.stop_sweep_event.clear()
+        # Preempção do sweep em andamento: sinaliza a parada sem aguardar a
+        # thread (o novo worker espera o anterior antes do primeiro passo)
+        previous = self.sweep_thread
+        self.stop_sweep(wait=False)
         
-        # Event a ser usado (externo ou interno)
+        # Evento de parada deste sweep (externo ou interno)
+        self.stop_sweep_event = threading.Event()
         event_to_use = stop_event if stop_event else self.stop_sweep_event
+        angles, step_period_s = self.sweep_plan(self.current_angle if from_angle is None else from_angle,
+                                                to_angle, delay_s, step, profile)
         
         def sweep_worker():
             """Worker thread que executa o sweep"""
+            nonlocal angles, step_period_s
+            completed = False
             try:
-                self._log_info(f"Iniciando sweep de {from_angle}° até {to_angle}°")
+                if previous is not None:
+                    previous.join()
+                start_angle = from_angle
+                if start_angle is None:
+                    # Posição final do movimento anterior, já parado
+                    start_angle = self.current_angle
+                    angles, step_period_s = self.sweep_plan(start_angle, to_angle, delay_s, step, profile)
+                self._log_info(f"Iniciando sweep de {start_angle}° até {to_angle}° (perfil {profile})")
                 
-                # Determina a direção do sweep
-                if from_angle < to_angle:
-                    # Sweep crescente
-                    current = from_angle
-                    while current <= to_angle and not event_to_use.is_set():
-                        self.set_angle(current)
-                        time.sleep(delay_s)
-                        current += step
-                    
-                    # Garante que termina exatamente no ângulo final
-                    if not event_to_use.is_set():
-                        self.set_angle(to_angle)
+                if self._use_wave_engine():
+                    last = self._sweep_wave(angles, step_period_s, event_to_use, on_step)
                 else:
-                    # Sweep decrescente
-                    current = from_angle
-                    while current >= to_angle and not event_to_use.is_set():
-                        self.set_angle(current)
-                        time.sleep(delay_s)
-                        current -= step
-                    
-                    # Garante que termina exatamente no ângulo final
-                    if not event_to_use.is_set():
-                        self.set_angle(to_angle)
+                    last = self._sweep_software(angles, step_period_s, event_to_use, on_step)
                 
-                if event_to_use.is_set():
-                    self._log_info("Sweep interrompido")
-                else:
+                completed = last == len(angles) - 1 and not event_to_use.is_set()
+                if completed:
                     self._log_info("Sweep concluído")
+                else:
+                    # Parada registrada quando tem efeito, com a posição final
+                    if self.journal:
+                        angle = self.current_angle
+                        self.journal.append(SOURCE_STOP, angle, self.angle_to_pulsewidth(angle),
+                                            servo=self.journal_index)
+                    self._log_info("Sweep interrompido")
                     
             except Exception as e:
                 self._log_error(f"Erro durante sweep: {e}", exc_info=True)
+            finally:
+                # Fim do sweep visível antes da notificação (is_sweeping já é False)
+                if self.sweep_thread is threading.current_thread():
+                    self.sweep_running = False
+                self.bump_state()
+                if on_finish:
+                    on_finish(completed)
         
         # Inicia o sweep em thread separada
         self.sweep_thread = threading.Thread(target=sweep_worker, daemon=True)
+        self.sweep_running = True
         self.sweep_thread.start()
+        self.bump_state()
+    
+    def move(self, angle: float, profile: str,
+             on_finish: Optional[Callable[[bool], None]] = None) -> float:
+        """
+        Move até o ângulo com um perfil de movimento, em segundo plano
+        (executado como sweep a partir da posição atual; POST /stop interrompe).
+        
+        Args:
+            angle: Ângulo desejado (0-180°)
+            profile: Perfil de movimento ("trapezoid" ou "scurve")
+            on_finish: Callback (concluído) ao fim do movimento (opcional)
+        
+        Returns:
+            Duração prevista do movimento em segundos (sem o assentamento)
+        """
+        angle = max(0, min(180, angle))
+        # Sem aguardar o movimento anterior (chamado no loop do servidor
+        # asyncio): o worker parte de onde ele parou
+        angles, step_period_s = self.sweep_plan(self.current_angle, angle, profile=profile)
+        self.sweep(None, angle, profile=profile, on_finish=on_finish)
+        return (len(angles) - 1) * step_period_s
+    
+    def _use_wave_engine(self) -> bool:
+        """Verifica se o sweep deve ser temporizado por waveforms do pigpio"""
+        if self.sweep_engine == "software":
+            return False
+        return hasattr(self.pi, 'wave_chain')
+    
+    def _sweep_wave(self, angles: List[float], step_period_s: float, stop_event: threading.Event,
+                    on_step: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Executa o sweep como um encadeamento de waveforms (temporização por DMA).
+        Sweeps acima dos limites do pigpio (waves, tamanho do encadeamento) e
+        falhas ao montar as waves usam o fallback por software.
+        
+        Returns:
+            Índice do último passo executado
+        """
+        pulsewidths = [self.angle_to_pulsewidth(angle) for angle in angles]
+        program = WaveSweep(self.pi, self.pin, pulsewidths, step_period_s,
+                            self.SETTLE_S, self.frequency)
+        limit_error = program.limit_error()
+        if limit_error:
+            # Previsto antes de criar as waves: não é uma falha do pigpio
+            self._log_info(f"Sweep por software: {limit_error}")
+            return self._sweep_software(angles, step_period_s, stop_event, on_step)
+        
+        with self.lock:
+            try:
+                if not program.build(stop_event):
+                    # Parada pedida durante a montagem: nada foi transmitido
+                    program.release()
+                    return -1
+                program.start()
+                self.wave_sweep = (program, angles)
+                self.wave_active = True
+            except Exception as e:
+                metrics.PIGPIO_ERRORS.labels('wave').inc()
+                self._log_warning(f"Falha ao montar waveform ({e}). Usando sweep por software.")
+                program.release()
+        
+        if not self.wave_active:
+            return self._sweep_software(angles, step_period_s, stop_event, on_step)
+        
+        def journal_step(step: int, total: int):
+            # Passo registrado com o horário de início programado no DMA
+            if self.journal:
+                index = step - 1
+                started_ns = int((program.started_at + program.step_starts[index]) * 1e9)
+                self.journal.append(SOURCE_WAVE_SWEEP, angles[index], pulsewidths[index], started_ns,
+                                    servo=self.journal_index)
+            if on_step:
+                on_step(step, total)
+        
+        program.wait(stop_event, journal_step)
+        
+        with self.lock:
+            try:
+                # Já encerrado por stop_sweep, se a parada veio de outra thread
+                if self.wave_sweep is not None and self.wave_sweep[0] is program:
+                    self._end_wave_locked(stopped=stop_event.is_set())
+            finally:
+                program.release()
+        self.bump_state()
+        
+        return program.halted
     
-    def stop_sweep(self):
+    def _end_wave_locked(self, stopped: bool):
         """
-        Para qualquer sweep em andamento.
+        Para a transmissão do sweep por waveform e volta aos pulsos de servo,
+        mantendo a posição do passo em que parou. Chamado com self.lock.
+        
+        Args:
+            stopped: Encerrado por pedido de parada (registra STOP_LATENCY)
+        """
+        program, angles = self.wave_sweep
+        try:
+            program.halt()
+        finally:
+            last = program.halted
+            self.pi.set_servo_pulsewidth(self.pin, program.pulsewidths[last])
+            self.current_angle = max(0, min(180, angles[last]))
+            self.wave_active = False
+            self.wave_sweep = None
+        if stopped:
+            self._observe_stop('wave')
+    
+    def _sweep_software(self, angles: List[float], step_period_s: float, stop_event: threading.Event,
+                        on_step: Optional[Callable[[int, int], None]] = None) -> int:
+        """Sweep por deadlines em Python; a espera entre passos acorda com stop_event"""
+        last = run_deadline_sweep(
+            lambda angle, deadline_ns: self.set_angle(angle, settle=False, source=SOURCE_SWEEP,
+                                                      deadline_ns=deadline_ns),
+            angles, step_period_s, self.SETTLE_S, stop_event, on_step
+        )
+        if stop_event.is_set():
+            # Nenhum passo é aplicado depois do retorno
+            self._observe_stop('software')
+        return last
+    
+    def _observe_stop(self, engine: str):
+        """Registra o tempo do último pedido de parada até o movimento cessar"""
+        if self.stop_requested_ns:
+            metrics.STOP_LATENCY.labels(engine).observe((time.monotonic_ns() - self.stop_requested_ns) / 1e9)
+    
+    def stop_sweep(self, wait: bool = True):
         """
+        Para qualquer movimento em andamento, sem completar esperas: o sweep
+        por waveform é parado aqui mesmo (o DMA não inicia outro frame da
+        chain), o sweep por software acorda do intervalo entre passos e o
+        assentamento de set_angle é encerrado.
+        
+        Args:
+            wait: Se True, aguarda a thread do sweep terminar (até 2 segundos)
+        """
+        self.stop_requested_ns = time.monotonic_ns()
+        self.stop_sweep_event.set()
+        with self.stop_signal:
+            self.stop_generation += 1
+            self.stop_signal.notify_all()
+        
         if self.sweep_thread and self.sweep_thread.is_alive():
+            if self.wave_active:
+                with self.lock:
+                    try:
+                        if self.wave_sweep is not None:
+                            self._end_wave_locked(stopped=True)
+                    except Exception as e:
+                        # A thread do sweep tenta de novo ao acordar
+                        metrics.PIGPIO_ERRORS.labels('wave').inc()
+                        self._log_error(f"Erro ao parar waveform: {e}", exc_info=True)
+                self.bump_state()
             self._log_info("Parando sweep em andamento...")
-            self.stop_sweep_event.set()
-            self.sweep_thread.join(timeout=2.0)  # Aguarda até 2 segundos
+            if wait:
+                self.sweep_thread.join(timeout=2.0)  # Aguarda até 2 segundos
     
     def is_sweeping(self) -> bool:
         """
@@ -257,7 +749,7 @@ class ServoControl:
         Returns:
             True se há sweep ativo, False caso contrário
         """
-        return self.sweep_thread is not None and self.sweep_thread.is_alive()
+        return self.sweep_running and self.sweep_thread is not None and self.sweep_thread.is_alive()
     
     def cleanup(self):
         """
@@ -269,17 +761,20 @@ class ServoControl:
         # Para qualquer sweep em andamento
         self.stop_sweep()
         
-        if self.pi and PIGPIO_AVAILABLE:
+        if self.pi:
             try:
                 # Para o PWM no pino (define pulsewidth para 0)
                 self.pi.set_servo_pulsewidth(self.pin, 0)
                 # Fecha a conexão com pigpiod
                 self.pi.stop()
+                self.pi = None
                 self._log_info("pigpio desconectado com sucesso")
             except Exception as e:
+                metrics.PIGPIO_ERRORS.labels('cleanup').inc()
                 self._log_error(f"Erro ao limpar pigpio: {e}", exc_info=True)
         
         self.is_initialized = False
+        self.bump_state()
     
     def __del__(self):
         """Destrutor: garante limpeza dos recursos"""
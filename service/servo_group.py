@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grupo de servos (vários dispensadores na mesma aeronave), configurado pela
+lista "servos" do config.yaml. Cada servo é um ServoControl no seu pino; o
+primeiro da lista é o servo principal das rotas de um servo só (/angle,
+/sweep, missões, fila de movimento).
+
+Alvos simultâneos (POST /servos/angles) são aplicados em uma única passada:
+os locks de todos os servos envolvidos são adquiridos em ordem fixa, os
+pulsos são aplicados um após o outro (mesmo frame PWM de 20ms) e o
+assentamento de 100ms é esperado uma vez para o grupo inteiro (encerrado
+por um pedido de parada).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import metrics
+from journal import SOURCE_API
+from motion_profile import DEFAULT_MAX_ACCEL_DEG_S2, DEFAULT_MAX_VELOCITY_DEG_S
+from servo_control import ServoControl
+
+# Campos de cada item da lista "servos" que não herdam da seção "servo"
+OWN_FIELDS = ('id', 'pwm_pin')
+
+
+def servo_entries(config: dict) -> List[dict]:
+    """
+    Configuração de cada servo: itens de "servos" sobre os padrões da seção
+    "servo" (sem a lista: apenas a seção "servo").
+    
+    Raises:
+        ValueError: Lista inválida, ids ou pinos repetidos
+    """
+    defaults = dict(config.get('servo', {}))
+    items = config.get('servos')
+    if not items:
+        entry = dict(defaults)
+        entry.setdefault('pwm_pin', 4)
+        entry.setdefault('id', f"gpio{entry['pwm_pin']}")
+        return [entry]
+    if not isinstance(items, list):
+        raise ValueError('"servos" deve ser uma lista de {id, pwm_pin, ...}')
+    
+    for field in OWN_FIELDS:
+        defaults.pop(field, None)
+    entries = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or 'pwm_pin' not in item:
+            raise ValueError(f'servos[{index}]: "pwm_pin" obrigatório')
+        entry = dict(defaults, **item)
+        entry.setdefault('id', f"gpio{entry['pwm_pin']}")
+        entry['id'] = str(entry['id'])
+        entries.append(entry)
+    
+    for field in OWN_FIELDS:
+        values = [entry[field] for entry in entries]
+        if len(set(values)) != len(values):
+            raise ValueError(f'"servos": {field} repetido')
+    return entries
+
+
+class ServoGroup:
+    """Servos por id, em ordem de configuração (o primeiro é o principal)"""
+    
+    # Intervalo entre tentativas de conexão ao pigpiod na partida
+    RETRY_INTERVAL_S = 0.25
+    
+    def __init__(self, servos: 'OrderedDict[str, ServoControl]', journal=None, logger=None,
+                 initial_angles: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            servos: ServoControl por id (não vazio), com journal_index na mesma ordem
+            journal: ActuationJournal compartilhado (opcional)
+            logger: Instância do logger (opcional)
+            initial_angles: Última posição de cada servo na partida (retry_initialize)
+        """
+        self.servos = servos
+        self.logger = logger
+        self.initial_angles = initial_angles or {}
+        # Uma parada em qualquer servo encerra o assentamento do grupo
+        stop_signal = threading.Condition()
+        for servo in servos.values():
+            servo.stop_signal = stop_signal
+        if journal:
+            journal.servo_names = list(servos)
+    
+    @classmethod
+    def from_config(cls, config: dict, curves: Optional[dict] = None, journal=None, logger=None,
+                    restore_position: bool = False) -> 'ServoGroup':
+        """
+        Cria e inicializa os servos da configuração.
+        
+        Args:
+            config: Configuração completa (seções "servo" e "servos")
+            curves: Curvas de calibração por id de servo
+            journal: ActuationJournal compartilhado (opcional)
+            logger: Instância do logger (opcional)
+            restore_position: Parte da última posição registrada no journal,
+                              sem o homing em 90° (servos sem registro fazem o homing)
+        """
+        curves = curves or {}
+        servos = OrderedDict()
+        initial_angles = {}
+        for index, entry in enumerate(servo_entries(config)):
+            if restore_position and journal:
+                initial_angles[entry['id']] = journal.last_angle(index)
+            servos[entry['id']] = ServoControl(
+                pin=entry['pwm_pin'],
+                frequency=entry.get('frequency', 50),
+                min_duty=entry.get('min_duty', 2.5),
+                max_duty=entry.get('max_duty', 12.5),
+                logger=logger,
+                sweep_engine=entry.get('sweep_engine', 'auto'),
+                backend=entry.get('backend', 'pigpio'),
+                simulation=entry.get('simulation'),
+                servo_id=entry['id'],
+                calibration_points=curves.get(entry['id']),
+                journal=journal,
+                journal_index=index,
+                max_velocity_deg_s=entry.get('max_velocity_deg_s', DEFAULT_MAX_VELOCITY_DEG_S),
+                max_accel_deg_s2=entry.get('max_accel_deg_s2', DEFAULT_MAX_ACCEL_DEG_S2),
+                initial_angle=initial_angles.get(entry['id'])
+            )
+        return cls(servos, journal=journal, logger=logger, initial_angles=initial_angles)
+    
+    @property
+    def primary(self) -> ServoControl:
+        return next(iter(self.servos.values()))
+    
+    def __len__(self):
+        return len(self.servos)
+    
+    def get(self, servo_id: str) -> Optional[ServoControl]:
+        return self.servos.get(servo_id)
+    
+    def status(self) -> List[dict]:
+        return [{
+            'id': servo_id,
+            'gpio_pin': servo.pin,
+            'initialized': servo.is_initialized,
+            'angle': servo.get_angle(),
+            'is_sweeping': servo.is_sweeping(),
+            'calibration': servo.pulse_table.source,
+        } for servo_id, servo in self.servos.items()]
+    
+    def set_angles(self, targets: Dict[str, float], settle: bool = True,
+                   source: int = SOURCE_API) -> Dict[str, bool]:
+        """
+        Aplica vários alvos na mesma passada.
+        
+        Args:
+            targets: Ângulo por id de servo (já validados em 0-180°)
+            settle: Se True, aguarda um único assentamento de 100ms para o grupo
+            source: Origem no journal de atuação
+        
+        Returns:
+            Resultado (True/False) por id de servo
+        
+        Raises:
+            ValueError: id desconhecido, servo não inicializado ou em calibração
+        """
+        # Ordem fixa de aquisição dos locks: duas chamadas concorrentes não se travam
+        order = sorted(targets)
+        for servo_id in order:
+            servo = self.servos.get(servo_id)
+            if servo is None:
+                raise ValueError(f"Servo desconhecido: {servo_id}")
+            if not servo.is_initialized:
+                raise ValueError(f"Servo {servo_id} não inicializado")
+            if servo.calibrating:
+                raise ValueError(f"Servo {servo_id} em calibração guiada")
+        
+        servos = [self.servos[servo_id] for servo_id in order]
+        results = {}
+        traced = any(servo.trace for servo in servos)
+        requested_ns = time.monotonic_ns() if traced else 0
+        start = time.perf_counter()
+        for servo in servos:
+            servo.lock.acquire()
+        try:
+            locked_ns = time.monotonic_ns() if traced else 0
+            metrics.LOCK_WAIT.observe(time.perf_counter() - start)
+            for servo_id, servo in zip(order, servos):
+                try:
+                    angle = max(0, min(180, targets[servo_id]))
+                    results[servo_id] = servo.apply_angle_locked(angle, source, requested_ns,
+                                                                 locked_ns) is not None
+                except Exception as e:
+                    metrics.PIGPIO_ERRORS.labels('set_servo_pulsewidth').inc()
+                    if self.logger:
+                        self.logger.error(f"Erro ao mover servo {servo_id}: {e}", exc_info=True)
+                    results[servo_id] = False
+            if settle:
+                # Interrompido por POST /stop (stop_sweep de qualquer servo do grupo)
+                ServoControl.settle_any(list(self.servos.values()))
+        finally:
+            for servo in reversed(servos):
+                servo.lock.release()
+        metrics.SET_ANGLE_DURATION.observe(time.perf_counter() - start)
+        
+        # Log fora dos locks
+        if self.logger:
+            moved = ', '.join(f"{servo_id}={targets[servo_id]}°" for servo_id in order)
+            self.logger.info(f"Servos movidos juntos: {moved}")
+        return results
+    
+    def retry_initialize(self, timeout_s: float) -> bool:
+        """
+        Tenta de novo inicializar os servos que falharam (pigpiod ainda
+        subindo na partida), até timeout_s. Sem o módulo pigpio, desiste na hora.
+        
+        Returns:
+            True se todos os servos ficaram inicializados
+        """
+        deadline = time.monotonic() + timeout_s
+        while True:
+            pending = [(servo_id, servo) for servo_id, servo in self.servos.items() if not servo.is_initialized]
+            if not pending:
+                return True
+            if not all(servo.backend_available() for _, servo in pending):
+                # Módulo pigpio ausente (já registrado na criação): esperar o daemon não resolve
+                return False
+            last_try = time.monotonic() >= deadline
+            for servo_id, servo in pending:
+                # Só a última tentativa registra o erro
+                servo.initialize(self.initial_angles.get(servo_id), log_errors=last_try)
+            if last_try:
+                return all(servo.is_initialized for servo in self.servos.values())
+            time.sleep(self.RETRY_INTERVAL_S)
+    
+    def cleanup(self):
+        for servo in self.servos.values():
+            servo.cleanup()
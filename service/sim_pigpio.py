@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backend pigpio simulado para benchmarks e testes fora da Raspberry Pi.
+Expõe a mesma API usada pelo ServoControl (pigpio.pi) e modela o custo de
+ida e volta ao daemon, a aplicação do pulso no próximo frame PWM e a
+velocidade de giro do servo. Cada chamada é registrada com timestamp.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+OUTPUT = 1
+INPUT = 0
+
+# Limites do pigpio para set_servo_pulsewidth
+MIN_PULSEWIDTH = 500
+MAX_PULSEWIDTH = 2500
+
+# Waves criadas ao mesmo tempo (PI_MAX_WAVES); IDs apagados são reutilizados
+MAX_WAVES = 250
+
+# Custo típico de um comando pelo socket do pigpiod no Pi Zero 2 W
+DEFAULT_RTT_S = 0.00015
+
+# Velocidade de giro típica de servo (0.1s / 60°)
+DEFAULT_SLEW_DEG_S = 600.0
+
+
+class error(Exception):
+    """Equivalente a pigpio.error"""
+    pass
+
+
+class pulse:
+    """Equivalente a pigpio.pulse"""
+    
+    def __init__(self, gpio_on: int, gpio_off: int, delay: int):
+        self.gpio_on = gpio_on
+        self.gpio_off = gpio_off
+        self.delay = delay
+
+
+def pulsewidth_to_angle(pulsewidth: int) -> float:
+    """Ângulo físico do servo simulado para um pulsewidth (500-2500us → 0-180°)"""
+    return (pulsewidth - MIN_PULSEWIDTH) * 180.0 / (MAX_PULSEWIDTH - MIN_PULSEWIDTH)
+
+
+class SimulatedServo:
+    """
+    Modelo físico de um servo: cada pulsewidth passa a valer no próximo frame
+    PWM e o eixo gira em direção ao alvo com velocidade limitada.
+    """
+    
+    def __init__(self, slew_deg_s: float):
+        self.slew_deg_s = slew_deg_s
+        self.position = None  # Posição desconhecida até o primeiro pulso
+        self.position_t = 0.0
+        self.target = None
+        self.pending = deque()  # (instante_de_aplicação, alvo ou None)
+    
+    def command(self, t_apply: float, pulsewidth: int):
+        target = pulsewidth_to_angle(pulsewidth) if pulsewidth else None
+        self.pending.append((t_apply, target))
+    
+    def position_at(self, t: float) -> Optional[float]:
+        """Avança o modelo até o instante t e retorna a posição do eixo"""
+        while self.pending and self.pending[0][0] <= t:
+            t_apply, target = self.pending.popleft()
+            self._advance(t_apply)
+            self.target = target
+            if self.position is None and target is not None:
+                # Primeiro pulso: assume que o eixo já está no alvo
+                self.position = target
+        self._advance(t)
+        return self.position
+    
+    def _advance(self, t: float):
+        if self.position is not None and self.target is not None and t > self.position_t:
+            max_step = self.slew_deg_s * (t - self.position_t)
+            delta = self.target - self.position
+            self.position += max(-max_step, min(max_step, delta))
+        self.position_t = max(self.position_t, t)
+
+
+class pi:
+    """
+    Substituto de pigpio.pi com temporização realista.
+    """
+    
+    def __init__(self, host: str = 'localhost', port: int = 8888, show_errors: bool = True,
+                 rtt_s: float = DEFAULT_RTT_S, slew_deg_s: float = DEFAULT_SLEW_DEG_S,
+                 max_records: int = 100000):
+        """
+        Inicializa a conexão simulada.
+        
+        Args:
+            host: Ignorado (compatibilidade com pigpio.pi)
+            port: Ignorado (compatibilidade com pigpio.pi)
+            show_errors: Ignorado (compatibilidade com pigpio.pi)
+            rtt_s: Custo de ida e volta de cada comando ao daemon, em segundos
+            slew_deg_s: Velocidade de giro do servo em graus/segundo
+            max_records: Máximo de chamadas mantidas no registro
+        """
+        self.connected = True
+        self.rtt_s = rtt_s
+        self.slew_deg_s = slew_deg_s
+        self.calls = deque(maxlen=max_records)
+        self.lock = threading.Lock()
+        self.start_t = time.monotonic()
+        self.modes = {}
+        self.frequencies = {}
+        self.pulsewidths = {}
+        self.servos = {}
+        self.waves = {}
+        self.staging = []
+        self.chain_started = None
+        self.chain_duration_s = 0.0
+        self.chain_segments = []  # (início_relativo_s, wave_id)
+    
+    # ------------------------------------------------------------------
+    # Infraestrutura da simulação
+    # ------------------------------------------------------------------
+    
+    def _call(self, name: str, *args):
+        """Registra a chamada e consome o tempo de ida e volta ao daemon"""
+        if not self.connected:
+            raise error("pigpio não conectado")
+        self.calls.append((time.monotonic_ns(), name, args))
+        if self.rtt_s > 0:
+            time.sleep(self.rtt_s)
+    
+    def _next_frame(self, pin: int, t: float) -> float:
+        """Instante do próximo início de frame PWM no pino"""
+        period = 1.0 / self.frequencies.get(pin, 50)
+        frames = math.ceil((t - self.start_t) / period)
+        return self.start_t + frames * period
+    
+    def _servo(self, pin: int) -> SimulatedServo:
+        if pin not in self.servos:
+            self.servos[pin] = SimulatedServo(self.slew_deg_s)
+        return self.servos[pin]
+    
+    def call_log(self) -> List[tuple]:
+        """
+        Retorna o registro de chamadas.
+        
+        Returns:
+            Lista de (timestamp_ns monotônico, nome, argumentos)
+        """
+        return list(self.calls)
+    
+    def servo_position(self, pin: int) -> Optional[float]:
+        """Posição física simulada do eixo do servo em graus (None se nunca recebeu pulso)"""
+        with self.lock:
+            return self._servo(pin).position_at(time.monotonic())
+    
+    # ------------------------------------------------------------------
+    # API pigpio.pi
+    # ------------------------------------------------------------------
+    
+    def stop(self):
+        self._call('stop')
+        self.connected = False
+    
+    def set_mode(self, gpio: int, mode: int) -> int:
+        self._call('set_mode', gpio, mode)
+        self.modes[gpio] = mode
+        return 0
+    
+    def get_mode(self, gpio: int) -> int:
+        self._call('get_mode', gpio)
+        return self.modes.get(gpio, INPUT)
+    
+    def set_PWM_frequency(self, user_gpio: int, frequency: int) -> int:
+        self._call('set_PWM_frequency', user_gpio, frequency)
+        self.frequencies[user_gpio] = frequency
+        return frequency
+    
+    def get_PWM_frequency(self, user_gpio: int) -> int:
+        self._call('get_PWM_frequency', user_gpio)
+        return self.frequencies.get(user_gpio, 50)
+    
+    def set_servo_pulsewidth(self, user_gpio: int, pulsewidth: int) -> int:
+        self._call('set_servo_pulsewidth', user_gpio, pulsewidth)
+        if pulsewidth != 0 and not MIN_PULSEWIDTH <= pulsewidth <= MAX_PULSEWIDTH:
+            raise error("GPIO_BAD_PULSEWIDTH")
+        with self.lock:
+            self.pulsewidths[user_gpio] = pulsewidth
+            self._servo(user_gpio).command(self._next_frame(user_gpio, time.monotonic()), pulsewidth)
+        return 0
+    
+    def get_servo_pulsewidth(self, user_gpio: int) -> int:
+        self._call('get_servo_pulsewidth', user_gpio)
+        pulsewidth = self.pulsewidths.get(user_gpio, 0)
+        if pulsewidth == 0:
+            raise error("GPIO_NOT_SERVO")
+        return pulsewidth
+    
+    def wave_add_new(self) -> int:
+        self._call('wave_add_new')
+        self.staging = []
+        return 0
+    
+    def wave_add_generic(self, pulses) -> int:
+        self._call('wave_add_generic', len(pulses))
+        self.staging.extend(pulses)
+        return len(self.staging)
+    
+    def wave_create(self) -> int:
+        self._call('wave_create')
+        # Como o pigpiod: o menor ID livre (wave_delete devolve o ID)
+        wave_id = next((i for i in range(MAX_WAVES) if i not in self.waves), None)
+        if wave_id is None:
+            raise error("NO_WAVEFORM_ID")
+        self.waves[wave_id] = [(p.gpio_on, p.gpio_off, p.delay) for p in self.staging]
+        self.staging = []
+        return wave_id
+    
+    def wave_delete(self, wave_id: int) -> int:
+        self._call('wave_delete', wave_id)
+        self.waves.pop(wave_id, None)
+        return 0
+    
+    def wave_chain(self, data) -> int:
+        self._call('wave_chain', len(data))
+        now = time.monotonic()
+        segments = []
+        offset_us = 0
+        for wave_id, repeat in self._expand_chain(list(data)):
+            segments.append((offset_us / 1000000.0, wave_id))
+            offset_us += sum(p[2] for p in self.waves[wave_id]) * repeat
+        
+        with self.lock:
+            self.chain_started = now
+            self.chain_duration_s = offset_us / 1000000.0
+            self.chain_segments = segments
+            # Cada segmento aplica o pulso de nível alto da wave aos servos afetados
+            for start_s, wave_id in segments:
+                for gpio_on, _, delay in self.waves[wave_id][:1]:
+                    for pin in range(32):
+                        if gpio_on & (1 << pin):
+                            self._servo(pin).command(now + start_s, delay)
+        return 0
+    
+    def wave_tx_busy(self) -> int:
+        self._call('wave_tx_busy')
+        if self.chain_started is None:
+            return 0
+        return int(time.monotonic() - self.chain_started < self.chain_duration_s)
+    
+    def wave_tx_at(self) -> int:
+        self._call('wave_tx_at')
+        if self.chain_started is None:
+            return 9999  # NO_TX_WAVE
+        elapsed = time.monotonic() - self.chain_started
+        if elapsed >= self.chain_duration_s:
+            return 9999
+        current = 9999
+        for start_s, wave_id in self.chain_segments:
+            if start_s > elapsed:
+                break
+            current = wave_id
+        return current
+    
+    def wave_tx_stop(self) -> int:
+        self._call('wave_tx_stop')
+        with self.lock:
+            now = time.monotonic()
+            for servo in self.servos.values():
+                # Descarta segmentos da chain ainda não transmitidos
+                servo.position_at(now)
+                servo.pending = deque(e for e in servo.pending if e[0] <= now)
+            self.chain_started = None
+        return 0
+    
+    @staticmethod
+    def _expand_chain(chain: List[int]) -> List[tuple]:
+        """Converte o buffer de wave_chain em (wave_id, repetições); suporta loops simples"""
+        result = []
+        i = 0
+        while i < len(chain):
+            if chain[i] == 255 and i + 6 < len(chain) and chain[i + 1] == 0 and chain[i + 3] == 255 \
+                    and chain[i + 4] == 1:
+                result.append((chain[i + 2], chain[i + 5] | (chain[i + 6] << 8)))
+                i += 7
+            else:
+                result.append((chain[i], 1))
+                i += 1
+        return result
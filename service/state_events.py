@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Notificação de mudanças no estado do servo (GET /events e GET /status?since=).
+O ServoControl incrementa state_version a cada mudança de ângulo, sweep ou
+inicialização; aqui essa versão vira um stream Server-Sent Events e um
+long-poll, nos dois motores do servidor:
+    - classic: a thread da conexão espera na Condition do ServoControl
+    - asyncio: um asyncio.Event por versão, disparado pelo listener do servo
+O módulo asyncio só é importado pelo motor asyncio (partida mais rápida do classic).
+"""
+
+import select
+from typing import Callable, Optional, Tuple
+
+# Comentário SSE enviado sem mudanças (mantém o AP e proxies com a conexão viva)
+HEARTBEAT = b': keepalive\n\n'
+
+# Intervalo padrão do heartbeat e espera máxima do long-poll (segundos)
+DEFAULT_HEARTBEAT_S = 15.0
+DEFAULT_LONGPOLL_MAX_S = 30.0
+
+# Conexões SSE simultâneas (cada uma ocupa uma thread no motor classic)
+DEFAULT_MAX_CLIENTS = 8
+
+
+def response_head() -> bytes:
+    """Cabeçalho HTTP do stream (sem Content-Length: termina ao fechar a conexão)"""
+    return (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: text/event-stream\r\n"
+        "Cache-Control: no-cache\r\n"
+        "Connection: close\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        "X-Accel-Buffering: no\r\n"
+        "\r\n"
+    ).encode('ascii')
+
+
+def format_event(version: int, body: bytes) -> bytes:
+    """Evento "state" com a versão como id (o navegador reenvia em Last-Event-ID)"""
+    return b'id: %d\nevent: state\ndata: %s\n\n' % (version, body)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def serve_blocking(sock, servo, snapshot: Callable[[], Tuple[int, bytes]],
+                   heartbeat_s: float = DEFAULT_HEARTBEAT_S, last_id: Optional[int] = None):
+    """
+    Atende um stream SSE na thread da conexão (motor classic).
+    
+    Args:
+        sock: Socket da conexão (cabeçalho já enviado)
+        servo: ServoControl (wait_for_change)
+        snapshot: Função que retorna (versão, corpo JSON do estado)
+        heartbeat_s: Intervalo do heartbeat sem mudanças
+        last_id: Última versão recebida pelo cliente (reconexão)
+    """
+    version = last_id
+    try:
+        while True:
+            current, body = snapshot()
+            if current != version:
+                sock.sendall(format_event(current, body))
+                version = current
+            if servo.wait_for_change(version, heartbeat_s) == version:
+                # Sem mudanças: heartbeat (detecta cliente que saiu)
+                readable, _, _ = select.select([sock], [], [], 0)
+                if readable and not sock.recv(1024):
+                    return
+                sock.sendall(HEARTBEAT)
+    except OSError:
+        # Cliente desconectou
+        return
+
+
+class AsyncStateNotifier:
+    """
+    Ponte entre as mudanças de estado (threads do servo) e o event loop.
+    Cada versão tem um asyncio.Event, disparado e trocado a cada mudança.
+    """
+    
+    def __init__(self, servo):
+        self.servo = servo
+        self.loop = None
+        self.event = None
+    
+    def attach(self, loop: 'asyncio.AbstractEventLoop'):
+        """Registra o listener no servo (chamado no event loop)"""
+        import asyncio
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.servo.add_state_listener(self._on_change)
+    
+    def detach(self):
+        self.servo.remove_state_listener(self._on_change)
+    
+    def _on_change(self, version: int):
+        try:
+            self.loop.call_soon_threadsafe(self._fire)
+        except RuntimeError:
+            # Event loop já encerrado
+            pass
+    
+    def _fire(self):
+        import asyncio
+        event, self.event = self.event, asyncio.Event()
+        event.set()
+    
+    async def wait(self, since: int, timeout: float) -> int:
+        """
+        Espera a versão do estado ser diferente de since (sem ocupar threads).
+        
+        Returns:
+            Versão atual (igual a since se o tempo esgotou)
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.servo.state_version == since:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self.event.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.servo.state_version
+
+
+async def serve_async(reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter',
+                      notifier: AsyncStateNotifier, snapshot: Callable[[], Tuple[int, bytes]],
+                      heartbeat_s: float = DEFAULT_HEARTBEAT_S, last_id: Optional[int] = None):
+    """Atende um stream SSE no event loop (motor asyncio)"""
+    import asyncio
+    # O cliente não envia nada depois da requisição: EOF = desconectou
+    closed = asyncio.ensure_future(reader.read(1024))
+    version = last_id
+    try:
+        while True:
+            current, body = snapshot()
+            if current != version:
+                writer.write(format_event(current, body))
+                await writer.drain()
+                version = current
+            
+            waiter = asyncio.ensure_future(notifier.wait(version, heartbeat_s))
+            await asyncio.wait({waiter, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                waiter.cancel()
+                return
+            if waiter.result() == version:
+                writer.write(HEARTBEAT)
+                await writer.drain()
+    except (ConnectionError, OSError):
+        return
+    finally:
+        closed.cancel()
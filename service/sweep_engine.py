@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de sweep temporizado por hardware.
+Compila o perfil inteiro do sweep em waveforms do pigpio encadeadas com
+wave_chain, de modo que o DMA temporiza cada passo sem trabalho em Python.
+"""
+
+import bisect
+import time
+from typing import Callable, List, Optional
+
+import metrics
+
+try:
+    from pigpio import pulse
+except (ImportError, RuntimeError):
+    class pulse:
+        """Equivalente mínimo de pigpio.pulse (fora da Raspberry Pi)"""
+        
+        def __init__(self, gpio_on: int, gpio_off: int, delay: int):
+            self.gpio_on = gpio_on
+            self.gpio_off = gpio_off
+            self.delay = delay
+
+
+# Comandos de wave_chain
+CHAIN_LOOP_START = (255, 0)
+CHAIN_LOOP_END = (255, 1)
+CHAIN_MAX_REPEAT = 65535
+
+# Limites do pigpio: waves criadas ao mesmo tempo (PI_MAX_WAVES), bytes do
+# buffer de wave_chain e ID de wave (um byte no encadeamento; 255 é o prefixo
+# dos comandos)
+MAX_WAVES = 250
+CHAIN_MAX_BYTES = 600
+MAX_WAVE_ID = 254
+
+
+def frame_pulses(pin: int, pulsewidth_us: int, period_us: int) -> List[pulse]:
+    """
+    Pulsos de um frame de servo: nível alto por pulsewidth_us e baixo no restante do período.
+    
+    Args:
+        pin: Pino GPIO (BCM)
+        pulsewidth_us: Largura do pulso em microsegundos
+        period_us: Período do frame PWM em microsegundos
+    
+    Returns:
+        Lista de pulsos para wave_add_generic
+    """
+    mask = 1 << pin
+    return [
+        pulse(mask, 0, pulsewidth_us),
+        pulse(0, mask, period_us - pulsewidth_us)
+    ]
+
+
+def frames_for(duration_s: float, period_us: int) -> int:
+    """Número de frames PWM (no mínimo 1) que cobre duration_s"""
+    return max(1, int(round(duration_s * 1000000 / period_us)))
+
+
+def build_chain(wave_ids: List[int], frames: List[int]) -> List[int]:
+    """
+    Monta o buffer de wave_chain repetindo cada wave pelo número de frames do passo.
+    
+    Args:
+        wave_ids: ID da wave de cada passo
+        frames: Frames a transmitir em cada passo
+    
+    Returns:
+        Lista de bytes para pi.wave_chain
+    """
+    chain = []
+    for wave_id, count in zip(wave_ids, frames):
+        while count > 0:
+            repeat = min(count, CHAIN_MAX_REPEAT)
+            if repeat == 1:
+                chain.append(wave_id)
+            else:
+                chain.extend(CHAIN_LOOP_START)
+                chain.append(wave_id)
+                chain.extend(CHAIN_LOOP_END)
+                chain.extend((repeat & 0xFF, repeat >> 8))
+            count -= repeat
+    return chain
+
+
+def chain_length(frames: List[int]) -> int:
+    """Bytes do encadeamento de build_chain para os frames de cada passo (sem criar waves)"""
+    return len(build_chain([0] * len(frames), frames))
+
+
+class WaveSweep:
+    """
+    Sweep compilado em waveforms do pigpio.
+    Cada passo é uma wave de um frame repetida pelo número de frames do passo.
+    """
+    
+    def __init__(self, pi, pin: int, pulsewidths: List[int], step_period_s: float,
+                 final_hold_s: float, frequency: int = 50):
+        """
+        Inicializa o sweep.
+        
+        Args:
+            pi: Conexão pigpio (pigpio.pi ou compatível)
+            pin: Pino GPIO (BCM)
+            pulsewidths: Pulsewidth de cada passo em microsegundos
+            step_period_s: Tempo entre o início de passos consecutivos
+            final_hold_s: Tempo de permanência no último passo
+            frequency: Frequência PWM em Hz
+        """
+        self.pi = pi
+        self.pin = pin
+        self.pulsewidths = pulsewidths
+        self.period_us = int(round(1000000 / frequency))
+        self.frames = [frames_for(step_period_s, self.period_us)] * (len(pulsewidths) - 1)
+        self.frames.append(frames_for(final_hold_s, self.period_us))
+        # Instante (relativo ao início) em que cada passo começa, em segundos
+        self.step_starts = []
+        elapsed_us = 0
+        for count in self.frames:
+            self.step_starts.append(elapsed_us / 1000000.0)
+            elapsed_us += count * self.period_us
+        self.duration_s = elapsed_us / 1000000.0
+        self.wave_ids = []
+        self.chain = []
+        self.started_at = None
+        self.halted = None  # Passo em que a transmissão parou (halt)
+    
+    def limit_error(self) -> Optional[str]:
+        """
+        Confere o sweep contra os limites do pigpio antes de criar qualquer wave.
+        
+        Returns:
+            Motivo pelo qual o sweep não cabe em waveforms (None se cabe)
+        """
+        waves = len(set(self.pulsewidths))
+        if waves > MAX_WAVES:
+            return f"{waves} pulsewidths distintos (máximo de {MAX_WAVES} waves)"
+        length = chain_length(self.frames)
+        if length > CHAIN_MAX_BYTES:
+            return f"encadeamento de {length} bytes (máximo de {CHAIN_MAX_BYTES})"
+        return None
+    
+    def build(self, stop_event=None) -> bool:
+        """
+        Cria uma wave por pulsewidth distinto e monta o encadeamento.
+        
+        Returns:
+            False se stop_event foi sinalizado durante a montagem (nada a transmitir)
+        """
+        by_pulsewidth = {}
+        for pw in self.pulsewidths:
+            if stop_event is not None and stop_event.is_set():
+                self.wave_ids = list(by_pulsewidth.values())
+                return False
+            if pw not in by_pulsewidth:
+                self.pi.wave_add_new()
+                self.pi.wave_add_generic(frame_pulses(self.pin, pw, self.period_us))
+                wave_id = by_pulsewidth[pw] = self.pi.wave_create()
+                if wave_id > MAX_WAVE_ID:
+                    # Waves de outro processo no pigpiod: o ID não cabe no encadeamento
+                    self.wave_ids = list(by_pulsewidth.values())
+                    raise ValueError(f"ID de wave {wave_id} acima de {MAX_WAVE_ID}")
+        self.wave_ids = list(by_pulsewidth.values())
+        self.chain = build_chain([by_pulsewidth[pw] for pw in self.pulsewidths], self.frames)
+        return True
+    
+    def start(self):
+        """Desliga os pulsos de servo no pino e inicia a transmissão do encadeamento"""
+        self.pi.set_servo_pulsewidth(self.pin, 0)
+        self.pi.wave_chain(self.chain)
+        self.started_at = time.monotonic()
+    
+    def wait(self, stop_event, on_step: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Acompanha a transmissão até o fim ou até stop_event.
+        O progresso é derivado do tempo: a temporização real é do DMA.
+        
+        Returns:
+            Índice do último passo iniciado
+        """
+        total = len(self.pulsewidths)
+        index = -1
+        while True:
+            elapsed = time.monotonic() - self.started_at
+            while index + 1 < total and self.step_starts[index + 1] <= elapsed:
+                index += 1
+                if on_step:
+                    on_step(index + 1, total)
+            
+            if index + 1 < total:
+                timeout = self.step_starts[index + 1] - elapsed
+            else:
+                timeout = max(0.0, self.duration_s - elapsed)
+                if timeout == 0.0 and not self.pi.wave_tx_busy():
+                    return index
+                timeout = max(timeout, self.period_us / 1000000.0)
+            
+            if stop_event.wait(timeout):
+                return index
+    
+    def step_at(self, elapsed: float) -> int:
+        """Índice do passo em transmissão elapsed segundos após o início"""
+        return max(0, bisect.bisect_right(self.step_starts, elapsed) - 1)
+    
+    def halt(self) -> int:
+        """
+        Para a transmissão imediatamente (o DMA não inicia outro frame da
+        chain). Pode ser chamado pela thread que pede a parada, sem esperar a
+        thread do sweep acordar; chamadas seguintes só repetem o resultado.
+        
+        Returns:
+            Índice do passo em que a transmissão parou
+        """
+        if self.halted is None:
+            try:
+                if self.pi.wave_tx_busy():
+                    self.pi.wave_tx_stop()
+            finally:
+                self.halted = self.step_at(time.monotonic() - self.started_at)
+        return self.halted
+    
+    def release(self):
+        """Interrompe a transmissão (se ativa) e apaga as waves criadas"""
+        if self.pi.wave_tx_busy():
+            self.pi.wave_tx_stop()
+        for wave_id in self.wave_ids:
+            self.pi.wave_delete(wave_id)
+        self.wave_ids = []
+
+
+def run_deadline_sweep(apply: Callable[[float, int], bool], angles: List[float], step_period_s: float,
+                       final_hold_s: float, stop_event,
+                       on_step: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Fallback por software: cada passo é agendado em um deadline absoluto
+    (t0 + i * step_period_s), sem acumular o tempo de execução de cada passo.
+    
+    Args:
+        apply: Função (ângulo, deadline em monotonic_ns) que aplica um ângulo
+               (sem delay de acomodação)
+        angles: Ângulos de cada passo
+        step_period_s: Tempo entre o início de passos consecutivos
+        final_hold_s: Tempo de permanência no último passo
+        stop_event: Event que interrompe o sweep
+        on_step: Callback (passo_atual, total_passos) (opcional)
+    
+    Returns:
+        Índice do último passo aplicado (-1 se nenhum)
+    """
+    total = len(angles)
+    start = time.monotonic()
+    last = -1
+    for index, angle in enumerate(angles):
+        deadline = start + index * step_period_s
+        remaining = deadline - time.monotonic()
+        if remaining > 0 and stop_event.wait(remaining):
+            return last
+        if stop_event.is_set():
+            return last
+        metrics.SWEEP_STEP_JITTER.observe(max(0.0, time.monotonic() - deadline))
+        apply(angle, int(deadline * 1e9))
+        last = index
+        if on_step:
+            on_step(index + 1, total)
+    
+    stop_event.wait(final_hold_s)
+    return last
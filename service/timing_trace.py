@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentação de temporização dos pulsos (opcional).
+
+Com a instrumentação ligada, cada chamada a pi.set_servo_pulsewidth feita
+por set_angle (inclusive passos de sweep por software, missões e
+liberação periódica), pelo movimento em grupo e pela calibração guiada
+registra quatro instantes time.monotonic_ns em um buffer circular
+pré-alocado (array de int64, sem objetos por evento):
+    
+    requested - horário pedido: deadline do passo (sweep, missão, liberação)
+                ou a entrada em set_angle
+    locked    - lock do servo adquirido
+    start/end - início e fim da chamada ao pigpio
+
+Daí saem, por origem (fonte do journal): atraso (start - requested),
+jitter (variação do atraso entre pulsos consecutivos do mesmo servo e
+origem), espera pelo lock (locked - requested) e duração da chamada
+(end - start). Passos do sweep por waveform são temporizados pelo DMA e não
+passam por aqui.
+
+Uso (resumo de um serviço em execução ou de um arquivo salvo de
+GET /timing/events):
+    python3 service/timing_trace.py summary --url http://192.168.4.1:8080
+    python3 service/timing_trace.py summary --file eventos.json
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from array import array
+from typing import List, Optional
+
+from journal import SOURCE_NAMES
+from metrics import JITTER_BUCKETS
+
+DEFAULT_CAPACITY = 65536
+
+# Campos de cada evento no buffer
+FIELDS = 7
+F_SOURCE, F_SERVO, F_REQUESTED, F_LOCKED, F_START, F_END, F_SEQ = range(FIELDS)
+
+# Limites dos histogramas (µs), os mesmos do /metrics
+BUCKETS_US = tuple(int(bound * 1e6) for bound in JITTER_BUCKETS)
+METRICS = ('lateness_us', 'jitter_us', 'lock_wait_us', 'call_us')
+
+
+class TimingTrace:
+    """Buffer circular de eventos de pulso (monotonic_ns)"""
+    
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Args:
+            capacity: Eventos mantidos (os mais antigos são sobrescritos)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity deve ser positiva")
+        self.capacity = capacity
+        self.buffer = array('q', bytes(8 * FIELDS * capacity))
+        self.sequence = itertools.count(1)   # next() é atômico: registro sem lock
+        self.recorded = 0
+    
+    def record(self, source: int, servo: int, requested_ns: int, locked_ns: int, start_ns: int, end_ns: int):
+        """Registra um pulso (caminho de atuação: apenas atribuições no array)"""
+        seq = next(self.sequence)
+        base = (seq - 1) % self.capacity * FIELDS
+        buffer = self.buffer
+        buffer[base] = source
+        buffer[base + 1] = servo
+        buffer[base + 2] = requested_ns
+        buffer[base + 3] = locked_ns
+        buffer[base + 4] = start_ns
+        buffer[base + 5] = end_ns
+        buffer[base + 6] = seq
+        self.recorded = seq
+    
+    def clear(self):
+        self.buffer = array('q', bytes(8 * FIELDS * self.capacity))
+        self.sequence = itertools.count(1)
+        self.recorded = 0
+    
+    def events(self, since: Optional[int] = None, limit: int = 1000) -> dict:
+        """
+        Eventos a partir de since (seq), no formato de GET /timing/events.
+        
+        Returns:
+            {"events": [...], "next": seq seguinte, "lost": eventos já sobrescritos}
+        """
+        newest = self.recorded
+        oldest = max(1, newest - self.capacity + 1)
+        first = oldest if since is None else max(since, oldest)
+        lost = max(0, first - since) if since is not None else 0
+        rows = []
+        buffer = self.buffer
+        for seq in range(first, min(newest, first + limit - 1) + 1):
+            base = (seq - 1) % self.capacity * FIELDS
+            if buffer[base + F_SEQ] != seq:
+                # Sobrescrito durante a leitura
+                continue
+            requested, locked, start, end = buffer[base + 2:base + 6]
+            rows.append({
+                'seq': seq,
+                'source': SOURCE_NAMES.get(buffer[base], str(buffer[base])),
+                'servo': buffer[base + 1],
+                'requested_ns': requested,
+                'lateness_us': (start - requested) / 1000.0,
+                'lock_wait_us': (locked - requested) / 1000.0 if locked else None,
+                'call_us': (end - start) / 1000.0,
+            })
+        return {'events': rows, 'next': rows[-1]['seq'] + 1 if rows else first, 'lost': lost}
+    
+    def status(self) -> dict:
+        return {'capacity': self.capacity, 'recorded': self.recorded,
+                'buffered': min(self.recorded, self.capacity)}
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def histogram(values: List[float]) -> dict:
+    """Contagem por limite superior (µs) e acima do maior limite ("+Inf")"""
+    counts = dict.fromkeys([str(bound) for bound in BUCKETS_US] + ['+Inf'], 0)
+    for value in values:
+        for bound in BUCKETS_US:
+            if value <= bound:
+                counts[str(bound)] += 1
+                break
+        else:
+            counts['+Inf'] += 1
+    return counts
+
+
+def describe(values: List[float]) -> dict:
+    if not values:
+        return {'count': 0}
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 1),
+        'p50': round(_percentile(values, 50), 1),
+        'p99': round(_percentile(values, 99), 1),
+        'max': round(values[-1], 1),
+        'histogram': histogram(values),
+    }
+
+
+def summarize(events: List[dict]) -> dict:
+    """
+    Resumo por origem: atraso, jitter, espera pelo lock e duração da chamada (µs).
+    
+    Args:
+        events: Eventos de TimingTrace.events (ordem de seq)
+    """
+    series = {}
+    previous = {}
+    for event in events:
+        values = series.setdefault(event['source'], {name: [] for name in METRICS})
+        lateness = event['lateness_us']
+        values['lateness_us'].append(lateness)
+        values['call_us'].append(event['call_us'])
+        if event['lock_wait_us'] is not None:
+            values['lock_wait_us'].append(event['lock_wait_us'])
+        key = (event['source'], event['servo'])
+        if key in previous:
+            values['jitter_us'].append(abs(lateness - previous[key]))
+        previous[key] = lateness
+    return {source: {name: describe(data) for name, data in values.items()}
+            for source, values in sorted(series.items())}
+
+
+def _fetch_events(url: str) -> List[dict]:
+    """Todos os eventos do buffer de um serviço em execução (GET /timing/events)"""
+    from urllib.request import urlopen
+    events, since = [], None
+    while True:
+        query = "?limit=10000" + (f"&since={since}" if since is not None else "")
+        with urlopen(url.rstrip('/') + '/timing/events' + query, timeout=10) as resp:
+            page = json.loads(resp.read())
+        events += page['events']
+        if not page['events']:
+            return events
+        since = page['next']
+
+
+def print_summary(summary: dict, out=sys.stdout):
+    header = f"{'origem':<12} {'métrica':<13} {'n':>7} {'média':>9} {'p50':>9} {'p99':>9} {'máx':>10}"
+    print(header, file=out)
+    print('-' * len(header), file=out)
+    for source, values in summary.items():
+        for name in METRICS:
+            stats = values[name]
+            if not stats['count']:
+                continue
+            print(f"{source:<12} {name:<13} {stats['count']:>7} {stats['mean']:>9} {stats['p50']:>9} "
+                  f"{stats['p99']:>9} {stats['max']:>10}", file=out)
+    print("(µs)", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo da instrumentação de temporização dos pulsos")
+    sub = parser.add_subparsers(dest='command', required=True)
+    summary_parser = sub.add_parser('summary', help="Atraso, jitter, espera pelo lock e chamada ao pigpio")
+    source = summary_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--url', help="Serviço em execução (ex.: http://192.168.4.1:8080)")
+    source.add_argument('--file', help="JSON salvo de GET /timing/events")
+    summary_parser.add_argument('--json', action='store_true', help="Resumo em JSON (com histogramas)")
+    args = parser.parse_args()
+    
+    if args.url:
+        events = _fetch_events(args.url)
+    else:
+        with open(args.file, 'r') as f:
+            data = json.load(f)
+        events = data['events'] if isinstance(data, dict) else data
+    summary = summarize(events)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Protocolo binário de comandos por UDP para o companion do controlador de voo.
+Frames de tamanho fixo, sem parsing de texto nem conexão: cada datagrama é um
+comando mapeado nas operações do ServoControl e respondido com um frame de ack.
+Sequências repetidas ou antigas (replay) são rejeitadas por remetente (endereço
+IP: a porta de origem muda a cada socket e não identifica o companion).
+
+Formato (18 bytes, big-endian), igual para comando e ack:
+    magic      uint8   0xA7
+    opcode     uint8   comando; no ack, opcode | 0x80
+    seq        uint32  número de sequência do remetente
+    status     uint8   0 no comando; resultado no ack
+    reserved   uint8   0
+    angle      uint16  centésimos de grau (comando: alvo; ack: ângulo atual)
+    timestamp  uint64  relógio do remetente (ecoado no ack para medir RTT)
+"""
+
+import socket
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from journal import SOURCE_UDP
+
+FRAME = struct.Struct('!BBIBBHQ')
+FRAME_SIZE = FRAME.size
+MAGIC = 0xA7
+ACK_FLAG = 0x80
+
+# Opcodes
+OP_RESET = 0x00      # Reinicia a janela do remetente (só com seq mais nova)
+OP_SET_ANGLE = 0x01
+OP_STOP = 0x02
+OP_PING = 0x03       # Ack com o ângulo atual
+
+# Status do ack
+ST_OK = 0
+ST_DUPLICATE = 1     # Sequência já processada (retransmissão): não reexecuta
+ST_STALE = 2         # Sequência anterior à janela (replay): rejeitada
+ST_INVALID = 3       # Opcode ou ângulo inválido
+ST_NOT_INITIALIZED = 4
+ST_FAILED = 5
+ST_CALIBRATING = 6   # Calibração guiada em andamento: ângulo recusado
+
+# Janela anti-replay (sequências aceitas fora de ordem até esta distância)
+DEFAULT_REPLAY_WINDOW = 64
+
+# Remetentes com janela completa (os menos recentes são descartados). Da janela
+# descartada fica só a maior sequência, como piso: um replay dos frames
+# daquele remetente continua recusado quando ele volta
+MAX_SENDERS = 16
+
+# Pisos guardados por endereço; além disso o mais antigo vira o piso comum
+# dos endereços desconhecidos
+MAX_FLOORS = 1024
+
+
+def pack_frame(opcode: int, seq: int, angle_cd: int = 0, timestamp: int = 0, status: int = 0) -> bytes:
+    """Monta um frame (comando ou ack)"""
+    return FRAME.pack(MAGIC, opcode, seq & 0xFFFFFFFF, status, 0, angle_cd, timestamp & 0xFFFFFFFFFFFFFFFF)
+
+
+def unpack_frame(data: bytes) -> Optional[tuple]:
+    """
+    Decodifica um frame.
+    
+    Returns:
+        Tupla (opcode, seq, status, angle_cd, timestamp) ou None se inválido
+    """
+    if len(data) != FRAME_SIZE:
+        return None
+    magic, opcode, seq, status, _, angle_cd, timestamp = FRAME.unpack(data)
+    if magic != MAGIC:
+        return None
+    return opcode, seq, status, angle_cd, timestamp
+
+
+class ReplayWindow:
+    """
+    Janela deslizante de sequências de um remetente (bitmap, como no IPsec).
+    Aceita sequências novas e fora de ordem dentro da janela, uma única vez.
+    """
+    
+    def __init__(self, size: int = DEFAULT_REPLAY_WINDOW):
+        self.size = size
+        self.highest = None
+        self.bitmap = 0  # bit i = sequência (highest - i) já vista
+    
+    def restart(self, seq: int):
+        """Recomeça a janela em seq (sequências anteriores não são mais aceitas)"""
+        self.highest = seq
+        self.bitmap = (1 << self.size) - 1
+    
+    def check(self, seq: int) -> int:
+        """
+        Registra a sequência.
+        
+        Returns:
+            ST_OK, ST_DUPLICATE ou ST_STALE
+        """
+        if self.highest is None or seq > self.highest:
+            shift = seq - self.highest if self.highest is not None else self.size
+            # Um salto de até 2^32 não pode virar um inteiro de centenas de MB
+            if shift >= self.size:
+                self.bitmap = 1
+            else:
+                self.bitmap = ((self.bitmap << shift) | 1) & ((1 << self.size) - 1)
+            self.highest = seq
+            return ST_OK
+        
+        offset = self.highest - seq
+        if offset >= self.size:
+            return ST_STALE
+        if self.bitmap & (1 << offset):
+            return ST_DUPLICATE
+        self.bitmap |= 1 << offset
+        return ST_OK
+
+
+class UDPCommandServer:
+    """
+    Listener UDP em uma thread dedicada.
+    Comandos de ângulo passam pela fila de movimento quando ela existe.
+    """
+    
+    def __init__(self, servo, motion=None, stop=None, host: str = '0.0.0.0', port: int = 8090,
+                 replay_window: int = DEFAULT_REPLAY_WINDOW, max_senders: int = MAX_SENDERS, logger=None):
+        """
+        Args:
+            servo: Instância de ServoControl
+            motion: MotionQueue (opcional; sem ela o ângulo é aplicado direto)
+            stop: Parada completa do serviço (a mesma de POST /stop); sem ela,
+                  OP_STOP só para a fila de movimento e o sweep
+            host: Endereço de escuta
+            port: Porta UDP
+            replay_window: Tamanho da janela anti-replay por remetente
+            max_senders: Remetentes (endereços IP) com janela completa
+            logger: Instância do logger (opcional)
+        """
+        self.servo = servo
+        self.motion = motion
+        self.stop_all = stop
+        self.host = host
+        self.port = port
+        self.replay_window = replay_window
+        self.max_senders = max_senders
+        self.logger = logger
+        self.sock = None
+        self.thread = None
+        self.running = False
+        self.senders = OrderedDict()  # ip -> ReplayWindow (ordem de uso)
+        self.floors = OrderedDict()   # ip -> maior sequência da janela descartada
+        self.floor = None             # Piso dos endereços sem janela nem piso próprio
+        
+        # Contadores
+        self.received = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.stale = 0
+        self.invalid = 0
+        self.evicted_senders = 0
+    
+    def start(self):
+        """Abre o socket e inicia a thread do listener"""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        # Timeout curto para o loop perceber stop()
+        self.sock.settimeout(0.5)
+        self.port = self.sock.getsockname()[1]
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='udp-commands', daemon=True)
+        self.thread.start()
+        if self.logger:
+            self.logger.info(f"Comandos UDP em {self.host}:{self.port}")
+    
+    def stop(self):
+        """Fecha o socket e encerra a thread"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+    
+    def stats(self) -> dict:
+        """Contadores do listener"""
+        return {
+            'port': self.port,
+            'received': self.received,
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'stale': self.stale,
+            'invalid': self.invalid,
+            'senders': len(self.senders),
+            'evicted_senders': self.evicted_senders,
+        }
+    
+    def _run(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            response = self.handle_datagram(data, addr)
+            if response:
+                try:
+                    self.sock.sendto(response, addr)
+                except OSError as e:
+                    if self.logger:
+                        self.logger.warning(f"Falha ao enviar ack UDP para {addr[0]}: {e}")
+    
+    def handle_datagram(self, data: bytes, addr) -> Optional[bytes]:
+        """
+        Processa um datagrama.
+        
+        Returns:
+            Frame de ack (None para datagramas que não são frames válidos)
+        """
+        frame = unpack_frame(data)
+        if frame is None:
+            if data:
+                self.invalid += 1
+            return None
+        
+        self.received += 1
+        opcode, seq, _, angle_cd, timestamp = frame
+        
+        # O RESET passa pela janela como qualquer frame: um RESET capturado e
+        # reenviado não reabre a janela para replays de frames antigos
+        window = self._window(addr)
+        status = window.check(seq)
+        if opcode == OP_RESET and status == ST_OK:
+            window.restart(seq)
+        
+        if status == ST_DUPLICATE:
+            self.duplicates += 1
+        elif status == ST_STALE:
+            self.stale += 1
+        elif opcode != OP_RESET:
+            status = self._execute(opcode, angle_cd)
+        
+        if status == ST_OK:
+            self.accepted += 1
+        elif status == ST_INVALID:
+            self.invalid += 1
+        
+        return self._ack(opcode, seq, timestamp, status)
+    
+    def _ack(self, opcode: int, seq: int, timestamp: int, status: int) -> bytes:
+        """Frame de ack com o ângulo atual"""
+        current = int(round(self.servo.get_angle() * 100)) if self.servo else 0
+        return pack_frame(opcode | ACK_FLAG, seq, max(0, min(18000, current)), timestamp, status)
+    
+    def _window(self, addr) -> ReplayWindow:
+        """Janela do endereço IP do remetente (nova janela começa no piso do endereço)"""
+        ip = addr[0]
+        window = self.senders.get(ip)
+        if window is not None:
+            self.senders.move_to_end(ip)
+            return window
+        
+        window = self.senders[ip] = ReplayWindow(self.replay_window)
+        floor = self.floors.pop(ip, self.floor)
+        if floor is not None:
+            # Sequências até o piso já podem ter sido aceitas: só as mais novas passam
+            window.restart(floor)
+        if len(self.senders) > self.max_senders:
+            evicted_ip, evicted = self.senders.popitem(last=False)
+            self.evicted_senders += 1
+            if evicted.highest is not None:
+                self.floors[evicted_ip] = evicted.highest
+                if len(self.floors) > MAX_FLOORS:
+                    _, oldest = self.floors.popitem(last=False)
+                    self.floor = oldest if self.floor is None else max(self.floor, oldest)
+        return window
+    
+    def _execute(self, opcode: int, angle_cd: int) -> int:
+        """Executa o comando no ServoControl e retorna o status"""
+        if opcode == OP_PING:
+            return ST_OK
+        if opcode not in (OP_SET_ANGLE, OP_STOP):
+            return ST_INVALID
+        if not self.servo or not self.servo.is_initialized:
+            return ST_NOT_INITIALIZED
+        
+        if opcode == OP_STOP:
+            if self.stop_all:
+                self.stop_all()
+            else:
+                if self.motion:
+                    self.motion.clear()
+                self.servo.stop_sweep(wait=False)
+            return ST_OK
+        
+        if angle_cd > 18000:
+            return ST_INVALID
+        # A fila de movimento aceitaria o alvo, mas set_angle o recusa na calibração
+        if self.servo.calibrating:
+            return ST_CALIBRATING
+        angle = angle_cd / 100.0
+        if self.motion:
+            self.motion.submit(angle)
+            return ST_OK
+        return ST_OK if self.servo.set_angle(angle, settle=False, source=SOURCE_UDP) else ST_FAILED
@@ -5,10 +5,20 @@ Funções utilitárias para o Trichogramma Pi Service.
 Validação de comandos, helpers e funções auxiliares.
 """
 
+import math
 import os
 import re
 from typing import Tuple, Optional
 
+from motion_profile import PROFILE_STEP, PROFILES
+
+# Limites de um sweep (POST /sweep e passos de POST /batch): o trem de pulsos
+# da wave chain e a lista de ângulos crescem com a duração e o número de passos
+MAX_SWEEP_DELAY_S = 60.0
+MIN_SWEEP_STEP = 0.1
+MAX_SWEEP_STEP = 180.0
+MAX_SWEEP_DURATION_S = 300.0
+
 
 def validate_angle(angle_str: str) -> Tuple[bool, Optional[float], str]:
     """
@@ -32,6 +42,111 @@ def validate_angle(angle_str: str) -> Tuple[bool, Optional[float], str]:
         return False, None, "Ângulo inválido: deve ser um número"
 
 
+def parse_angle_value(value) -> Tuple[bool, Optional[int], str]:
+    """
+    Valida o ângulo recebido em JSON (POST /angle, canal WebSocket).
+    
+    Args:
+        value: Valor do campo "angle" (número ou string)
+    
+    Returns:
+        Tupla (válido, ângulo_int, mensagem_erro)
+    """
+    if value is None:
+        return False, None, 'Parâmetro "angle" obrigatório'
+    
+    try:
+        angle = int(value)
+    except (TypeError, ValueError, OverflowError):
+        # OverflowError: Infinity, aceito pelo json.loads
+        return False, None, "Ângulo inválido"
+    
+    if angle < 0 or angle > 180:
+        return False, None, "Ângulo deve estar entre 0 e 180"
+    
+    return True, angle, ""
+
+
+def parse_flag(data: dict, key: str, default: bool) -> Tuple[bool, Optional[bool], str]:
+    """
+    Valida um campo booleano de JSON (ex: "settle"): só true/false, sem
+    converter strings como "false".
+    
+    Args:
+        data: Corpo JSON
+        key: Nome do campo
+        default: Valor quando o campo está ausente
+    
+    Returns:
+        Tupla (válido, valor, mensagem_erro)
+    """
+    value = data.get(key, default)
+    if not isinstance(value, bool):
+        return False, None, f'"{key}" deve ser true ou false'
+    return True, value, ""
+
+
+def parse_profile(value) -> Tuple[bool, Optional[str], str]:
+    """
+    Valida o perfil de movimento ("profile" de POST /angle, /sweep e /batch).
+    
+    Args:
+        value: Valor do campo "profile" (None: "step")
+    
+    Returns:
+        Tupla (válido, perfil, mensagem_erro)
+    """
+    if value is None:
+        return True, PROFILE_STEP, ""
+    if value not in PROFILES:
+        return False, None, f'"profile" deve ser um de: {", ".join(PROFILES)}'
+    return True, value, ""
+
+
+def parse_sweep_params(data: dict, settle_s: float = 0.0) -> Tuple[bool, Optional[dict], str]:
+    """
+    Valida os parâmetros de um sweep recebidos em JSON (POST /sweep, POST /batch).
+    
+    Args:
+        data: Dicionário com "from", "to", "delay_s", "step" e "profile" (opcionais)
+        settle_s: Acomodação do servo somada a cada passo na estimativa de duração
+    
+    Returns:
+        Tupla (válido, parâmetros, mensagem_erro)
+    """
+    try:
+        params = {
+            'from': float(data.get('from', 0)),
+            'to': float(data.get('to', 180)),
+            'delay_s': float(data.get('delay_s', 0.5)),
+            'step': float(data.get('step', 10.0)),
+        }
+    except (TypeError, ValueError):
+        return False, None, "Parâmetros de sweep inválidos"
+    
+    # NaN e Infinity (aceitos pelo json.loads) escapam das comparações abaixo
+    if not all(math.isfinite(value) for value in params.values()):
+        return False, None, "Parâmetros de sweep devem ser finitos"
+    if not (0 <= params['from'] <= 180 and 0 <= params['to'] <= 180):
+        return False, None, "Ângulos devem estar entre 0 e 180"
+    if not MIN_SWEEP_STEP <= params['step'] <= MAX_SWEEP_STEP:
+        return False, None, f'"step" deve estar entre {MIN_SWEEP_STEP:g} e {MAX_SWEEP_STEP:g}'
+    if not 0 <= params['delay_s'] <= MAX_SWEEP_DELAY_S:
+        return False, None, f'"delay_s" deve estar entre 0 e {MAX_SWEEP_DELAY_S:g}'
+    
+    valid, params['profile'], error = parse_profile(data.get('profile'))
+    if not valid:
+        return False, None, error
+    
+    if params['profile'] == PROFILE_STEP:
+        # Passos do sweep (com o ângulo final) vezes o período de cada um
+        steps = int(abs(params['to'] - params['from']) / params['step']) + 2
+        if steps * (params['delay_s'] + settle_s) > MAX_SWEEP_DURATION_S:
+            return False, None, f"Duração estimada do sweep acima de {MAX_SWEEP_DURATION_S:.0f}s"
+    
+    return True, params, ""
+
+
 def parse_set_angle_command(command: str) -> Tuple[bool, Optional[float], str]:
     """
     Faz parse do comando SET_ANGLE:NN.
@@ -171,7 +286,7 @@ def is_valid_command(command: str) -> bool:
 
 def list_flight_files(directory: str = "/home/pi/flight_data") -> list:
     """
-    Lista arquivos de voo salvos (placeholder para implementação futura).
+    Lista arquivos de voo salvos (planos de missão, ver mission.py).
     
     Args:
         directory: Diretório onde procurar arquivos
@@ -179,12 +294,11 @@ def list_flight_files(directory: str = "/home/pi/flight_data") -> list:
     Returns:
         Lista de nomes de arquivos
     """
-    # TODO: Implementar quando houver funcionalidade de salvar planos de voo
     if not os.path.exists(directory):
         return []
     
     try:
-        files = [f for f in os.listdir(directory) if f.endswith('.json') or f.endswith('.txt')]
+        files = [f for f in os.listdir(directory) if f.endswith(('.json', '.txt', '.tfp'))]
         return sorted(files)
     except Exception:
         return []
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Canal de controle WebSocket (RFC 6455) sem dependências externas.
+Uma conexão persistente recebe alvos de ângulo em JSON e recebe de volta
+o estado do servo (ângulo, sweep, progresso do job) sempre que ele muda:
+o push espera a notificação de mudança do ServoControl (bump_state), sem
+polling. Funciona nos dois motores HTTP: threads (classic) e asyncio (importado só
+por esse motor).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import select
+import struct
+import threading
+import time
+from typing import List, Optional
+
+from journal import SOURCE_WEBSOCKET
+from utils import parse_angle_value
+
+# GUID fixo do handshake (RFC 6455, seção 1.3)
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Códigos de fechamento
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_UNSUPPORTED = 1003
+CLOSE_TOO_BIG = 1009
+
+# Comandos são pequenos: limita o payload de cada frame
+MAX_PAYLOAD_BYTES = 65536
+
+# Espera máxima por uma notificação antes de reconferir o estado (motor
+# asyncio com o notifier ainda não ligado ao servo)
+STATE_WAIT_S = 1.0
+
+
+class ProtocolError(Exception):
+    """Frame inválido; a conexão é fechada com o código informado"""
+    
+    def __init__(self, message: str, code: int = CLOSE_PROTOCOL_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+def is_upgrade_request(headers) -> bool:
+    """
+    Verifica se os cabeçalhos pedem upgrade para WebSocket.
+    
+    Args:
+        headers: Objeto com .get() por nome de cabeçalho em minúsculas
+    """
+    upgrade = (headers.get('upgrade') or '').lower()
+    connection = (headers.get('connection') or '').lower()
+    return upgrade == 'websocket' and 'upgrade' in connection and bool(headers.get('sec-websocket-key'))
+
+
+def accept_key(key: str) -> str:
+    """Calcula Sec-WebSocket-Accept para a chave enviada pelo cliente"""
+    digest = hashlib.sha1((key.strip() + WS_GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def handshake_response(key: str) -> bytes:
+    """Resposta HTTP 101 que conclui o handshake"""
+    return (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n"
+        "\r\n"
+    ).encode('ascii')
+
+
+def encode_frame(opcode: int, payload: bytes = b'') -> bytes:
+    """Monta um frame do servidor (FIN, sem máscara)"""
+    length = len(payload)
+    if length < 126:
+        head = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 65536:
+        head = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return head + payload
+
+
+def encode_json(data: dict) -> bytes:
+    """Frame de texto com o JSON compacto"""
+    return encode_frame(OP_TEXT, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+def encode_close(code: int = CLOSE_NORMAL) -> bytes:
+    return encode_frame(OP_CLOSE, struct.pack('!H', code))
+
+
+class FrameDecoder:
+    """
+    Decodificador incremental de frames do cliente.
+    Recebe bytes na ordem em que chegam e devolve os frames completos.
+    """
+    
+    def __init__(self, max_payload: int = MAX_PAYLOAD_BYTES):
+        self.max_payload = max_payload
+        self.buffer = bytearray()
+    
+    def feed(self, data: bytes) -> List[tuple]:
+        """
+        Acrescenta bytes recebidos.
+        
+        Returns:
+            Lista de (opcode, payload) dos frames completos
+        
+        Raises:
+            ProtocolError: Frame sem máscara, fragmentado ou grande demais
+        """
+        self.buffer += data
+        frames = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                return frames
+            frames.append(frame)
+    
+    def _next_frame(self) -> Optional[tuple]:
+        buf = self.buffer
+        if len(buf) < 2:
+            return None
+        
+        fin = buf[0] & 0x80
+        opcode = buf[0] & 0x0F
+        masked = buf[1] & 0x80
+        length = buf[1] & 0x7F
+        offset = 2
+        
+        if length == 126:
+            if len(buf) < 4:
+                return None
+            length = struct.unpack_from('!H', buf, 2)[0]
+            offset = 4
+        elif length == 127:
+            if len(buf) < 10:
+                return None
+            length = struct.unpack_from('!Q', buf, 2)[0]
+            offset = 10
+        
+        if not masked:
+            raise ProtocolError("Frame do cliente sem máscara")
+        if not fin or opcode == OP_CONTINUATION:
+            raise ProtocolError("Mensagens fragmentadas não são suportadas", CLOSE_UNSUPPORTED)
+        if length > self.max_payload:
+            raise ProtocolError("Frame muito grande", CLOSE_TOO_BIG)
+        
+        end = offset + 4 + length
+        if len(buf) < end:
+            return None
+        
+        mask = buf[offset:offset + 4]
+        payload = bytearray(buf[offset + 4:end])
+        for i in range(length):
+            payload[i] ^= mask[i & 3]
+        del buf[:end]
+        return opcode, bytes(payload)
+
+
+class ControlSession:
+    """
+    Protocolo de controle de uma conexão WebSocket.
+    
+    Mensagens do cliente (JSON):
+        {"type": "angle", "angle": NN, "id": ...}  - define ângulo ("type" opcional)
+        {"type": "stop"}                           - para movimento
+        {"type": "status"}                         - pede o estado atual
+        {"type": "ping"}                           - teste de latência
+    
+    Respostas: {"type": "ack" | "error" | "state" | "pong", ...}, com o "id"
+    do comando quando informado. Mensagens "state" também são enviadas
+    espontaneamente quando o ângulo, o sweep ou o job em andamento mudam.
+    """
+    
+    def __init__(self, servo, motion=None, jobs=None, logger=None, stop=None):
+        """
+        Args:
+            servo: Instância de ServoControl
+            motion: MotionQueue (opcional; sem ela os ângulos são aplicados direto)
+            jobs: JobManager (opcional) para reportar o progresso do job
+            logger: Instância do logger (opcional)
+            stop: Parada completa do serviço (a mesma de POST /stop); sem ela,
+                  só a fila de movimento e o sweep são parados
+        """
+        self.servo = servo
+        self.motion = motion
+        self.jobs = jobs
+        self.logger = logger
+        self.stop = stop
+        self.last_state = None
+    
+    @property
+    def blocking(self) -> bool:
+        """Comandos de ângulo bloqueiam até o servo assentar (sem fila de movimento)"""
+        return self.motion is None
+    
+    def handle_text(self, text: str) -> dict:
+        """
+        Processa uma mensagem do cliente.
+        
+        Returns:
+            Mensagem de resposta
+        """
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return {'type': 'error', 'message': 'JSON inválido'}
+        if not isinstance(message, dict):
+            return {'type': 'error', 'message': 'Mensagem deve ser um objeto JSON'}
+        
+        kind = message.get('type', 'angle')
+        reply = self._dispatch(kind, message)
+        if 'id' in message:
+            reply['id'] = message['id']
+        return reply
+    
+    def _dispatch(self, kind: str, message: dict) -> dict:
+        if kind == 'ping':
+            return {'type': 'pong', 't': time.time()}
+        
+        if kind == 'status':
+            return self.state()
+        
+        if not self.servo or not self.servo.is_initialized:
+            return {'type': 'error', 'message': 'Servo não inicializado'}
+        
+        if kind == 'angle':
+            # Mesma validação de POST /angle
+            valid, angle, error = parse_angle_value(message.get('angle'))
+            if not valid:
+                return {'type': 'error', 'message': error}
+            if self.servo.calibrating:
+                return {'type': 'error', 'message': 'Calibração guiada em andamento'}
+            
+            if self.motion:
+                self.motion.submit(angle)
+                return {'type': 'ack', 'angle': angle, 'queued': True}
+            
+            if not self.servo.set_angle(angle, source=SOURCE_WEBSOCKET):
+                return {'type': 'error', 'message': 'Falha ao mover servo'}
+            return {'type': 'ack', 'angle': angle}
+        
+        if kind == 'stop':
+            if self.stop:
+                self.stop()
+            else:
+                if self.motion:
+                    self.motion.clear()
+                self.servo.stop_sweep(wait=False)
+            return {'type': 'ack', 'message': 'Movimento parado'}
+        
+        return {'type': 'error', 'message': f'Tipo de mensagem desconhecido: {kind}'}
+    
+    def state(self) -> dict:
+        """Estado atual do servo e do job mais recente"""
+        job = None
+        if self.jobs:
+            recent = self.jobs.list()
+            if recent:
+                latest = recent[-1]
+                eta = latest.eta_s()
+                job = {
+                    'job_id': latest.id,
+                    'kind': latest.kind,
+                    'state': latest.state,
+                    'step': latest.step,
+                    'total_steps': latest.total_steps,
+                    'eta_s': round(eta, 3) if eta is not None else None,
+                }
+        return {
+            'type': 'state',
+            'angle': int(self.servo.get_angle()) if self.servo else 0,
+            'sweeping': self.servo.is_sweeping() if self.servo else False,
+            'job': job,
+        }
+    
+    def poll_state(self) -> Optional[dict]:
+        """
+        Retorna o estado se ele mudou desde o último push (None caso contrário).
+        O ETA muda continuamente e não conta como mudança.
+        """
+        state = self.state()
+        key = (state['angle'], state['sweeping'],
+               state['job'] and (state['job']['job_id'], state['job']['state'], state['job']['step']))
+        if key == self.last_state:
+            return None
+        self.last_state = key
+        return state
+
+
+def _handle_frames(session: ControlSession, frames: List[tuple], apply_text) -> tuple:
+    """
+    Processa frames decodificados.
+    
+    Args:
+        apply_text: Função que processa uma mensagem de texto e retorna a resposta
+    
+    Returns:
+        Tupla (bytes a enviar, encerrar conexão)
+    """
+    out = []
+    for opcode, payload in frames:
+        if opcode == OP_TEXT:
+            out.append(encode_json(apply_text(payload.decode('utf-8', errors='replace'))))
+        elif opcode == OP_PING:
+            out.append(encode_frame(OP_PONG, payload))
+        elif opcode == OP_CLOSE:
+            out.append(encode_close())
+            return b''.join(out), True
+        elif opcode == OP_BINARY:
+            out.append(encode_close(CLOSE_UNSUPPORTED))
+            return b''.join(out), True
+        # OP_PONG: ignorado
+    return b''.join(out), False
+
+
+class _ChangePipe:
+    """
+    Pipe escrito pelo listener de estado do servo: acorda o select da
+    conexão quando o estado muda (motor classic).
+    """
+    
+    def __init__(self, servo):
+        self.servo = servo
+        self.read_fd, self.write_fd = os.pipe()
+        os.set_blocking(self.write_fd, False)
+        self.lock = threading.Lock()  # Fechamento x escrita pelo listener
+        self.open = True
+        if servo:
+            servo.add_state_listener(self.notify)
+    
+    def notify(self, version: int):
+        """Listener (thread que mudou o estado): não bloqueia"""
+        with self.lock:
+            if self.open:
+                try:
+                    os.write(self.write_fd, b'\0')
+                except BlockingIOError:
+                    # Já há aviso pendente
+                    pass
+    
+    def drain(self):
+        os.read(self.read_fd, 4096)
+    
+    def close(self):
+        if self.servo:
+            self.servo.remove_state_listener(self.notify)
+        with self.lock:
+            self.open = False
+            os.close(self.read_fd)
+            os.close(self.write_fd)
+
+
+def serve_blocking(sock, session: ControlSession, idle_timeout_s: Optional[float] = None):
+    """
+    Atende uma conexão WebSocket em uma thread dedicada (motor classic).
+    O handshake já foi enviado; o cliente só envia frames depois do 101,
+    então não há bytes pendentes no buffer de leitura do handler.
+    
+    Args:
+        sock: Socket da conexão
+        session: Sessão de controle
+        idle_timeout_s: Fecha a conexão sem mensagens do cliente por esse tempo (None = sem limite)
+    """
+    decoder = FrameDecoder()
+    last_rx = time.monotonic()
+    sock.settimeout(None)
+    changes = _ChangePipe(session.servo)
+    try:
+        sock.sendall(encode_json(session.poll_state()))
+        while True:
+            timeout = max(0.0, last_rx + idle_timeout_s - time.monotonic()) if idle_timeout_s else None
+            readable, _, _ = select.select([sock, changes.read_fd], [], [], timeout)
+            if changes.read_fd in readable:
+                changes.drain()
+            if sock in readable:
+                data = sock.recv(4096)
+                if not data:
+                    return
+                last_rx = time.monotonic()
+                try:
+                    out, close = _handle_frames(session, decoder.feed(data), session.handle_text)
+                except ProtocolError as e:
+                    sock.sendall(encode_close(e.code))
+                    return
+                if out:
+                    sock.sendall(out)
+                if close:
+                    return
+            elif not readable and idle_timeout_s and time.monotonic() - last_rx >= idle_timeout_s:
+                sock.sendall(encode_close())
+                return
+            
+            state = session.poll_state()
+            if state:
+                sock.sendall(encode_json(state))
+    except OSError:
+        # Cliente desconectou
+        pass
+    finally:
+        changes.close()
+
+
+async def serve_async(reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter', session: ControlSession,
+                      executor=None, notifier=None, idle_timeout_s: Optional[float] = None):
+    """
+    Atende uma conexão WebSocket no event loop (motor asyncio).
+    Comandos que bloqueiam (sem fila de movimento) rodam no executor.
+    
+    Args:
+        reader, writer: Streams da conexão (handshake já enviado)
+        session: Sessão de controle
+        executor: Executor para comandos bloqueantes
+        notifier: state_events.AsyncStateNotifier do servo (push a cada mudança)
+        idle_timeout_s: Fecha a conexão sem mensagens do cliente por esse tempo (None = sem limite)
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    decoder = FrameDecoder()
+    closing = asyncio.Event()
+    
+    async def pusher():
+        while not closing.is_set():
+            version = session.servo.state_version if session.servo else 0
+            state = session.poll_state()
+            if state:
+                writer.write(encode_json(state))
+                await writer.drain()
+            if notifier:
+                await notifier.wait(version, STATE_WAIT_S)
+            else:
+                await asyncio.sleep(STATE_WAIT_S)
+    
+    push_task = loop.create_task(pusher())
+    try:
+        while True:
+            if idle_timeout_s:
+                data = await asyncio.wait_for(reader.read(4096), idle_timeout_s)
+            else:
+                data = await reader.read(4096)
+            if not data:
+                return
+            try:
+                frames = decoder.feed(data)
+            except ProtocolError as e:
+                writer.write(encode_close(e.code))
+                await writer.drain()
+                return
+            
+            if session.blocking and any(op == OP_TEXT for op, _ in frames):
+                out, close = await loop.run_in_executor(
+                    executor, _handle_frames, session, frames, session.handle_text)
+            else:
+                out, close = _handle_frames(session, frames, session.handle_text)
+            if out:
+                writer.write(out)
+                await writer.drain()
+            if close:
+                return
+    except asyncio.TimeoutError:
+        writer.write(encode_close())
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        closing.set()
+        push_task.cancel()
+        try:
+            await push_task
+        except (asyncio.CancelledError, ConnectionError, OSError):
+            pass
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificação da liberação periódica contra o servo simulado.
+Confere o cronograma quando a taxa muda durante o hold de um ciclo, nas
+políticas skip e catch_up (sem ciclos descartados nem rajadas).
+
+Uso:
+    python3 tests/check_dispenser.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "service"))
+
+from dispenser import POLICIES, PeriodicDispenser
+from servo_control import ServoControl
+
+OPEN_ANGLE = 120
+
+
+def check(condition, message):
+    print(("  OK   " if condition else "  FALHA ") + message)
+    return condition
+
+
+def check_rate_change_in_hold(policy):
+    """60/min → 240/min no hold do segundo ciclo: aberturas em 0, 1.0, 1.25, 1.5, 1.75s"""
+    print(f"Troca de taxa durante o hold ({policy}):")
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0})
+    servo._log_info = lambda message: None
+    opens = []
+    set_angle = servo.set_angle
+    
+    def recording_set_angle(angle, *args, **kwargs):
+        if angle == OPEN_ANGLE:
+            opens.append(time.monotonic())
+        return set_angle(angle, *args, **kwargs)
+    
+    servo.set_angle = recording_set_angle
+    dispenser = PeriodicDispenser(servo, open_angle=OPEN_ANGLE, closed_angle=60, hold_ms=100, policy=policy)
+    dispenser.start({'rate_per_min': 60, 'cycles': 5})
+    threading.Timer(1.05, dispenser.set_rate, ({'rate_per_min': 240},)).start()
+    dispenser.thread.join(5)
+    status = dispenser.status()
+    servo.cleanup()
+    
+    expected = [0.0, 1.0, 1.25, 1.5, 1.75]
+    offsets = [round(t - opens[0], 3) for t in opens] if opens else []
+    ok = check(status['cycles_done'] == 5 and status['cycles_skipped'] == 0,
+               f"5 ciclos executados, nenhum descartado ({status['cycles_done']}, {status['cycles_skipped']})")
+    ok &= check(len(offsets) == len(expected) and all(abs(a - b) < 0.02 for a, b in zip(offsets, expected)),
+                f"aberturas um período novo após o ciclo aberto ({offsets})")
+    return ok
+
+
+def main():
+    ok = True
+    for policy in POLICIES:
+        ok &= check_rate_change_in_hold(policy)
+    print("\nResultado:", "OK" if ok else "FALHOU")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificação da parada pelos canais de controle contra o servo simulado.
+Um stop enviado pelo WebSocket ou pelo UDP deve interromper o mesmo que
+POST /stop (ServoHTTPHandler.stop_all), e não só o sweep.
+
+Uso:
+    python3 tests/check_stop.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "service"))
+
+from batch import BatchRunner, compile_steps
+from http_server import ServoHTTPHandler
+from mission import ABORTED, RUNNING, MissionRunner
+from servo_control import ServoControl
+from udp_command import OP_STOP, ST_OK, UDPCommandServer, pack_frame, unpack_frame
+
+
+def check(condition, message):
+    print(("  OK   " if condition else "  FALHA ") + message)
+    return condition
+
+
+def wait_for(predicate, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def stop_by_websocket():
+    return ServoHTTPHandler.websocket_session().handle_text('{"type": "stop"}')['type'] == 'ack'
+
+
+def stop_by_udp():
+    udp = UDPCommandServer(ServoHTTPHandler.servo, stop=ServoHTTPHandler.stop_all)
+    ack = unpack_frame(udp.handle_datagram(pack_frame(OP_STOP, 1), ('127.0.0.1', 40000)))
+    return ack[2] == ST_OK
+
+
+CHANNELS = (('WebSocket', stop_by_websocket), ('UDP', stop_by_udp))
+
+
+def check_mission_abort():
+    """Missão longa em execução: o stop de cada canal a aborta"""
+    ok = True
+    for name, stop in CHANNELS:
+        print(f"Stop por {name} durante uma missão:")
+        missions = ServoHTTPHandler.missions
+        missions.load('long.json')
+        missions.start()
+        running = missions.state == RUNNING
+        acked = stop()
+        aborted = wait_for(lambda: missions.state == ABORTED)
+        ok &= check(running and acked and aborted, f"missão abortada (estado: {missions.state})")
+    return ok
+
+
+def check_batch_abort():
+    """Lote com uma espera longa: o stop de cada canal o interrompe"""
+    ok = True
+    batch = ServoHTTPHandler.batch
+    for name, stop in CHANNELS:
+        print(f"Stop por {name} durante um lote:")
+        future = batch.submit(compile_steps([{'op': 'dwell', 'ms': 60000}, {'op': 'angle', 'angle': 120}],
+                                            ServoHTTPHandler.servo))
+        time.sleep(0.05)
+        acked = stop()
+        result = future.result(timeout=2.0)
+        ok &= check(acked and result['aborted'], f"lote interrompido (aborted: {result['aborted']})")
+    return ok
+
+
+def check_non_finite_dwell():
+    """NaN e Infinity (aceitos pelo json.loads) são recusados na validação do lote"""
+    print("Espera não finita no lote:")
+    ok = True
+    for value in ('NaN', 'Infinity'):
+        steps = json.loads(f'[{{"op": "dwell", "ms": {value}}}]')
+        try:
+            compile_steps(steps, ServoHTTPHandler.servo)
+            rejected = False
+        except ValueError:
+            rejected = True
+        ok &= check(rejected, f'"ms": {value} recusado')
+    return ok
+
+
+def main():
+    servo = ServoControl(pin=4, backend='simulated', simulation={'rtt_s': 0.0})
+    servo._log_info = lambda message: None
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        events = [{'t': i * 0.5, 'angle': 120 if i % 2 else 60} for i in range(120)]
+        with open(os.path.join(directory, 'long.json'), 'w') as f:
+            json.dump({'name': 'long', 'mode': 'timed', 'events': events}, f)
+        
+        ServoHTTPHandler.servo = servo
+        ServoHTTPHandler.missions = MissionRunner(servo, directory)
+        ServoHTTPHandler.batch = BatchRunner(servo)
+        ServoHTTPHandler.batch.start()
+        ok &= check_mission_abort()
+        ok &= check_batch_abort()
+        ok &= check_non_finite_dwell()
+        ServoHTTPHandler.batch.stop()
+    servo.cleanup()
+    print("\nResultado:", "OK" if ok else "FALHOU")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
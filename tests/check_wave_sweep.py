@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificação do sweep temporizado por hardware contra um pigpio simulado.
+Confere o trem de pulsos gerado (waves + wave_chain) sem precisar da Raspberry Pi.
+
+Uso:
+    python3 tests/check_wave_sweep.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "service"))
+
+import metrics
+from servo_control import ServoControl
+from sweep_engine import CHAIN_MAX_BYTES, WaveSweep
+
+
+class MockPi:
+    """pigpio.pi falso que registra as chamadas de waveform"""
+    
+    def __init__(self):
+        self.connected = True
+        self.waves = {}
+        self.staging = []
+        self.chain = None
+        self.chain_started = None
+        self.chain_duration_s = 0.0
+        self.pulsewidths = []
+        self.deleted = []
+    
+    def set_servo_pulsewidth(self, pin, pulsewidth):
+        self.pulsewidths.append((pin, pulsewidth))
+    
+    def wave_add_new(self):
+        self.staging = []
+    
+    def wave_add_generic(self, pulses):
+        self.staging.extend(pulses)
+        return len(self.staging)
+    
+    def wave_create(self):
+        wave_id = len(self.waves)
+        self.waves[wave_id] = [(p.gpio_on, p.gpio_off, p.delay) for p in self.staging]
+        self.staging = []
+        return wave_id
+    
+    def wave_chain(self, chain):
+        self.chain = list(chain)
+        self.chain_started = time.monotonic()
+        self.chain_duration_s = sum(
+            sum(p[2] for p in self.waves[w]) * n for w, n in expand_chain(self.chain)
+        ) / 1000000.0
+    
+    def wave_tx_busy(self):
+        if self.chain_started is None:
+            return 0
+        return int(time.monotonic() - self.chain_started < self.chain_duration_s)
+    
+    def wave_tx_stop(self):
+        self.chain_started = None
+    
+    def wave_delete(self, wave_id):
+        self.deleted.append(wave_id)
+
+
+def expand_chain(chain):
+    """Converte o buffer de wave_chain em lista de (wave_id, repetições)"""
+    result = []
+    i = 0
+    while i < len(chain):
+        if chain[i] == 255 and chain[i + 1] == 0:
+            wave_id = chain[i + 2]
+            assert chain[i + 3] == 255 and chain[i + 4] == 1, "loop sem fechamento"
+            result.append((wave_id, chain[i + 5] | (chain[i + 6] << 8)))
+            i += 7
+        else:
+            result.append((chain[i], 1))
+            i += 1
+    return result
+
+
+def check(condition, message):
+    print(("  OK   " if condition else "  FALHA ") + message)
+    return condition
+
+
+def check_pulse_train():
+    """Confere waves e encadeamento de um sweep 0° → 180° (passo 45°)"""
+    print("Trem de pulsos (0° → 180°, passo 45°, delay 0.4s):")
+    pi = MockPi()
+    servo = ServoControl(pin=4)
+    pulsewidths = [servo.angle_to_pulsewidth(a) for a in servo.sweep_angles(0, 180, 45)]
+    program = WaveSweep(pi, 4, pulsewidths, step_period_s=0.5, final_hold_s=0.1, frequency=50)
+    program.build()
+    
+    ok = True
+    steps = expand_chain(program.chain)
+    ok &= check([pi.waves[w][0][2] for w, _ in steps] == pulsewidths,
+                f"pulsewidth por passo = {pulsewidths}")
+    ok &= check([n for _, n in steps] == [25, 25, 25, 25, 25, 5],
+                "frames por passo = 25 (500ms a 50Hz) e 5 no último (100ms)")
+    ok &= check(all(sum(p[2] for p in pulses) == 20000 for pulses in pi.waves.values()),
+                "cada wave dura exatamente um frame de 20000us")
+    ok &= check(all(pulses[0][:2] == (1 << 4, 0) and pulses[1][:2] == (0, 1 << 4)
+                    for pulses in pi.waves.values()),
+                "cada wave liga o GPIO 4 e depois desliga")
+    ok &= check(len(pi.waves) == 5, "uma wave por pulsewidth distinto (180° repetido reaproveitado)")
+    servo.pi = None
+    return ok
+
+
+def check_sweep_run():
+    """Executa um sweep completo e um interrompido pelo ServoControl"""
+    print("Execução pelo ServoControl:")
+    pi = MockPi()
+    servo = ServoControl(pin=4, sweep_engine="wave")
+    servo.pi = pi
+    servo.is_initialized = True
+    
+    ok = True
+    steps = []
+    done = threading.Event()
+    result = {}
+    
+    def on_finish(completed):
+        result['completed'] = completed
+        done.set()
+    
+    start = time.monotonic()
+    servo.sweep(0, 90, delay_s=0.0, step=30, on_step=lambda i, n: steps.append(i), on_finish=on_finish)
+    done.wait(5)
+    elapsed = time.monotonic() - start
+    ok &= check(result.get('completed') is True, "sweep concluído")
+    ok &= check(steps == [1, 2, 3, 4, 5], f"progresso reportado em todos os passos ({steps})")
+    ok &= check(0.4 <= elapsed < 1.0, f"duração ~0.5s temporizada pela wave ({elapsed:.3f}s)")
+    ok &= check(pi.pulsewidths[0] == (4, 0) and pi.pulsewidths[-1] == (4, 1500),
+                "pulsos de servo desligados durante a wave e restaurados em 90°")
+    ok &= check(sorted(pi.deleted) == sorted(pi.waves), "waves apagadas ao final")
+    
+    done.clear()
+    servo.sweep(0, 180, delay_s=1.0, step=10, on_finish=on_finish)
+    time.sleep(0.2)
+    servo.stop_sweep()
+    done.wait(2)
+    ok &= check(result.get('completed') is False, "sweep interrompido por stop_sweep()")
+    ok &= check(servo.get_angle() == 0 and not servo.wave_active,
+                f"posição mantida no passo em andamento ({servo.get_angle()}°)")
+    
+    servo.pi = None
+    return ok
+
+
+def check_pigpio_limits():
+    """Sweep de passo 1° (181 passos): não cabe no wave_chain e vai direto para o software"""
+    print("Limites do pigpio (0° → 180°, passo 1°):")
+    pi = MockPi()
+    servo = ServoControl(pin=4, sweep_engine="wave")
+    servo.pi = pi
+    servo.is_initialized = True
+    
+    ok = True
+    angles, step_period_s = servo.sweep_plan(0, 180, delay_s=0.0, step=1)
+    program = WaveSweep(pi, 4, [servo.angle_to_pulsewidth(a) for a in angles], step_period_s,
+                        servo.SETTLE_S, servo.frequency)
+    error = program.limit_error()
+    ok &= check(error is not None and str(CHAIN_MAX_BYTES) in error, f"excede o encadeamento ({error})")
+    
+    wave_errors = metrics.PIGPIO_ERRORS.labels('wave')
+    errors_before = wave_errors.value
+    steps = []
+    servo.sweep(0, 180, delay_s=0.0, step=1, on_step=lambda i, n: steps.append(i))
+    time.sleep(0.35)
+    servo.stop_sweep()
+    ok &= check(not pi.waves and pi.chain is None, "nenhuma wave criada nem transmitida")
+    ok &= check(len(steps) >= 3 and not servo.wave_active,
+                f"passos aplicados pelo motor por software ({len(steps)})")
+    ok &= check(wave_errors.value == errors_before, "sem erro de pigpio registrado")
+    
+    servo.pi = None
+    return ok
+
+
+def main():
+    ok = check_pulse_train()
+    ok &= check_sweep_run()
+    ok &= check_pigpio_limits()
+    print("\nResultado:", "OK" if ok else "FALHOU")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()